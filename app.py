@@ -1,5 +1,6 @@
 # app.py - 터미널 전용 버전
 from feedback_system import FeedbackSystem
+from core_logic import llm_pool
 from dotenv import load_dotenv
 
 
@@ -253,7 +254,7 @@ def generate_feedback_with_context(
 ):
     """입력된 데이터와 기존 데이터를 참고하여 피드백 생성"""
     try:
-        llm = system._get_llm()
+        llm = llm_pool.get_llm()
 
         # 선택된 학생의 이전 수업 기록 가져오기 (참고 정보)
         student_data = system.df[system.df["student_id"] == student_id].tail(3)
@@ -1,10 +1,18 @@
-from fastapi import APIRouter, Depends, HTTPException, status
+import time
+from typing import Optional, Tuple
+
+from fastapi import APIRouter, Depends, HTTPException, Request, Response, status
 from fastapi.security import OAuth2PasswordRequestForm, OAuth2PasswordBearer
 from sqlalchemy.orm import Session
 from jose import JWTError, jwt
 
-from .. import crud, schemas, security
-from ..database import get_db
+from .. import crud, crud_async, models, schemas, security
+from ..database import (
+    LAST_WRITE_HEADER, AsyncSessionLocal, SessionLocal, get_db, parse_last_write, read_session
+)
+from ..login_throttle import client_ip, login_throttle
+from ..password_hasher import password_hasher
+from ..teacher_cache import teacher_cache
 
 oauth2_scheme = OAuth2PasswordBearer(tokenUrl="/api/v1/auth/token")
 
@@ -13,38 +21,116 @@ router = APIRouter(
     tags=["Authentication"]
 )
 
-def get_current_teacher(token: str = Depends(oauth2_scheme), db: Session = Depends(get_db)) -> schemas.Teacher:
+def _decode_token(token: str) -> schemas.TokenData:
     """
-    JWT 토큰을 검증하고 현재 로그인된 선생님 정보를 반환하는 의존성 함수
+    JWT 토큰을 검증하고 토큰 데이터(이메일, teacher_id, 만료 시각)를 반환 (유효하지 않으면 401)
     """
-    credentials_exception = HTTPException(
-        status_code=status.HTTP_401_UNAUTHORIZED,
-        detail="유효한 자격 증명을 찾을 수 없습니다.",
-        headers={"WWW-Authenticate": "Bearer"},
-    )
     try:
         # 1. 토큰 디코딩
         payload = jwt.decode(token, security.SECRET_KEY, algorithms=[security.ALGORITHM])
         email: str = payload.get("sub")
         if email is None:
-            raise credentials_exception
+            raise _credentials_exception()
         # 2. 토큰 데이터 유효성 검사
-        token_data = schemas.TokenData(email=email)
+        return schemas.TokenData(email=email, teacher_id=payload.get("tid"), expires=payload.get("exp"))
     except JWTError:
-        raise credentials_exception
-    
-    # 3. DB에서 사용자 정보 조회
-    teacher = crud.get_teacher_by_email(db, email=token_data.email)
+        raise _credentials_exception()
+
+def _credentials_exception() -> HTTPException:
+    return HTTPException(
+        status_code=status.HTTP_401_UNAUTHORIZED,
+        detail="유효한 자격 증명을 찾을 수 없습니다.",
+        headers={"WWW-Authenticate": "Bearer"},
+    )
+
+def _cached_teacher(token: str) -> Tuple[Optional[schemas.Teacher], Optional[schemas.TokenData]]:
+    """
+    캐시에서 토큰의 선생님 정보 조회
+    검증된 토큰이면 (선생님, None), 새 토큰이면 검증 후 (teacher_id 클레임으로 찾은 선생님 또는 None, 토큰 데이터)
+    """
+    teacher = teacher_cache.get_by_token(token)
+    if teacher is not None:
+        return teacher, None
+    token_data = _decode_token(token)
+    teacher = teacher_cache.get_by_id(token_data.teacher_id)
+    if teacher is not None and teacher.email != token_data.email:
+        # 토큰 발급 후 이메일이 바뀐 선생님
+        raise _credentials_exception()
+    if teacher is not None:
+        teacher_cache.put(teacher, token, token_data.expires)
+    return teacher, token_data
+
+def _remember_teacher(db_teacher: Optional[models.Teacher], token: str, token_data: schemas.TokenData) -> schemas.Teacher:
+    """DB에서 조회한 선생님을 확인하고 세션과 무관한 값으로 캐시"""
+    if db_teacher is None:
+        raise _credentials_exception()
+    if token_data.teacher_id is not None and token_data.teacher_id != db_teacher.teacher_id:
+        raise _credentials_exception()
+    teacher = schemas.Teacher.from_orm(db_teacher)
+    teacher_cache.put(teacher, token, token_data.expires)
+    return teacher
+
+def get_current_teacher(token: str = Depends(oauth2_scheme)) -> schemas.Teacher:
+    """
+    JWT 토큰을 검증하고 현재 로그인된 선생님 정보를 반환하는 의존성 함수
+    검증된 토큰과 선생님 정보는 teacher_cache에서 찾아 DB 조회 없이 반환
+    (캐시에 없을 때만 DB 세션을 열어 조회)
+    """
+    teacher, token_data = _cached_teacher(token)
     if teacher is None:
-        raise credentials_exception
-        
+        # 3. 캐시에 없으면 DB에서 사용자 정보 조회
+        with SessionLocal() as db:
+            started = time.perf_counter()
+            db_teacher = crud.get_teacher_by_email(db, email=token_data.email)
+            teacher_cache.record_lookup(time.perf_counter() - started)
+            teacher = _remember_teacher(db_teacher, token, token_data)
+    return teacher
+
+def get_teacher_db(response: Response, current_teacher: schemas.Teacher = Depends(get_current_teacher)):
+    """
+    선생님별 쓰기 API의 DB 세션 (primary 사용)
+    이 세션에서 쓰기를 커밋하면 이 선생님의 이후 조회를 잠시 primary로 고정 (복제본 지연 대비)
+    응답에는 쓰기 시각 헤더(LAST_WRITE_HEADER)를 담아 다른 워커가 받은 조회도 primary를 사용하도록 함
+    """
+    db = SessionLocal()
+    db.info["sticky_key"] = current_teacher.email
+    db.info["response"] = response
+    try:
+        yield db
+    finally:
+        db.close()
+
+def get_teacher_read_db(request: Request, current_teacher: schemas.Teacher = Depends(get_current_teacher)):
+    """
+    선생님별 조회 API의 DB 세션 (복제본 사용, 최근에 쓰기를 한 선생님은 primary 사용)
+    요청의 쓰기 시각 헤더(LAST_WRITE_HEADER)나 이 워커의 최근 쓰기 기록으로 판단
+    """
+    yield from read_session(
+        sticky_key=current_teacher.email,
+        last_write_at=parse_last_write(request.headers.get(LAST_WRITE_HEADER)),
+    )
+
+async def get_current_teacher_async(token: str = Depends(oauth2_scheme)) -> schemas.Teacher:
+    """
+    get_current_teacher의 async 버전 (DB_ASYNC=true의 async 라우트에서 사용)
+    """
+    teacher, token_data = _cached_teacher(token)
+    if teacher is None:
+        async with AsyncSessionLocal() as db:
+            started = time.perf_counter()
+            db_teacher = await crud_async.get_teacher_by_email(db, email=token_data.email)
+            teacher_cache.record_lookup(time.perf_counter() - started)
+            teacher = _remember_teacher(db_teacher, token, token_data)
     return teacher
 
 @router.post("/teachers/", response_model=schemas.Teacher, status_code=status.HTTP_201_CREATED)
-def create_teacher_signup(teacher: schemas.TeacherCreate, db: Session = Depends(get_db)):
+def create_teacher_signup(teacher: schemas.TeacherCreate, request: Request, db: Session = Depends(get_db)):
     """
     회원가입 엔드포인트
     """
+    # 비밀번호 해싱 전에 IP별 시도 횟수 제한
+    login_throttle.check(client_ip(request))
+
     # 이메일 중복 체크
     db_teacher = crud.get_teacher_by_email(db, email=teacher.email)
     if db_teacher:
@@ -58,31 +144,46 @@ def create_teacher_signup(teacher: schemas.TeacherCreate, db: Session = Depends(
 
 
 @router.post("/auth/token", response_model=schemas.Token)
-def login_for_access_token(form_data: OAuth2PasswordRequestForm = Depends(), db: Session = Depends(get_db)):
+def login_for_access_token(
+    request: Request, form_data: OAuth2PasswordRequestForm = Depends(), db: Session = Depends(get_db)
+):
     """
     로그인 및 JWT 토큰 발급 엔드포인트
     """
-    # 1. 사용자 확인
+    # 0. IP별 시도 수, 계정별 실패 수 제한 (비밀번호 검증 전에 확인하여 해싱 워커를 보호)
+    login_throttle.check(client_ip(request), form_data.username)
+
+    # 1. 사용자 확인 (인증 시 캐시 미스와 같은 조회이므로 절약 시간 추정에 사용)
+    started = time.perf_counter()
     teacher = crud.get_teacher_by_email(db, email=form_data.username)
+    teacher_cache.record_lookup(time.perf_counter() - started)
     if not teacher:
+        login_throttle.record_failure(form_data.username)
         raise HTTPException(
             status_code=status.HTTP_401_UNAUTHORIZED,
             detail="이메일 또는 비밀번호가 올바르지 않습니다.",
             headers={"WWW-Authenticate": "Bearer"},
         )
     
-    # 2. 비밀번호 검증
-    if not security.verify_password(form_data.password, teacher.hashed_password):
+    # 2. 비밀번호 검증 (해싱 워커 풀에서 실행)
+    if not password_hasher.verify_password(form_data.password, teacher.hashed_password):
+        login_throttle.record_failure(form_data.username)
         raise HTTPException(
             status_code=status.HTTP_401_UNAUTHORIZED,
             detail="이메일 또는 비밀번호가 올바르지 않습니다.",
             headers={"WWW-Authenticate": "Bearer"},
         )
     
+    login_throttle.record_success(form_data.username)
+
     # 3. JWT 생성
+    # teacher_id 클레임을 함께 넣어 인증 시 선생님 캐시를 ID로 바로 조회
     access_token = security.create_access_token(
-        data={"sub": teacher.email}
+        data={"sub": teacher.email, "tid": teacher.teacher_id}
     )
     
+    # 로그인 직후 요청부터 DB 조회 없이 인증되도록 선생님 정보를 캐시
+    teacher_cache.put(schemas.Teacher.from_orm(teacher))
+
     # 4. 토큰 반환
     return {"access_token": access_token, "token_type": "bearer"}
\ No newline at end of file
@@ -1,9 +1,8 @@
 from fastapi import APIRouter, Depends, HTTPException
 from sqlalchemy.orm import Session
 
-from .. import crud, models, schemas
-from ..database import get_db
-from .auth import get_current_teacher
+from .. import crud, schemas
+from .auth import get_current_teacher, get_teacher_db, get_teacher_read_db
 
 router = APIRouter(
     prefix="/api/v1/feedbacks",
@@ -13,8 +12,8 @@ router = APIRouter(
 @router.get("/{feedback_id}", response_model=schemas.Feedback)
 def read_feedback(
     feedback_id: int, 
-    db: Session = Depends(get_db),
-    current_teacher: models.Teacher = Depends(get_current_teacher)
+    db: Session = Depends(get_teacher_read_db),
+    current_teacher: schemas.Teacher = Depends(get_current_teacher)
 ):
     """
     ID로 특정 피드백 조회
@@ -31,8 +30,8 @@ def read_feedback(
 def update_feedback(
     feedback_id: int, 
     feedback_update: schemas.FeedbackUpdate, 
-    db: Session = Depends(get_db),
-    current_teacher: models.Teacher = Depends(get_current_teacher)
+    db: Session = Depends(get_teacher_db),
+    current_teacher: schemas.Teacher = Depends(get_current_teacher)
 ):
     """
     특정 피드백 정보 수정
@@ -1,79 +1,405 @@
-from fastapi import APIRouter, Depends, HTTPException
+import json
+import os
+import time
+from concurrent.futures import ThreadPoolExecutor
+from datetime import date
+from fastapi import APIRouter, Depends, HTTPException, Query, Response, status
+from fastapi.encoders import jsonable_encoder
+from fastapi.responses import JSONResponse, StreamingResponse
+from starlette.concurrency import iterate_in_threadpool
 from sqlalchemy.orm import Session
-from typing import List
+from typing import AsyncIterator, Iterator, List, Optional
 
-from .. import crud, models, schemas
-from ..database import get_db
-from ..feedback_ai import generate_ai_feedback
-from .auth import get_current_teacher
+from .. import crud, schemas
+from ..database import SessionLocal
+from ..feedback_ai import (
+    generate_ai_feedback,
+    generate_draft_feedback,
+    parse_streamed_sections,
+    stream_ai_feedback,
+)
+from ..job_queue import enqueue_feedback_job
+from ..pagination import decode_cursor, paginate
+from core_logic.circuit_breaker import CircuitOpenError
+from core_logic.feedback_system import SECTION_KEYS, render_section
+from .auth import get_current_teacher, get_teacher_db, get_teacher_read_db
 
 router = APIRouter(
     prefix="/api/v1/students", # 공통 경로
     tags=["feedbacks"],
 )
 
-@router.post("/{student_id}/feedbacks", response_model=schemas.Class)
+# 일괄 생성 시 한 요청에 허용하는 최대 항목 수와 AI 생성 동시 실행 수
+FEEDBACK_BATCH_MAX_ITEMS = int(os.getenv("FEEDBACK_BATCH_MAX_ITEMS", "100"))
+FEEDBACK_BATCH_CONCURRENCY = int(os.getenv("FEEDBACK_BATCH_CONCURRENCY", "4"))
+# 동기 피드백 생성 요청의 AI 생성 마감 시간(초), 넘기면 해당 섹션은 초안으로 대체
+FEEDBACK_DEADLINE_SECONDS = float(os.getenv("FEEDBACK_DEADLINE_SECONDS", "20"))
+# 피드백 목록 한 페이지의 기본/최대 피드백 수
+FEEDBACK_PAGE_SIZE = int(os.getenv("FEEDBACK_PAGE_SIZE", "20"))
+FEEDBACK_PAGE_MAX = int(os.getenv("FEEDBACK_PAGE_MAX", "100"))
+
+@router.post(
+    "/{student_id}/feedbacks",
+    response_model=schemas.Class,
+    responses={status.HTTP_202_ACCEPTED: {"model": schemas.FeedbackJob}},
+)
 def create_feedback_for_student(
     student_id: int,
     request: schemas.FeedbackCreateRequest,
-    db: Session = Depends(get_db),
-    current_teacher: models.Teacher = Depends(get_current_teacher)
+    regenerate: bool = False,
+    async_job: bool = False,
+    db: Session = Depends(get_teacher_db),
+    current_teacher: schemas.Teacher = Depends(get_current_teacher)
 ):
     """
     특정 학생의 수업 기록 및 AI 피드백을 생성하는 API
+    regenerate=true이면 캐시된 AI 응답을 사용하지 않고 새로 생성
+    async_job=true이면 수업 기록과 규칙 기반 피드백 초안을 저장하고 AI 피드백 생성 작업을 등록한 뒤
+    202와 작업 정보(초안 포함)를 바로 반환 (GET /api/v1/jobs/{job_id}로 상태 조회,
+    작업이 완료되면 초안이 AI 피드백으로 교체됨)
+    AI 피드백 생성이 실패하거나 LLM 서킷 브레이커가 열려 있으면 초안을 저장하여 반환하고,
+    FEEDBACK_DEADLINE_SECONDS 안에 끝나지 않은 섹션은 초안으로 대체
     """
+    teacher_id = current_teacher.teacher_id
     # 학생이 현재 로그인한 선생님의 학생이 맞는지 확인
-    db_student = crud.get_student(db, student_id=student_id, teacher_id=current_teacher.teacher_id)
+    db_student = crud.get_student(db, student_id=student_id, teacher_id=teacher_id)
     if db_student is None:
         raise HTTPException(status_code=404, detail="Student not found or not authorized")
 
-    # 수업 및 피드백 생성
-    created_class = crud.create_class_and_feedback(
+    # LLM 없이 즉시 만들 수 있는 초안
+    draft_comments = generate_draft_feedback(
+        student_name=db_student.name,
+        current_class_info=request.class_info.dict(),
+        current_scores=request.feedback_info.dict()
+    )
+
+    # 수업 및 피드백 생성 (AI 피드백이 완성되기 전이나 생성에 실패해도 볼 수 있도록 초안과 함께 저장)
+    class_id, feedback_id = crud.create_class_and_feedback(
         db=db,
         student_id=student_id,
-        teacher_id=current_teacher.teacher_id,
+        teacher_id=teacher_id,
         class_info=request.class_info,
-        feedback_info=request.feedback_info
+        feedback_info=request.feedback_info,
+        ai_comments=draft_comments
     )
 
+    if async_job:
+        db_job = crud.create_feedback_job(
+            db=db,
+            feedback_id=feedback_id,
+            student_id=student_id,
+            teacher_id=teacher_id,
+            use_cache=not regenerate
+        )
+        enqueue_feedback_job(db_job.job_id)
+        return JSONResponse(
+            status_code=status.HTTP_202_ACCEPTED,
+            content=jsonable_encoder(schemas.FeedbackJob.from_orm(db_job))
+        )
+
+    ai_comments = draft_comments
     try:
-        # AI 피드백 생성 시도
+        # AI 피드백 생성 시도 (프롬프트 입력 조회 후 DB 연결을 반환하고 LLM 응답을 기다림)
         ai_comments = generate_ai_feedback(
             student_id=student_id,
             db=db,
-            teacher_id=current_teacher.teacher_id,
+            teacher_id=teacher_id,
             current_class_info=request.class_info.dict(),
-            current_scores=request.feedback_info.dict()
+            current_scores=request.feedback_info.dict(),
+            use_cache=not regenerate,
+            deadline=time.monotonic() + FEEDBACK_DEADLINE_SECONDS,
+            class_id=class_id
+        )
+
+        # 성공 시 AI 코멘트를 기본 키로 바로 저장 (새 연결로 짧은 트랜잭션)
+        crud.apply_ai_comments(db=db, feedback_id=feedback_id, ai_comments=ai_comments)
+    except Exception as e:
+        # AI 피드백 생성 실패 시 생성 시점에 저장한 초안을 그대로 사용
+        print(f"AI 피드백 생성 중 오류 발생: {e}")
+        db.rollback()
+        ai_comments = draft_comments
+
+    # 저장한 값으로 응답을 구성하여 다시 조회하지 않음
+    return _created_class(student_id, class_id, feedback_id, request, ai_comments)
+
+def _created_class(
+    student_id: int,
+    class_id: int,
+    feedback_id: int,
+    request: schemas.FeedbackCreateRequest,
+    ai_comments: dict
+) -> schemas.Class:
+    """생성한 수업 기록과 피드백 응답 구성"""
+    return schemas.Class(
+        class_id=class_id,
+        student_id=student_id,
+        **request.class_info.dict(),
+        feedback=_created_feedback(class_id, feedback_id, request.feedback_info, ai_comments)
+    )
+
+def _created_feedback(
+    class_id: int,
+    feedback_id: int,
+    feedback_info: schemas.FeedbackCreate,
+    ai_comments: dict
+) -> schemas.Feedback:
+    """생성한 피드백 응답 구성"""
+    return schemas.Feedback(
+        feedback_id=feedback_id,
+        class_id=class_id,
+        **feedback_info.dict(),
+        ai_comment_improvement=ai_comments.get("improvement"),
+        ai_comment_attitude=ai_comments.get("attitude"),
+        ai_comment_overall=ai_comments.get("overall")
+    )
+
+def _generate_batch_item(
+    item: schemas.FeedbackBatchItem,
+    class_id: int,
+    feedback_id: int,
+    teacher_id: int,
+    use_cache: bool
+):
+    """일괄 생성 항목 하나의 AI 피드백을 생성하여 저장 (워커 스레드마다 별도 세션 사용)"""
+    with SessionLocal() as item_db:
+        ai_comments = generate_ai_feedback(
+            student_id=item.student_id,
+            teacher_id=teacher_id,
+            db=item_db,
+            current_class_info=item.class_info.dict(),
+            current_scores=item.feedback_info.dict(),
+            use_cache=use_cache,
+            class_id=class_id
+        )
+        crud.apply_ai_comments(db=item_db, feedback_id=feedback_id, ai_comments=ai_comments)
+
+@router.post("/feedbacks/batch", response_model=List[schemas.FeedbackBatchResult])
+def create_feedbacks_batch(
+    request: schemas.FeedbackBatchRequest,
+    regenerate: bool = False,
+    max_concurrency: Optional[int] = None,
+    db: Session = Depends(get_teacher_db),
+    current_teacher: schemas.Teacher = Depends(get_current_teacher)
+):
+    """
+    여러 학생의 수업 기록 및 AI 피드백을 한 번에 생성하는 API
+    수업 기록은 규칙 기반 초안과 함께 하나의 트랜잭션으로 저장하고, AI 피드백은 제한된 동시성으로 생성하여
+    항목별 결과 또는 오류를 요청 순서대로 반환 (AI 생성에 실패한 항목(ai_failed)은 초안 유지)
+    """
+    items = request.items
+    if len(items) > FEEDBACK_BATCH_MAX_ITEMS:
+        raise HTTPException(
+            status_code=400,
+            detail=f"한 번에 최대 {FEEDBACK_BATCH_MAX_ITEMS}건까지 생성할 수 있습니다."
+        )
+
+    teacher_id = current_teacher.teacher_id
+    student_names = crud.get_student_names_by_teacher(
+        db, student_ids=[item.student_id for item in items], teacher_id=teacher_id
+    )
+
+    results = {}
+    valid = []
+    for index, item in enumerate(items):
+        if item.student_id in student_names:
+            valid.append((index, item))
+        else:
+            results[index] = schemas.FeedbackBatchResult(
+                index=index,
+                student_id=item.student_id,
+                status="failed",
+                error="Student not found or not authorized"
+            )
+
+    created_ids = crud.create_classes_and_feedbacks(
+        db,
+        teacher_id=teacher_id,
+        items=[
+            (
+                item.student_id,
+                item.class_info,
+                item.feedback_info,
+                generate_draft_feedback(
+                    student_name=student_names[item.student_id],
+                    current_class_info=item.class_info.dict(),
+                    current_scores=item.feedback_info.dict()
+                )
+            )
+            for _, item in valid
+        ]
+    )
+
+    errors = {}
+    if valid:
+        workers = min(max_concurrency or FEEDBACK_BATCH_CONCURRENCY, FEEDBACK_BATCH_CONCURRENCY, len(valid))
+        with ThreadPoolExecutor(max_workers=max(workers, 1)) as executor:
+            futures = {
+                index: executor.submit(_generate_batch_item, item, class_id, feedback_id, teacher_id, not regenerate)
+                for (index, item), (class_id, feedback_id) in zip(valid, created_ids)
+            }
+            for index, future in futures.items():
+                try:
+                    future.result()
+                except Exception as e:
+                    print(f"AI 피드백 생성 중 오류 발생 (항목 {index}): {e}")
+                    errors[index] = str(e)
+
+    db_classes = {
+        db_class.class_id: db_class
+        for db_class in crud.get_classes_with_feedback(
+            db, class_ids=[class_id for class_id, _ in created_ids], teacher_id=teacher_id
+        )
+    }
+    for (index, item), (class_id, _) in zip(valid, created_ids):
+        results[index] = schemas.FeedbackBatchResult(
+            index=index,
+            student_id=item.student_id,
+            status="ai_failed" if index in errors else "succeeded",
+            error=errors.get(index),
+            result=schemas.Class.from_orm(db_classes[class_id])
         )
-        print(ai_comments)
 
-        # 성공 시 AI 코멘트 업데이트
-        crud.update_feedback_with_ai_comment(
+    return [results[index] for index in range(len(items))]
+
+def _sse(event: str, data: dict) -> str:
+    """Server-Sent Events 메시지 형식으로 변환"""
+    return f"event: {event}\ndata: {json.dumps(data, ensure_ascii=False)}\n\n"
+
+async def _close_on_disconnect(chunks: Iterator[str]) -> AsyncIterator[str]:
+    """
+    동기 제너레이터를 스레드풀에서 순회하는 스트리밍 응답 본문
+    클라이언트 연결이 끊겨 응답이 취소되면 제너레이터를 바로 닫음
+    (StreamingResponse는 동기 이터레이터를 닫지 않아 가비지 컬렉션 전까지 생성 작업이 계속됨)
+    """
+    try:
+        async for chunk in iterate_in_threadpool(chunks):
+            yield chunk
+    finally:
+        chunks.close()
+
+@router.post("/{student_id}/feedbacks/stream")
+def stream_feedback_for_student(
+    student_id: int,
+    request: schemas.FeedbackCreateRequest,
+    regenerate: bool = False,
+    db: Session = Depends(get_teacher_db),
+    current_teacher: schemas.Teacher = Depends(get_current_teacher)
+):
+    """
+    특정 학생의 수업 기록을 저장하고 AI 피드백을 SSE(text/event-stream)로 스트리밍하는 API
+    - created: 저장된 수업/피드백 ID
+    - token: 섹션(improvement/attitude/overall)별로 생성되는 텍스트 조각
+    - error: 섹션 생성 실패
+    - done: 스트림 완료 후 저장된 최종 피드백 (실패한 섹션은 규칙 기반 초안)
+    피드백은 초안과 함께 먼저 저장하므로, 스트리밍 중 오류가 나거나 연결이 끊기면 초안이 남음
+    연결이 끊기면 진행 중인 섹션 LLM 스트림을 취소하고,
+    LLM 서킷 브레이커가 열려 있으면 LLM을 호출하지 않고 모든 섹션을 초안으로 완료
+    """
+    db_student = crud.get_student(db, student_id=student_id, teacher_id=current_teacher.teacher_id)
+    if db_student is None:
+        raise HTTPException(status_code=404, detail="Student not found or not authorized")
+
+    teacher_id = current_teacher.teacher_id
+    draft_comments = generate_draft_feedback(
+        student_name=db_student.name,
+        current_class_info=request.class_info.dict(),
+        current_scores=request.feedback_info.dict()
+    )
+    class_id, feedback_id = crud.create_class_and_feedback(
+        db=db,
+        student_id=student_id,
+        teacher_id=teacher_id,
+        class_info=request.class_info,
+        feedback_info=request.feedback_info,
+        ai_comments=draft_comments
+    )
+
+    try:
+        # 프롬프트에 필요한 DB 조회는 응답 시작 전에 요청 세션으로 처리
+        events = stream_ai_feedback(
+            student_id=student_id,
+            teacher_id=teacher_id,
             db=db,
-            feedback_id=created_class.feedback.feedback_id,
-            ai_comments=ai_comments,
-            teacher_id=current_teacher.teacher_id
+            current_class_info=request.class_info.dict(),
+            current_scores=request.feedback_info.dict(),
+            use_cache=not regenerate,
+            class_id=class_id
         )
-    except Exception as e:
-        # AI 피드백 생성 실패 시
+    except CircuitOpenError as e:
+        # 서킷 브레이커가 열려 있으면 DB 조회와 LLM 호출 없이 모든 섹션을 초안으로 완료
         print(f"AI 피드백 생성 중 오류 발생: {e}")
-    
-    db.refresh(created_class)
-    return created_class
+        events = iter([("error", key, e) for key in SECTION_KEYS])
+
+    def event_stream():
+        yield _sse("created", {"class_id": class_id, "feedback_id": feedback_id})
+
+        sections = {key: "" for key in SECTION_KEYS}
+        try:
+            for event, section, value in events:
+                if event == "token":
+                    sections[section] += value
+                    yield _sse("token", {"section": section, "text": value})
+                elif event == "error":
+                    # 실패 원인 예외를 그대로 모으고 오류 문구는 클라이언트에 보낼 때만 만듦
+                    sections[section] = value
+                    yield _sse("error", {"section": section, "detail": render_section(value)})
+        except Exception as e:
+            # 저장해 둔 초안을 그대로 유지
+            print(f"AI 피드백 스트리밍 중 오류 발생: {e}")
+            yield _sse("error", {"section": None, "detail": str(e)})
+            return
+        finally:
+            # 클라이언트 연결이 끊겨 중간에 닫힌 경우에도 진행 중인 LLM 스트림을 바로 취소
+            close = getattr(events, "close", None)
+            if close is not None:
+                close()
+
+        # 요청 세션은 응답 시작 전에 반환되므로 저장은 별도 세션으로 처리 (모두 초안이면 이미 저장됨)
+        ai_comments = parse_streamed_sections(sections, draft_comments)
+        if ai_comments != draft_comments:
+            with SessionLocal() as write_db:
+                crud.apply_ai_comments(db=write_db, feedback_id=feedback_id, ai_comments=ai_comments)
+        feedback = _created_feedback(class_id, feedback_id, request.feedback_info, ai_comments)
+        yield _sse("done", jsonable_encoder(feedback))
+
+    return StreamingResponse(
+        _close_on_disconnect(event_stream()),
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"}
+    )
 
 @router.get("/{student_id}/feedbacks", response_model=List[schemas.Feedback])
 def read_student_feedbacks(
     student_id: int, 
-    db: Session = Depends(get_db),
-    current_teacher: models.Teacher = Depends(get_current_teacher)
+    response: Response,
+    cursor: Optional[str] = None,
+    limit: int = Query(FEEDBACK_PAGE_SIZE, ge=1, le=FEEDBACK_PAGE_MAX),
+    db: Session = Depends(get_teacher_read_db),
+    current_teacher: schemas.Teacher = Depends(get_current_teacher)
 ):    
     """
-    특정 학생의 전체 피드백 목록 조회
+    특정 학생의 피드백 목록 조회 (최근 수업 순)
+    limit건씩 반환하며, 다음 페이지가 있으면 X-Next-Cursor 헤더의 값을 cursor로 전달하여 이어서 조회
     """
+    before = None
+    if cursor is not None:
+        class_date, class_id = decode_cursor(cursor, 2)
+        try:
+            before = (date.fromisoformat(class_date), int(class_id))
+        except (TypeError, ValueError):
+            raise HTTPException(status_code=400, detail="Invalid cursor")
+
     # 학생 소유권 확인
     db_student = crud.get_student(db, student_id=student_id, teacher_id=current_teacher.teacher_id)
     if db_student is None:
         raise HTTPException(status_code=404, detail="Student not found or not authorized")
     
-    feedbacks = crud.get_feedbacks_by_student(db, student_id=student_id)
-    return feedbacks
\ No newline at end of file
+    feedbacks = crud.get_feedbacks_by_student(
+        db, student_id=student_id, limit=limit + 1, before=before
+    )
+    return paginate(
+        response,
+        feedbacks,
+        limit,
+        key=lambda feedback: [feedback.class_record.class_date, feedback.class_id]
+    )
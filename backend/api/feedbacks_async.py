@@ -0,0 +1,142 @@
+import time
+from datetime import date
+from fastapi import APIRouter, Depends, HTTPException, Query, Response, status
+from fastapi.encoders import jsonable_encoder
+from fastapi.responses import JSONResponse
+from sqlalchemy.ext.asyncio import AsyncSession
+from typing import List, Optional
+
+from .. import crud_async, schemas
+from ..database import get_async_db
+from ..feedback_ai import agenerate_ai_feedback, generate_draft_feedback
+from ..job_queue import enqueue_feedback_job
+from ..pagination import decode_cursor, paginate
+from . import feedbacks
+from .auth import get_current_teacher_async
+from .feedbacks import FEEDBACK_DEADLINE_SECONDS, FEEDBACK_PAGE_MAX, FEEDBACK_PAGE_SIZE, _created_class
+
+# feedbacks.py의 async 버전 (DB_ASYNC=true일 때 feedbacks.py 대신 등록, 경로와 응답은 동일)
+# 일괄 생성과 스트리밍은 워커 스레드에서 동작하므로 기존 동기 라우트를 그대로 등록
+router = APIRouter(
+    prefix="/api/v1/students",
+    tags=["feedbacks"],
+)
+
+@router.post(
+    "/{student_id}/feedbacks",
+    response_model=schemas.Class,
+    responses={status.HTTP_202_ACCEPTED: {"model": schemas.FeedbackJob}},
+)
+async def create_feedback_for_student(
+    student_id: int,
+    request: schemas.FeedbackCreateRequest,
+    regenerate: bool = False,
+    async_job: bool = False,
+    db: AsyncSession = Depends(get_async_db),
+    current_teacher: schemas.Teacher = Depends(get_current_teacher_async)
+):
+    """
+    특정 학생의 수업 기록 및 AI 피드백을 생성하는 API (동작은 동기 버전과 동일)
+    LLM 응답을 기다리는 동안 스레드풀 슬롯과 DB 연결을 점유하지 않음
+    """
+    teacher_id = current_teacher.teacher_id
+    db_student = await crud_async.get_student(db, student_id=student_id, teacher_id=teacher_id)
+    if db_student is None:
+        raise HTTPException(status_code=404, detail="Student not found or not authorized")
+
+    draft_comments = generate_draft_feedback(
+        student_name=db_student.name,
+        current_class_info=request.class_info.dict(),
+        current_scores=request.feedback_info.dict()
+    )
+
+    class_id, feedback_id = await crud_async.create_class_and_feedback(
+        db=db,
+        student_id=student_id,
+        teacher_id=teacher_id,
+        class_info=request.class_info,
+        feedback_info=request.feedback_info,
+        ai_comments=draft_comments
+    )
+
+    if async_job:
+        db_job = await crud_async.create_feedback_job(
+            db=db,
+            feedback_id=feedback_id,
+            student_id=student_id,
+            teacher_id=teacher_id,
+            use_cache=not regenerate
+        )
+        enqueue_feedback_job(db_job.job_id)
+        return JSONResponse(
+            status_code=status.HTTP_202_ACCEPTED,
+            content=jsonable_encoder(schemas.FeedbackJob.from_orm(db_job))
+        )
+
+    ai_comments = draft_comments
+    try:
+        ai_comments = await agenerate_ai_feedback(
+            student_id=student_id,
+            db=db,
+            teacher_id=teacher_id,
+            current_class_info=request.class_info.dict(),
+            current_scores=request.feedback_info.dict(),
+            use_cache=not regenerate,
+            deadline=time.monotonic() + FEEDBACK_DEADLINE_SECONDS,
+            class_id=class_id
+        )
+        await crud_async.apply_ai_comments(db=db, feedback_id=feedback_id, ai_comments=ai_comments)
+    except Exception as e:
+        # AI 피드백 생성 실패 시 생성 시점에 저장한 초안을 그대로 사용
+        print(f"AI 피드백 생성 중 오류 발생: {e}")
+        await db.rollback()
+        ai_comments = draft_comments
+
+    return _created_class(student_id, class_id, feedback_id, request, ai_comments)
+
+router.add_api_route(
+    "/feedbacks/batch",
+    feedbacks.create_feedbacks_batch,
+    methods=["POST"],
+    response_model=List[schemas.FeedbackBatchResult],
+)
+router.add_api_route(
+    "/{student_id}/feedbacks/stream",
+    feedbacks.stream_feedback_for_student,
+    methods=["POST"],
+)
+
+@router.get("/{student_id}/feedbacks", response_model=List[schemas.Feedback])
+async def read_student_feedbacks(
+    student_id: int,
+    response: Response,
+    cursor: Optional[str] = None,
+    limit: int = Query(FEEDBACK_PAGE_SIZE, ge=1, le=FEEDBACK_PAGE_MAX),
+    db: AsyncSession = Depends(get_async_db),
+    current_teacher: schemas.Teacher = Depends(get_current_teacher_async)
+):
+    """
+    특정 학생의 피드백 목록 조회 (최근 수업 순, X-Next-Cursor 커서 페이지)
+    """
+    before = None
+    if cursor is not None:
+        class_date, class_id = decode_cursor(cursor, 2)
+        try:
+            before = (date.fromisoformat(class_date), int(class_id))
+        except (TypeError, ValueError):
+            raise HTTPException(status_code=400, detail="Invalid cursor")
+
+    # 학생 소유권 확인
+    db_student = await crud_async.get_student(db, student_id=student_id, teacher_id=current_teacher.teacher_id)
+    if db_student is None:
+        raise HTTPException(status_code=404, detail="Student not found or not authorized")
+
+    feedbacks_page = await crud_async.get_feedbacks_by_student(
+        db, student_id=student_id, limit=limit + 1, before=before
+    )
+    return paginate(
+        response,
+        feedbacks_page,
+        limit,
+        key=lambda feedback: [feedback.class_record.class_date, feedback.class_id]
+    )
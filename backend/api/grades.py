@@ -3,7 +3,7 @@ from sqlalchemy.orm import Session
 from typing import List
 
 from .. import models, schemas
-from ..database import get_db
+from ..database import get_read_db
 
 router = APIRouter(
     prefix="/api/v1/grades",
@@ -11,7 +11,7 @@ router = APIRouter(
 )
 
 @router.get("", response_model=List[schemas.Grade])
-def read_grades(db: Session = Depends(get_db)):
+def read_grades(db: Session = Depends(get_read_db)):
     """
     전체 학년 목록 조회
     (학생 생성/수정 시 드롭다운 메뉴를 채우는 데 사용)
@@ -0,0 +1,26 @@
+from fastapi import APIRouter, Depends, HTTPException
+from sqlalchemy.orm import Session
+
+from .. import crud, schemas
+from ..database import get_db
+from .auth import get_current_teacher
+
+router = APIRouter(
+    prefix="/api/v1/jobs",
+    tags=["jobs"],
+)
+
+@router.get("/{job_id}", response_model=schemas.FeedbackJob)
+def read_feedback_job(
+    job_id: int,
+    db: Session = Depends(get_db),
+    current_teacher: schemas.Teacher = Depends(get_current_teacher)
+):
+    """
+    AI 피드백 생성 작업의 상태 조회
+    (완료된 경우 생성된 피드백을 함께 반환)
+    """
+    db_job = crud.get_feedback_job(db, job_id=job_id, teacher_id=current_teacher.teacher_id)
+    if db_job is None:
+        raise HTTPException(status_code=404, detail="Job not found or not authorized")
+    return db_job
@@ -0,0 +1,27 @@
+from fastapi import APIRouter, Depends, HTTPException
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from .. import crud_async, schemas
+from ..database import get_async_db
+from .auth import get_current_teacher_async
+
+# jobs.py의 async 버전 (DB_ASYNC=true일 때 jobs.py 대신 등록)
+router = APIRouter(
+    prefix="/api/v1/jobs",
+    tags=["jobs"],
+)
+
+@router.get("/{job_id}", response_model=schemas.FeedbackJob)
+async def read_feedback_job(
+    job_id: int,
+    db: AsyncSession = Depends(get_async_db),
+    current_teacher: schemas.Teacher = Depends(get_current_teacher_async)
+):
+    """
+    AI 피드백 생성 작업의 상태 조회
+    (완료된 경우 생성된 피드백을 함께 반환)
+    """
+    db_job = await crud_async.get_feedback_job(db, job_id=job_id, teacher_id=current_teacher.teacher_id)
+    if db_job is None:
+        raise HTTPException(status_code=404, detail="Job not found or not authorized")
+    return db_job
@@ -0,0 +1,54 @@
+from fastapi import APIRouter, Depends
+from fastapi.responses import PlainTextResponse
+
+from .. import schemas
+from ..login_throttle import login_throttle
+from ..password_hasher import password_hasher
+from ..teacher_cache import teacher_cache
+from .auth import get_current_teacher
+from core_logic.hedging import hedger
+from core_logic.llm_cache import response_cache
+from core_logic.llm_metrics import llm_metrics
+from core_logic.rate_limiter import limiter
+from core_logic.token_budget import prompt_token_stats
+
+router = APIRouter(
+    prefix="/api/v1/monitoring",
+    tags=["monitoring"],
+)
+
+@router.get("/llm")
+def read_llm_status(current_teacher: schemas.Teacher = Depends(get_current_teacher)):
+    """
+    LLM 호출 속도 제한기, 응답 캐시, 섹션별 프롬프트 토큰 통계,
+    (모델, 섹션)별 호출 지연/대기/토큰 분포, 헤지 요청 통계 조회
+    """
+    return {
+        "rate_limiter": limiter.snapshot(),
+        "cache": response_cache.stats(),
+        "prompt_tokens": prompt_token_stats.snapshot(),
+        "calls": llm_metrics.snapshot(),
+        "hedging": hedger.snapshot(),
+    }
+
+@router.get("/auth")
+def read_auth_status(current_teacher: schemas.Teacher = Depends(get_current_teacher)):
+    """
+    인증된 선생님 캐시의 히트율과 절약한 시간 추정치,
+    비밀번호 해싱 워커 풀의 큐 깊이와 지연 분포, 로그인 시도 제한 통계 조회
+    """
+    return {
+        "cache": teacher_cache.stats(),
+        "password_hashing": password_hasher.stats(),
+        "login_throttle": login_throttle.stats(),
+    }
+
+@router.get("/metrics", response_class=PlainTextResponse)
+def read_llm_metrics(current_teacher: schemas.Teacher = Depends(get_current_teacher)):
+    """
+    LLM 호출 히스토그램 (Prometheus 텍스트 형식)
+    """
+    return PlainTextResponse(
+        llm_metrics.render_prometheus(),
+        media_type="text/plain; version=0.0.4",
+    )
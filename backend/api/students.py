@@ -1,21 +1,35 @@
-from fastapi import APIRouter, Depends, HTTPException, Response, status
+import os
+from fastapi import APIRouter, Depends, HTTPException, Query, Response, status
 from sqlalchemy.orm import Session
-from typing import List
+from typing import List, Optional
 
-from .. import crud, schemas, models
-from ..database import get_db
-from .auth import get_current_teacher
+from .. import crud, schemas
+from ..pagination import decode_cursor, paginate
+from .auth import get_current_teacher, get_teacher_db, get_teacher_read_db
 
 router = APIRouter(
     prefix="/api/v1/students",
     tags=["students"],
 )
 
+# 학생 목록 한 페이지의 기본/최대 학생 수
+STUDENT_PAGE_SIZE = int(os.getenv("STUDENT_PAGE_SIZE", "100"))
+STUDENT_PAGE_MAX = int(os.getenv("STUDENT_PAGE_MAX", "500"))
+
+def _after_student_id(cursor: Optional[str]) -> Optional[int]:
+    """학생 목록 커서를 이전 페이지의 마지막 student_id로 변환"""
+    if cursor is None:
+        return None
+    (student_id,) = decode_cursor(cursor, 1)
+    if not isinstance(student_id, int):
+        raise HTTPException(status_code=400, detail="Invalid cursor")
+    return student_id
+
 @router.post("", response_model=schemas.Student, status_code=201)
 def create_student(
     student: schemas.StudentCreate,
-    db: Session = Depends(get_db),
-    current_teacher: models.Teacher = Depends(get_current_teacher)
+    db: Session = Depends(get_teacher_db),
+    current_teacher: schemas.Teacher = Depends(get_current_teacher)
 ):
     """
     신규 학생 생성
@@ -27,29 +41,54 @@ def create_student(
 
 @router.get("", response_model=List[schemas.Student])
 def read_my_students(
-    skip: int = 0, 
-    limit: int = 100, 
-    db: Session = Depends(get_db),
-    current_teacher: models.Teacher = Depends(get_current_teacher)
+    response: Response,
+    cursor: Optional[str] = None,
+    limit: int = Query(STUDENT_PAGE_SIZE, ge=1, le=STUDENT_PAGE_MAX),
+    db: Session = Depends(get_teacher_read_db),
+    current_teacher: schemas.Teacher = Depends(get_current_teacher)
 ):
     """
-    전체 학생 목록 조회
+    전체 학생 목록 조회 (학생별 수업 기록과 피드백 포함)
+    student_id 순으로 limit명씩 반환하며, 다음 페이지가 있으면 X-Next-Cursor 헤더의 값을
+    cursor로 전달하여 이어서 조회
     """
     students = crud.get_students_by_teacher(
-        db, teacher_id=current_teacher.teacher_id, skip=skip, limit=limit
+        db,
+        teacher_id=current_teacher.teacher_id,
+        limit=limit + 1,
+        after_student_id=_after_student_id(cursor)
+    )
+    return paginate(response, students, limit, key=lambda student: [student.student_id])
+
+@router.get("/summary", response_model=List[schemas.StudentListItem])
+def read_my_student_list(
+    response: Response,
+    cursor: Optional[str] = None,
+    limit: int = Query(STUDENT_PAGE_SIZE, ge=1, le=STUDENT_PAGE_MAX),
+    db: Session = Depends(get_teacher_read_db),
+    current_teacher: schemas.Teacher = Depends(get_current_teacher)
+):
+    """
+    학생 목록 조회 (이름, 학년만 포함하는 목록 화면용, 페이지 방식은 전체 학생 목록과 동일)
+    """
+    students = crud.get_student_list_by_teacher(
+        db,
+        teacher_id=current_teacher.teacher_id,
+        limit=limit + 1,
+        after_student_id=_after_student_id(cursor)
     )
-    return students
+    return paginate(response, students, limit, key=lambda student: [student.student_id])
 
 @router.get("/{student_id}", response_model=schemas.Student)
 def read_student(
     student_id: int, 
-    db: Session = Depends(get_db),
-    current_teacher: models.Teacher = Depends(get_current_teacher)
+    db: Session = Depends(get_teacher_read_db),
+    current_teacher: schemas.Teacher = Depends(get_current_teacher)
 ):
     """
     ID로 특정 학생 정보 조회
     """
-    db_student = crud.get_student(
+    db_student = crud.get_student_with_classes(
         db, student_id=student_id, teacher_id=current_teacher.teacher_id
     )
     if db_student is None:
@@ -62,8 +101,8 @@ def read_student(
 def update_student(
     student_id: int, 
     student_update: schemas.StudentUpdate, 
-    db: Session = Depends(get_db),
-    current_teacher: models.Teacher = Depends(get_current_teacher)
+    db: Session = Depends(get_teacher_db),
+    current_teacher: schemas.Teacher = Depends(get_current_teacher)
 ):    
     """
     특정 학생 정보 수정 (이름, 학년)
@@ -79,8 +118,8 @@ def update_student(
 @router.delete("/{student_id}", status_code=status.HTTP_204_NO_CONTENT)
 def delete_student(
     student_id: int, 
-    db: Session = Depends(get_db),
-    current_teacher: models.Teacher = Depends(get_current_teacher)
+    db: Session = Depends(get_teacher_db),
+    current_teacher: schemas.Teacher = Depends(get_current_teacher)
 ):
     """
     특정 학생 정보 삭제
@@ -90,4 +129,5 @@ def delete_student(
     )
     if db_student is None:
         raise HTTPException(status_code=404, detail="Student not found or not authorized")
-    return Response(status_code=status.HTTP_204_NO_CONTENT)
\ No newline at end of file
+    # 새 Response를 반환하면 쓰기 시각 헤더가 빠지므로 None을 반환 (상태 코드는 데코레이터의 204)
+    return None
\ No newline at end of file
@@ -0,0 +1,118 @@
+from fastapi import APIRouter, Depends, HTTPException, Query, Response, status
+from sqlalchemy.ext.asyncio import AsyncSession
+from typing import List, Optional
+
+from .. import crud_async, schemas
+from ..database import get_async_db
+from ..pagination import paginate
+from .auth import get_current_teacher_async
+from .students import STUDENT_PAGE_MAX, STUDENT_PAGE_SIZE, _after_student_id
+
+# students.py의 async 버전 (DB_ASYNC=true일 때 students.py 대신 등록, 경로와 응답은 동일)
+router = APIRouter(
+    prefix="/api/v1/students",
+    tags=["students"],
+)
+
+@router.post("", response_model=schemas.Student, status_code=201)
+async def create_student(
+    student: schemas.StudentCreate,
+    db: AsyncSession = Depends(get_async_db),
+    current_teacher: schemas.Teacher = Depends(get_current_teacher_async)
+):
+    """
+    신규 학생 생성
+    """
+    return await crud_async.create_student(
+        db=db, student=student, teacher_id=current_teacher.teacher_id
+    )
+
+
+@router.get("", response_model=List[schemas.Student])
+async def read_my_students(
+    response: Response,
+    cursor: Optional[str] = None,
+    limit: int = Query(STUDENT_PAGE_SIZE, ge=1, le=STUDENT_PAGE_MAX),
+    db: AsyncSession = Depends(get_async_db),
+    current_teacher: schemas.Teacher = Depends(get_current_teacher_async)
+):
+    """
+    전체 학생 목록 조회 (학생별 수업 기록과 피드백 포함, X-Next-Cursor 커서 페이지)
+    """
+    students = await crud_async.get_students_by_teacher(
+        db,
+        teacher_id=current_teacher.teacher_id,
+        limit=limit + 1,
+        after_student_id=_after_student_id(cursor)
+    )
+    return paginate(response, students, limit, key=lambda student: [student.student_id])
+
+@router.get("/summary", response_model=List[schemas.StudentListItem])
+async def read_my_student_list(
+    response: Response,
+    cursor: Optional[str] = None,
+    limit: int = Query(STUDENT_PAGE_SIZE, ge=1, le=STUDENT_PAGE_MAX),
+    db: AsyncSession = Depends(get_async_db),
+    current_teacher: schemas.Teacher = Depends(get_current_teacher_async)
+):
+    """
+    학생 목록 조회 (이름, 학년만 포함하는 목록 화면용)
+    """
+    students = await crud_async.get_student_list_by_teacher(
+        db,
+        teacher_id=current_teacher.teacher_id,
+        limit=limit + 1,
+        after_student_id=_after_student_id(cursor)
+    )
+    return paginate(response, students, limit, key=lambda student: [student.student_id])
+
+@router.get("/{student_id}", response_model=schemas.Student)
+async def read_student(
+    student_id: int,
+    db: AsyncSession = Depends(get_async_db),
+    current_teacher: schemas.Teacher = Depends(get_current_teacher_async)
+):
+    """
+    ID로 특정 학생 정보 조회
+    """
+    db_student = await crud_async.get_student_with_classes(
+        db, student_id=student_id, teacher_id=current_teacher.teacher_id
+    )
+    if db_student is None:
+        raise HTTPException(status_code=404, detail="Student not found")
+    return db_student
+
+
+@router.put("/{student_id}", response_model=schemas.Student)
+async def update_student(
+    student_id: int,
+    student_update: schemas.StudentUpdate,
+    db: AsyncSession = Depends(get_async_db),
+    current_teacher: schemas.Teacher = Depends(get_current_teacher_async)
+):
+    """
+    특정 학생 정보 수정 (이름, 학년)
+    """
+    db_student = await crud_async.update_student(
+        db, student_id=student_id, student_update=student_update, teacher_id=current_teacher.teacher_id
+    )
+    if db_student is None:
+        raise HTTPException(status_code=404, detail="Student not found or not authorized")
+    return db_student
+
+
+@router.delete("/{student_id}", status_code=status.HTTP_204_NO_CONTENT)
+async def delete_student(
+    student_id: int,
+    db: AsyncSession = Depends(get_async_db),
+    current_teacher: schemas.Teacher = Depends(get_current_teacher_async)
+):
+    """
+    특정 학생 정보 삭제
+    """
+    db_student = await crud_async.delete_student(
+        db, student_id=student_id, teacher_id=current_teacher.teacher_id
+    )
+    if db_student is None:
+        raise HTTPException(status_code=404, detail="Student not found or not authorized")
+    return Response(status_code=status.HTTP_204_NO_CONTENT)
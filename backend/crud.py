@@ -1,6 +1,11 @@
-from sqlalchemy.orm import Session, joinedload
+import json
+from datetime import date, datetime
+from sqlalchemy import and_, or_
+from sqlalchemy.exc import IntegrityError
+from sqlalchemy.orm import Session, contains_eager, joinedload, selectinload
 from . import models, schemas
-from .security import get_password_hash
+from .password_hasher import password_hasher
+from core_logic import student_summary
 
 def get_teacher_by_email(db: Session, email: str):
     """
@@ -12,9 +17,9 @@ def get_teacher_by_email(db: Session, email: str):
 def create_teacher(db: Session, teacher: schemas.TeacherCreate):
     """
     새로운 선생님 사용자를 생성합니다.
-    입력받은 비밀번호를 해싱하여 저장합니다.
+    입력받은 비밀번호를 해싱 워커 풀에서 해싱하여 저장합니다.
     """
-    hashed_password = get_password_hash(teacher.password)
+    hashed_password = password_hasher.hash_password(teacher.password)
     db_teacher = models.Teacher(
         email=teacher.email,
         name=teacher.name,
@@ -34,13 +39,49 @@ def get_student(db: Session, student_id: int, teacher_id: int):
         models.Student.teacher_id == teacher_id
     ).first()
 
-def get_students_by_teacher(db: Session, teacher_id: int, skip: int = 0, limit: int = 100):
+def _student_detail_options():
     """
-    특정 선생님에게 속한 모든 학생의 정보를 조회
+    학생 응답(schemas.Student)에 포함되는 학년, 수업, 피드백을 함께 조회하는 옵션
+    (학생/수업마다 지연 로딩 쿼리가 실행되지 않도록 학생 수와 관계없이 고정된 쿼리 수로 조회)
     """
-    return db.query(models.Student).filter(
-        models.Student.teacher_id == teacher_id
-    ).offset(skip).limit(limit).all()
+    return (
+        joinedload(models.Student.grade_info),
+        selectinload(models.Student.classes).joinedload(models.Class.feedback),
+    )
+
+def get_student_with_classes(db: Session, student_id: int, teacher_id: int):
+    """
+    ID로 특정 학생 한 명의 정보를 학년, 수업 기록, 피드백과 함께 조회
+    """
+    return db.query(models.Student)\
+        .options(*_student_detail_options())\
+        .filter(
+            models.Student.student_id == student_id,
+            models.Student.teacher_id == teacher_id
+        ).first()
+
+def get_students_by_teacher(db: Session, teacher_id: int, limit: int = 100, after_student_id: int = None):
+    """
+    특정 선생님에게 속한 학생의 정보를 학년, 수업 기록, 피드백과 함께 student_id 순으로 조회
+    after_student_id: 이전 페이지의 마지막 학생 ID (키셋 페이지네이션, 깊은 페이지도 첫 페이지와 같은 비용)
+    """
+    query = db.query(models.Student)\
+        .options(*_student_detail_options())\
+        .filter(models.Student.teacher_id == teacher_id)
+    if after_student_id is not None:
+        query = query.filter(models.Student.student_id > after_student_id)
+    return query.order_by(models.Student.student_id).limit(limit).all()
+
+def get_student_list_by_teacher(db: Session, teacher_id: int, limit: int = 100, after_student_id: int = None):
+    """
+    특정 선생님의 학생 목록을 학년 정보만 함께 student_id 순으로 조회 (수업 기록 제외, 목록 화면용)
+    """
+    query = db.query(models.Student)\
+        .options(joinedload(models.Student.grade_info))\
+        .filter(models.Student.teacher_id == teacher_id)
+    if after_student_id is not None:
+        query = query.filter(models.Student.student_id > after_student_id)
+    return query.order_by(models.Student.student_id).limit(limit).all()
 
 def create_student(db: Session, student: schemas.StudentCreate, teacher_id: int):
     """
@@ -50,6 +91,8 @@ def create_student(db: Session, student: schemas.StudentCreate, teacher_id: int)
         **student.dict(),
         teacher_id=teacher_id
     )
+    # 빈 요약 행을 함께 만들어 첫 수업 저장부터 요약 행을 잠그고 갱신할 수 있도록 함
+    db_student.summary = new_student_summary()
     db.add(db_student)
     db.commit()
     db.refresh(db_student)
@@ -95,45 +138,239 @@ def get_student_past_classes(db: Session, student_id: int, limit: int = 5):
         .limit(limit)\
         .all()
 
-def create_class_and_feedback(db: Session, student_id: int, teacher_id: int, class_info: schemas.ClassCreate, feedback_info: schemas.FeedbackCreate):
+def create_class_and_feedback(db: Session, student_id: int, teacher_id: int, class_info: schemas.ClassCreate, feedback_info: schemas.FeedbackCreate, ai_comments: dict = None):
     """
-    수업 기록 및 피드백 생성
+    수업 기록 및 피드백을 하나의 트랜잭션으로 생성
+    두 행을 한 번에 flush하여 DB가 생성한 ID를 추가 조회 없이 사용하고, 학생 요약 갱신과 함께 한 번만 커밋
+    ai_comments: 피드백과 함께 저장할 코멘트 (예: 규칙 기반 초안)
+    생성된 (class_id, feedback_id)를 반환 (커밋 후 만료된 객체를 다시 조회하지 않도록 ID만 반환)
     """
-    # 수업 기록(Class) 생성
     db_class = models.Class(
         student_id=student_id,
         teacher_id=teacher_id,
         **class_info.dict()
     )
+    db_class.feedback = models.Feedback(**feedback_info.dict())
+    _set_ai_comments(db_class.feedback, ai_comments)
     db.add(db_class)
+    db.flush()
+
+    add_class_to_student_summary(db, db_class, db_class.feedback)
+    created_ids = (db_class.class_id, db_class.feedback.feedback_id)
     db.commit()
-    db.refresh(db_class)
+    return created_ids
+
+def _set_ai_comments(db_feedback: models.Feedback, ai_comments: dict = None):
+    """새 피드백 행에 함께 저장할 코멘트 설정 (없으면 비워 둠)"""
+    if ai_comments:
+        db_feedback.ai_comment_improvement = ai_comments.get("improvement")
+        db_feedback.ai_comment_attitude = ai_comments.get("attitude")
+        db_feedback.ai_comment_overall = ai_comments.get("overall")
 
-    # 피드백(Feedback) 생성
-    db_feedback = models.Feedback(
-        class_id=db_class.class_id,
-        **feedback_info.dict()
+def _compact_class_record(db_class: models.Class, db_feedback: models.Feedback):
+    """수업 기록과 점수를 요약에 보관하는 형식으로 변환"""
+    return student_summary.compact_record(
+        db_class.class_id,
+        db_class.class_date,
+        {key: getattr(db_feedback, key) for key in student_summary.SCORE_KEYS},
+        db_class.progress_text,
+        db_class.class_memo
     )
-    db.add(db_feedback)
+
+def _summary_to_dict(db_summary: models.StudentSummary):
+    return {
+        "class_count": db_summary.class_count,
+        "archived_count": db_summary.archived_count,
+        "score_sums": {
+            key: getattr(db_summary, f"{key}_sum") for key in student_summary.SCORE_KEYS
+        },
+        "first_date": str(db_summary.first_class_date) if db_summary.first_class_date else None,
+        "recent": json.loads(db_summary.recent_records or "[]"),
+        "topics": json.loads(db_summary.digest or "[]"),
+    }
+
+def _store_summary(db_summary: models.StudentSummary, summary: dict):
+    db_summary.class_count = summary["class_count"]
+    db_summary.archived_count = summary["archived_count"]
+    for key in student_summary.SCORE_KEYS:
+        setattr(db_summary, f"{key}_sum", summary["score_sums"][key])
+    db_summary.first_class_date = date.fromisoformat(summary["first_date"]) if summary["first_date"] else None
+    db_summary.recent_records = json.dumps(summary["recent"], ensure_ascii=False)
+    db_summary.digest = json.dumps(summary["topics"], ensure_ascii=False)
+
+def new_student_summary():
+    """새 학생의 빈 요약 행"""
+    db_summary = models.StudentSummary()
+    _store_summary(db_summary, student_summary.empty_summary())
+    return db_summary
+
+def _lock_student_summary(db: Session, student_id: int):
+    """학생 요약 행을 잠그고 조회 (없으면 None)"""
+    return db.query(models.StudentSummary)\
+        .filter(models.StudentSummary.student_id == student_id)\
+        .with_for_update()\
+        .first()
+
+def _build_student_summary(db: Session, student_id: int, new_record: dict = None):
+    """
+    학생의 전체 수업 기록으로 요약을 새로 만들어 세션에 추가
+    (요약 테이블이 생기기 전에 등록된 학생의 최초 1회만 전체 기록을 읽음)
+    new_record: 아직 커밋되지 않은 새 수업 기록 (조회 대상에서 빼고 마지막에 반영)
+    """
+    query = db.query(models.Class, models.Feedback)\
+        .join(models.Feedback, models.Feedback.class_id == models.Class.class_id)\
+        .filter(models.Class.student_id == student_id)
+    if new_record is not None:
+        query = query.filter(models.Class.class_id != new_record["class_id"])
+    records = [
+        _compact_class_record(db_class, db_feedback)
+        for db_class, db_feedback in query.order_by(models.Class.class_date, models.Class.class_id).all()
+    ]
+    if new_record is not None:
+        records.append(new_record)
+    summary = student_summary.build_summary(records)
+    db_summary = models.StudentSummary(student_id=student_id)
+    _store_summary(db_summary, summary)
+    db.add(db_summary)
+    return db_summary, summary
+
+def add_class_to_student_summary(db: Session, db_class: models.Class, db_feedback: models.Feedback):
+    """
+    새 수업 기록을 학생 요약에 반영 (커밋은 호출한 쪽에서 수업 기록과 함께 처리)
+    동시에 같은 학생의 수업이 저장되어도 갱신이 유실되지 않도록 요약 행을 잠그고 갱신
+    요약 행이 없던 학생(요약 도입 전 등록)이면 새로 만들며, 동시에 다른 요청이 먼저 만들었으면
+    그 행을 다시 잠그고 갱신
+    """
+    record = _compact_class_record(db_class, db_feedback)
+    db_summary = _lock_student_summary(db, db_class.student_id)
+    if db_summary is None:
+        try:
+            with db.begin_nested():
+                _build_student_summary(db, db_class.student_id, new_record=record)
+            return
+        except IntegrityError:
+            db_summary = _lock_student_summary(db, db_class.student_id)
+
+    _store_summary(db_summary, student_summary.add_record(_summary_to_dict(db_summary), record))
+
+def get_student_summary(db: Session, student_id: int):
+    """
+    AI 피드백 프롬프트에 사용할 학생 요약 조회 (dict)
+    요약이 없으면 전체 기록으로 만들어 저장
+    """
+    db_summary = db.query(models.StudentSummary)\
+        .filter(models.StudentSummary.student_id == student_id)\
+        .first()
+    if db_summary is not None:
+        return _summary_to_dict(db_summary)
+
+    try:
+        with db.begin_nested():
+            _, summary = _build_student_summary(db, student_id)
+    except IntegrityError:
+        # 동시에 다른 요청이 먼저 만든 요약 사용
+        db_summary = db.query(models.StudentSummary)\
+            .filter(models.StudentSummary.student_id == student_id)\
+            .first()
+        summary = _summary_to_dict(db_summary)
     db.commit()
-    db.refresh(db_feedback)
+    return summary
 
-    return db_class
+def get_student_names_by_teacher(db: Session, student_ids: list, teacher_id: int):
+    """
+    주어진 학생 ID 중 해당 선생님 소유인 학생의 {학생 ID: 이름}을 조회
+    (이름은 규칙 기반 피드백 초안에 사용)
+    """
+    rows = db.query(models.Student.student_id, models.Student.name).filter(
+        models.Student.student_id.in_(student_ids),
+        models.Student.teacher_id == teacher_id
+    ).all()
+    return {row.student_id: row.name for row in rows}
 
-def update_feedback_with_ai_comment(db: Session, feedback_id: int, ai_comments: dict, teacher_id: int):
+def _lock_student_summaries(db: Session, student_ids: list):
     """
-    AI가 생성한 코멘트를 기존 피드백 레코드에 업데이트
+    여러 학생의 요약 행을 학생 ID 순서로 잠그고 {학생 ID: 요약 행}으로 반환 (없는 학생은 빠짐)
+    요청마다 같은 순서로 잠가 일괄 저장끼리 교착 상태가 생기지 않도록 함
     """
-    # 소유권 확인
-    db_feedback = get_feedback(db, feedback_id=feedback_id, teacher_id=teacher_id)
+    rows = db.query(models.StudentSummary)\
+        .filter(models.StudentSummary.student_id.in_(student_ids))\
+        .order_by(models.StudentSummary.student_id)\
+        .with_for_update()\
+        .all()
+    return {row.student_id: row for row in rows}
 
-    if db_feedback:
-        db_feedback.ai_comment_improvement = ai_comments.get("improvement")
-        db_feedback.ai_comment_attitude = ai_comments.get("attitude")
-        db_feedback.ai_comment_overall = ai_comments.get("overall")
-        db.commit()
-        db.refresh(db_feedback)
-    return db_feedback
+def create_classes_and_feedbacks(db: Session, teacher_id: int, items: list):
+    """
+    여러 학생의 수업 기록 및 피드백을 하나의 트랜잭션으로 생성
+    items: (student_id, ClassCreate, FeedbackCreate, ai_comments) 목록
+    (ai_comments: 피드백과 함께 저장할 코멘트, 예: 규칙 기반 초안)
+    생성된 (class_id, feedback_id) 목록을 items 순서대로 반환
+    학생 요약은 수업을 추가하기 전에 학생별로 한 번 잠그고(없으면 기존 기록으로 만들고)
+    이번 요청의 수업을 차례로 반영하여 학생당 한 번 저장
+    """
+    student_ids = sorted({student_id for student_id, _, _, _ in items})
+    db_summaries = _lock_student_summaries(db, student_ids)
+    for student_id in student_ids:
+        if student_id in db_summaries:
+            continue
+        # 요약 도입 전 등록된 학생: 이번 요청의 수업이 추가되기 전의 기록으로 한 번만 생성
+        try:
+            with db.begin_nested():
+                db_summaries[student_id], _ = _build_student_summary(db, student_id)
+        except IntegrityError:
+            # 동시에 다른 요청이 먼저 만든 요약을 잠그고 사용
+            db_summaries[student_id] = _lock_student_summary(db, student_id)
+    summaries = {
+        student_id: _summary_to_dict(db_summary) for student_id, db_summary in db_summaries.items()
+    }
+
+    db_classes = []
+    for student_id, class_info, feedback_info, ai_comments in items:
+        db_class = models.Class(
+            student_id=student_id,
+            teacher_id=teacher_id,
+            **class_info.dict()
+        )
+        db_class.feedback = models.Feedback(**feedback_info.dict())
+        _set_ai_comments(db_class.feedback, ai_comments)
+        db_classes.append(db_class)
+
+    db.add_all(db_classes)
+    db.flush()
+    for db_class in db_classes:
+        summaries[db_class.student_id] = student_summary.add_record(
+            summaries[db_class.student_id], _compact_class_record(db_class, db_class.feedback)
+        )
+    for student_id, summary in summaries.items():
+        _store_summary(db_summaries[student_id], summary)
+    created_ids = [(db_class.class_id, db_class.feedback.feedback_id) for db_class in db_classes]
+    db.commit()
+    return created_ids
+
+def get_classes_with_feedback(db: Session, class_ids: list, teacher_id: int):
+    """
+    여러 수업 기록을 피드백과 함께 한 번에 조회
+    """
+    return db.query(models.Class)\
+        .options(joinedload(models.Class.feedback))\
+        .filter(
+            models.Class.class_id.in_(class_ids),
+            models.Class.teacher_id == teacher_id
+        ).all()
+
+def apply_ai_comments(db: Session, feedback_id: int, ai_comments: dict):
+    """
+    AI 코멘트를 피드백 기본 키로 바로 저장 (UPDATE 1회 + 커밋, 소유권 조인과 재조회 없음)
+    같은 요청에서 생성했거나 작업에 기록된 피드백처럼 소유권이 이미 확인된 경우에만 사용
+    """
+    db.query(models.Feedback)\
+        .filter(models.Feedback.feedback_id == feedback_id)\
+        .update({
+            models.Feedback.ai_comment_improvement: ai_comments.get("improvement"),
+            models.Feedback.ai_comment_attitude: ai_comments.get("attitude"),
+            models.Feedback.ai_comment_overall: ai_comments.get("overall"),
+        }, synchronize_session=False)
+    db.commit()
 
 def get_feedback(db: Session, feedback_id: int, teacher_id: int):
     """
@@ -146,19 +383,31 @@ def get_feedback(db: Session, feedback_id: int, teacher_id: int):
             models.Class.teacher_id == teacher_id
         ).first()
         
-def get_feedbacks_by_student(db: Session, student_id: int):
+def get_feedbacks_by_student(db: Session, student_id: int, limit: int = None, before: tuple = None):
     """
-    특정 학생의 모든 피드백 조회
+    특정 학생의 피드백을 최근 수업 순서((class_date, class_id) 내림차순)로 조회
+    limit: 최대 조회 건수 (None이면 전체)
+    before: 이전 페이지의 마지막 (class_date, class_id) (키셋 페이지네이션)
     """
-    return db.query(models.Feedback)\
-        .join(models.Class)\
-        .filter(models.Class.student_id == student_id)\
-        .order_by(models.Class.class_date.desc())\
-        .all()
+    query = db.query(models.Feedback)\
+        .join(models.Feedback.class_record)\
+        .options(contains_eager(models.Feedback.class_record))\
+        .filter(models.Class.student_id == student_id)
+    if before is not None:
+        class_date, class_id = before
+        query = query.filter(or_(
+            models.Class.class_date < class_date,
+            and_(models.Class.class_date == class_date, models.Class.class_id < class_id)
+        ))
+    query = query.order_by(models.Class.class_date.desc(), models.Class.class_id.desc())
+    if limit is not None:
+        query = query.limit(limit)
+    return query.all()
 
 def update_feedback(db: Session, feedback_id: int, feedback_update: schemas.FeedbackUpdate, teacher_id: int):
     """
     기존 피드백 수정
+    수정할 수 있는 값은 AI 코멘트뿐이고 학생 요약에는 점수와 수업 내용만 보관하므로 요약은 그대로 유지
     """
     # 소유권 확인
     db_feedback = get_feedback(db, feedback_id=feedback_id, teacher_id=teacher_id)
@@ -173,4 +422,81 @@ def update_feedback(db: Session, feedback_id: int, feedback_update: schemas.Feed
 
 def get_grade(db: Session, grade_id: int):
     """ID로 특정 학년 정보를 조회"""
-    return db.query(models.Grade).filter(models.Grade.grade_id == grade_id).first()
\ No newline at end of file
+    return db.query(models.Grade).filter(models.Grade.grade_id == grade_id).first()
+
+def create_feedback_job(db: Session, feedback_id: int, student_id: int, teacher_id: int, use_cache: bool = True):
+    """
+    AI 피드백 생성 작업(pending) 등록
+    """
+    db_job = models.FeedbackJob(
+        feedback_id=feedback_id,
+        student_id=student_id,
+        teacher_id=teacher_id,
+        use_cache=use_cache,
+        status=models.FeedbackJob.STATUS_PENDING
+    )
+    db.add(db_job)
+    db.commit()
+    db.refresh(db_job)
+    return db_job
+
+def get_feedback_job(db: Session, job_id: int, teacher_id: int):
+    """
+    ID로 특정 피드백 생성 작업 조회 (소유권 확인 포함)
+    """
+    return db.query(models.FeedbackJob).filter(
+        models.FeedbackJob.job_id == job_id,
+        models.FeedbackJob.teacher_id == teacher_id
+    ).first()
+
+def _claimable_job(expired_before: datetime):
+    """
+    워커가 가져갈 수 있는 작업 조건
+    pending 작업과, 임대(claimed_at)가 expired_before 이전에 마지막으로 갱신된 running 작업 (처리하던 워커가 중단된 작업)
+    """
+    return or_(
+        models.FeedbackJob.status == models.FeedbackJob.STATUS_PENDING,
+        and_(
+            models.FeedbackJob.status == models.FeedbackJob.STATUS_RUNNING,
+            or_(
+                models.FeedbackJob.claimed_at.is_(None),
+                models.FeedbackJob.claimed_at < expired_before
+            )
+        )
+    )
+
+def get_reclaimable_feedback_jobs(db: Session, expired_before: datetime):
+    """
+    다시 처리해야 할 작업 목록 조회 (pending 작업과 임대가 만료된 running 작업)
+    서버 재시작 시 중단된 작업을 다시 처리하는 데 사용하며, 다른 워커가 처리 중인 작업은 제외
+    """
+    return db.query(models.FeedbackJob).filter(
+        _claimable_job(expired_before)
+    ).order_by(models.FeedbackJob.job_id).all()
+
+def claim_feedback_job(db: Session, job_id: int, expired_before: datetime):
+    """
+    작업을 running으로 바꾸고 임대를 시작 (조건부 UPDATE 한 번으로 처리하여 한 워커만 성공)
+    이미 완료되었거나 다른 워커가 처리 중이면 False
+    """
+    now = datetime.now()
+    claimed = db.query(models.FeedbackJob).filter(
+        models.FeedbackJob.job_id == job_id,
+        _claimable_job(expired_before)
+    ).update({
+        models.FeedbackJob.status: models.FeedbackJob.STATUS_RUNNING,
+        models.FeedbackJob.started_at: now,
+        models.FeedbackJob.claimed_at: now
+    }, synchronize_session=False)
+    db.commit()
+    return claimed == 1
+
+def renew_feedback_job_leases(db: Session, job_ids: list):
+    """
+    처리 중인 작업들의 임대 시각을 현재 시각으로 갱신
+    """
+    db.query(models.FeedbackJob).filter(
+        models.FeedbackJob.job_id.in_(job_ids),
+        models.FeedbackJob.status == models.FeedbackJob.STATUS_RUNNING
+    ).update({models.FeedbackJob.claimed_at: datetime.now()}, synchronize_session=False)
+    db.commit()
@@ -0,0 +1,195 @@
+from sqlalchemy import and_, or_, select, update
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import contains_eager, joinedload
+from . import crud, models, schemas
+
+# crud.py의 비동기(AsyncSession) 버전 (DB_ASYNC=true일 때 async 라우트에서 사용)
+# AsyncSession은 지연 로딩을 할 수 없으므로 응답에 필요한 관계는 모두 조회 시 함께 로딩
+# 학생 요약 갱신처럼 동기 코드와 공유하는 복잡한 로직은 run_sync로 crud.py 함수를 그대로 실행
+
+async def get_teacher_by_email(db: AsyncSession, email: str):
+    """
+    이메일로 특정 선생님의 정보를 조회합니다.
+    """
+    result = await db.execute(select(models.Teacher).where(models.Teacher.email == email))
+    return result.scalars().first()
+
+async def get_student(db: AsyncSession, student_id: int, teacher_id: int):
+    """
+    ID로 특정 학생 한 명의 정보를 조회
+    """
+    result = await db.execute(
+        select(models.Student).where(
+            models.Student.student_id == student_id,
+            models.Student.teacher_id == teacher_id
+        )
+    )
+    return result.scalars().first()
+
+async def get_student_with_classes(db: AsyncSession, student_id: int, teacher_id: int):
+    """
+    ID로 특정 학생 한 명의 정보를 학년, 수업 기록, 피드백과 함께 조회
+    """
+    result = await db.execute(
+        select(models.Student)
+        .options(*crud._student_detail_options())
+        .where(
+            models.Student.student_id == student_id,
+            models.Student.teacher_id == teacher_id
+        )
+        .execution_options(populate_existing=True)
+    )
+    return result.scalars().first()
+
+async def get_students_by_teacher(db: AsyncSession, teacher_id: int, limit: int = 100, after_student_id: int = None):
+    """
+    특정 선생님에게 속한 학생의 정보를 학년, 수업 기록, 피드백과 함께 student_id 순으로 조회
+    after_student_id: 이전 페이지의 마지막 학생 ID (키셋 페이지네이션)
+    """
+    query = select(models.Student)\
+        .options(*crud._student_detail_options())\
+        .where(models.Student.teacher_id == teacher_id)
+    if after_student_id is not None:
+        query = query.where(models.Student.student_id > after_student_id)
+    result = await db.execute(query.order_by(models.Student.student_id).limit(limit))
+    return result.scalars().unique().all()
+
+async def get_student_list_by_teacher(db: AsyncSession, teacher_id: int, limit: int = 100, after_student_id: int = None):
+    """
+    특정 선생님의 학생 목록을 학년 정보만 함께 student_id 순으로 조회 (목록 화면용)
+    """
+    query = select(models.Student)\
+        .options(joinedload(models.Student.grade_info))\
+        .where(models.Student.teacher_id == teacher_id)
+    if after_student_id is not None:
+        query = query.where(models.Student.student_id > after_student_id)
+    result = await db.execute(query.order_by(models.Student.student_id).limit(limit))
+    return result.scalars().all()
+
+async def create_student(db: AsyncSession, student: schemas.StudentCreate, teacher_id: int):
+    """
+    새로운 학생 정보 생성 (응답에 필요한 학년, 수업 기록과 함께 반환)
+    """
+    db_student = models.Student(
+        **student.dict(),
+        teacher_id=teacher_id
+    )
+    db_student.summary = crud.new_student_summary()
+    db.add(db_student)
+    await db.commit()
+    return await get_student_with_classes(db, db_student.student_id, teacher_id)
+
+async def update_student(db: AsyncSession, student_id: int, student_update: schemas.StudentUpdate, teacher_id: int):
+    """
+    기존 학생 정보 수정
+    """
+    # 소유권 확인
+    db_student = await get_student(db, student_id=student_id, teacher_id=teacher_id)
+    if db_student is None:
+        return None
+
+    update_data = student_update.dict(exclude_unset=True)
+    for key, value in update_data.items():
+        setattr(db_student, key, value)
+    await db.commit()
+    return await get_student_with_classes(db, student_id, teacher_id)
+
+async def delete_student(db: AsyncSession, student_id: int, teacher_id: int):
+    """
+    특정 학생 정보 삭제 (수업 기록, 피드백, 요약은 cascade로 함께 삭제)
+    """
+    # 소유권 확인 (cascade 삭제를 위해 하위 기록을 함께 로딩)
+    db_student = await get_student_with_classes(db, student_id=student_id, teacher_id=teacher_id)
+    if db_student:
+        await db.run_sync(lambda session: session.delete(db_student))
+        await db.commit()
+    return db_student
+
+async def create_class_and_feedback(db: AsyncSession, student_id: int, teacher_id: int, class_info: schemas.ClassCreate, feedback_info: schemas.FeedbackCreate, ai_comments: dict = None):
+    """
+    수업 기록 및 피드백을 하나의 트랜잭션으로 생성 (crud.create_class_and_feedback과 같은 쿼리와 커밋)
+    생성된 (class_id, feedback_id)를 반환
+    """
+    return await db.run_sync(
+        lambda session: crud.create_class_and_feedback(
+            session, student_id, teacher_id, class_info, feedback_info, ai_comments
+        )
+    )
+
+async def get_student_summary(db: AsyncSession, student_id: int):
+    """
+    AI 피드백 프롬프트에 사용할 학생 요약 조회 (dict, 요약이 없으면 만들어 저장)
+    """
+    return await db.run_sync(lambda session: crud.get_student_summary(session, student_id))
+
+async def apply_ai_comments(db: AsyncSession, feedback_id: int, ai_comments: dict):
+    """
+    AI 코멘트를 피드백 기본 키로 바로 저장 (UPDATE 1회 + 커밋)
+    소유권이 이미 확인된 피드백에만 사용
+    """
+    await db.execute(
+        update(models.Feedback)
+        .where(models.Feedback.feedback_id == feedback_id)
+        .values(
+            ai_comment_improvement=ai_comments.get("improvement"),
+            ai_comment_attitude=ai_comments.get("attitude"),
+            ai_comment_overall=ai_comments.get("overall"),
+        )
+        .execution_options(synchronize_session=False)
+    )
+    await db.commit()
+
+async def get_feedbacks_by_student(db: AsyncSession, student_id: int, limit: int = None, before: tuple = None):
+    """
+    특정 학생의 피드백을 최근 수업 순서((class_date, class_id) 내림차순)로 조회
+    before: 이전 페이지의 마지막 (class_date, class_id) (키셋 페이지네이션)
+    """
+    query = select(models.Feedback)\
+        .join(models.Feedback.class_record)\
+        .options(contains_eager(models.Feedback.class_record))\
+        .where(models.Class.student_id == student_id)
+    if before is not None:
+        class_date, class_id = before
+        query = query.where(or_(
+            models.Class.class_date < class_date,
+            and_(models.Class.class_date == class_date, models.Class.class_id < class_id)
+        ))
+    query = query.order_by(models.Class.class_date.desc(), models.Class.class_id.desc())
+    if limit is not None:
+        query = query.limit(limit)
+    result = await db.execute(query)
+    return result.scalars().all()
+
+async def get_grade(db: AsyncSession, grade_id: int):
+    """ID로 특정 학년 정보를 조회"""
+    return await db.get(models.Grade, grade_id)
+
+async def create_feedback_job(db: AsyncSession, feedback_id: int, student_id: int, teacher_id: int, use_cache: bool = True):
+    """
+    AI 피드백 생성 작업(pending) 등록 (응답에 필요한 피드백과 함께 반환)
+    """
+    db_job = models.FeedbackJob(
+        feedback_id=feedback_id,
+        student_id=student_id,
+        teacher_id=teacher_id,
+        use_cache=use_cache,
+        status=models.FeedbackJob.STATUS_PENDING
+    )
+    db.add(db_job)
+    await db.commit()
+    return await get_feedback_job(db, db_job.job_id, teacher_id)
+
+async def get_feedback_job(db: AsyncSession, job_id: int, teacher_id: int):
+    """
+    ID로 특정 피드백 생성 작업을 피드백과 함께 조회 (소유권 확인 포함)
+    """
+    result = await db.execute(
+        select(models.FeedbackJob)
+        .options(joinedload(models.FeedbackJob.feedback))
+        .where(
+            models.FeedbackJob.job_id == job_id,
+            models.FeedbackJob.teacher_id == teacher_id
+        )
+        .execution_options(populate_existing=True)
+    )
+    return result.scalars().first()
@@ -1,8 +1,13 @@
+import itertools
 import os
+import threading
+import time
+from typing import Dict, Optional
+
 from dotenv import load_dotenv
-from sqlalchemy import create_engine
+from sqlalchemy import create_engine, event
 from sqlalchemy.ext.declarative import declarative_base
-from sqlalchemy.orm import sessionmaker
+from sqlalchemy.orm import Session, sessionmaker
 from sqlalchemy.pool import QueuePool
 
 load_dotenv()
@@ -18,30 +23,180 @@ DB_NAME = os.getenv("DB_NAME")  # 데이터베이스명
 SSL_CA = os.getenv("SSL_CA", "")  # RDS SSL 인증서 경로 (필요시)
 SSL_VERIFY = os.getenv("SSL_VERIFY", "false").lower() == "true"
 
+# 연결 풀 설정
+DB_POOL_SIZE = int(os.getenv("DB_POOL_SIZE", "10"))  # 기본 연결 풀 크기
+DB_MAX_OVERFLOW = int(os.getenv("DB_MAX_OVERFLOW", "20"))  # 최대 추가 연결 수
+DB_POOL_TIMEOUT = float(os.getenv("DB_POOL_TIMEOUT", "30"))  # 연결 대기 최대 시간(초)
+
+# DATABASE_URL이 설정되어 있으면 우선 사용 (로컬 개발, 벤치마크용 sqlite 등)
+DATABASE_URL = os.getenv("DATABASE_URL", "")
+
 # RDS 연결 URL 생성
-SQLALCHEMY_DATABASE_URL = f"mysql+pymysql://{DB_USER}:{DB_PASSWORD}@{DB_HOST}:{DB_PORT}/{DB_NAME}"
+SQLALCHEMY_DATABASE_URL = DATABASE_URL or f"mysql+pymysql://{DB_USER}:{DB_PASSWORD}@{DB_HOST}:{DB_PORT}/{DB_NAME}"
+
+# 비동기 DB 모드 (true이면 주요 API가 AsyncSession을 사용하는 async 라우트로 동작)
+DB_ASYNC_ENABLED = os.getenv("DB_ASYNC", "false").lower() == "true"
+# 비동기 드라이버 URL (기본: 동기 URL의 드라이버만 교체, pymysql → aiomysql / sqlite → aiosqlite)
+ASYNC_DATABASE_URL = os.getenv("ASYNC_DATABASE_URL", "") or SQLALCHEMY_DATABASE_URL\
+    .replace("mysql+pymysql://", "mysql+aiomysql://", 1)\
+    .replace("sqlite://", "sqlite+aiosqlite://", 1)
 
-# RDS에 최적화된 SQLAlchemy 엔진 생성
-engine = create_engine(
-    SQLALCHEMY_DATABASE_URL,
-    connect_args={
+# 읽기 전용 복제본 URL 목록 (쉼표 구분, 비어 있으면 모든 요청이 primary 사용)
+DB_REPLICA_URLS = [url.strip() for url in os.getenv("DB_REPLICA_URLS", "").split(",") if url.strip()]
+# 선생님이 쓰기를 커밋한 뒤 그 선생님의 조회를 primary로 보내는 시간(초, 복제 지연보다 길게)
+DB_REPLICA_STICKY_SECONDS = float(os.getenv("DB_REPLICA_STICKY_SECONDS", "5"))
+
+def _connect_args(url: str) -> dict:
+    if url.startswith("sqlite"):
+        # sqlite 연결을 여러 워커 스레드에서 사용
+        return {"check_same_thread": False}
+    return {
         "charset": "utf8mb4",
         "ssl": {
             "ssl_ca": SSL_CA if SSL_CA else None,
             "ssl_verify_cert": SSL_VERIFY,
         } if SSL_CA or SSL_VERIFY else {},
-    },
-    # RDS 연결 풀 설정
-    poolclass=QueuePool,
-    pool_size=10,  # 기본 연결 풀 크기
-    max_overflow=20,  # 최대 추가 연결 수
-    pool_pre_ping=True,  # 연결 상태 확인
-    pool_recycle=3600,  # 1시간마다 연결 재생성
-    echo=False,  # SQL 쿼리 로깅 (개발시 True로 설정)
-)
-
-# SessionLocal 클래스 생성
-SessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=engine)
+    }
+
+connect_args = _connect_args(SQLALCHEMY_DATABASE_URL)
+
+def _create_engine(url: str):
+    # RDS에 최적화된 SQLAlchemy 엔진 생성
+    return create_engine(
+        url,
+        connect_args=_connect_args(url),
+        # RDS 연결 풀 설정
+        poolclass=QueuePool,
+        pool_size=DB_POOL_SIZE,
+        max_overflow=DB_MAX_OVERFLOW,
+        pool_timeout=DB_POOL_TIMEOUT,
+        pool_pre_ping=True,  # 연결 상태 확인
+        pool_recycle=3600,  # 1시간마다 연결 재생성
+        echo=False,  # SQL 쿼리 로깅 (개발시 True로 설정)
+    )
+
+engine = _create_engine(SQLALCHEMY_DATABASE_URL)
+# 읽기 전용 복제본 엔진 (연결 풀 설정은 primary와 동일, 복제본마다 별도 풀)
+replica_engines = [_create_engine(url) for url in DB_REPLICA_URLS]
+
+class RoutingSession(Session):
+    """
+    복제본이 지정된 세션은 SELECT를 복제본으로 보내고, 쓰기는 항상 primary로 보내는 세션
+    한 번 쓰기(flush)를 한 세션은 이후 조회도 primary를 사용하여 자신이 쓴 데이터를 읽음
+    """
+
+    def __init__(self, *args, replica=None, **kwargs):
+        super().__init__(*args, **kwargs)
+        self.replica = replica
+
+    def get_bind(self, mapper=None, clause=None, **kwargs):
+        if (
+            self.replica is not None
+            and not self._flushing
+            and not self.info.get("wrote")
+            and not getattr(clause, "is_dml", False)
+        ):
+            return self.replica
+        return super().get_bind(mapper=mapper, clause=clause, **kwargs)
+
+# SessionLocal 클래스 생성 (기본은 primary만 사용, get_read_db에서 복제본 지정)
+SessionLocal = sessionmaker(class_=RoutingSession, autocommit=False, autoflush=False, bind=engine)
+
+# 쓰기를 커밋한 응답에 쓰기 시각(유닉스 시간, 초)을 담는 헤더
+# 클라이언트가 이후 요청에 그대로 보내면 요청을 받은 워커와 관계없이 DB_REPLICA_STICKY_SECONDS 동안 primary에서 조회
+LAST_WRITE_HEADER = "X-Last-Write"
+
+# 최근에 쓰기를 커밋한 선생님 (sticky_key → primary 고정 만료 시각)
+# 프로세스 단위이므로 같은 워커가 받은 조회에만 적용됨 (여러 워커에서는 LAST_WRITE_HEADER 필요)
+# 헤더를 받을 수 없는 쓰기(작업 큐의 AI 피드백 저장, 스트리밍 응답 이후의 저장)는 이 기록으로만 고정됨
+_recent_writes: Dict[str, float] = {}
+_recent_writes_lock = threading.Lock()
+_replica_cycle = itertools.cycle(replica_engines)
+_replica_cycle_lock = threading.Lock()
+
+def mark_recent_write(sticky_key: str) -> None:
+    """sticky_key의 조회를 DB_REPLICA_STICKY_SECONDS 동안 primary로 고정"""
+    now = time.monotonic()
+    with _recent_writes_lock:
+        _recent_writes[sticky_key] = now + DB_REPLICA_STICKY_SECONDS
+        # 만료된 항목 정리 (선생님 수만큼만 유지)
+        for key in [key for key, expires in _recent_writes.items() if expires <= now]:
+            del _recent_writes[key]
+
+def parse_last_write(value: Optional[str]) -> Optional[float]:
+    """LAST_WRITE_HEADER 값을 쓰기 시각으로 변환 (없거나 형식이 잘못되었으면 None)"""
+    try:
+        return float(value) if value else None
+    except ValueError:
+        return None
+
+def choose_replica(sticky_key: Optional[str] = None, last_write_at: Optional[float] = None):
+    """
+    조회에 사용할 복제본 엔진 (복제본 사이에서 순서대로 분산)
+    복제본이 없거나, 클라이언트가 보낸 쓰기 시각(last_write_at)이 DB_REPLICA_STICKY_SECONDS 이내이거나,
+    이 프로세스에서 sticky_key가 최근에 쓰기를 했으면 None (primary 사용)
+    """
+    if not replica_engines:
+        return None
+    # 서버 간 시계 오차를 감안해 앞뒤로 비교 (먼 미래 값으로 primary에 계속 고정되지 않도록)
+    if last_write_at is not None and abs(time.time() - last_write_at) < DB_REPLICA_STICKY_SECONDS:
+        return None
+    if sticky_key is not None:
+        with _recent_writes_lock:
+            if _recent_writes.get(sticky_key, 0) > time.monotonic():
+                return None
+    with _replica_cycle_lock:
+        return next(_replica_cycle)
+
+@event.listens_for(RoutingSession, "after_flush")
+def _remember_write(session, flush_context):
+    session.info["wrote"] = True
+    session.info["pending_write"] = True
+
+@event.listens_for(RoutingSession, "do_orm_execute")
+def _remember_bulk_write(orm_execute_state):
+    # flush를 거치지 않는 query.update()/delete()도 쓰기로 기록
+    if orm_execute_state.is_update or orm_execute_state.is_delete or orm_execute_state.is_insert:
+        orm_execute_state.session.info["wrote"] = True
+        orm_execute_state.session.info["pending_write"] = True
+
+@event.listens_for(RoutingSession, "after_commit")
+def _stick_to_primary(session):
+    # 요청한 선생님(get_teacher_db에서 sticky_key 지정)의 쓰기가 커밋되면 이후 조회를 primary로 고정
+    # 요청 세션이면(get_teacher_db에서 response 지정) 응답 헤더에 쓰기 시각을 담아 클라이언트가 다시 보내도록 함
+    if not session.info.pop("pending_write", False):
+        return
+    if session.info.get("sticky_key"):
+        mark_recent_write(session.info["sticky_key"])
+    response = session.info.get("response")
+    if response is not None:
+        response.headers[LAST_WRITE_HEADER] = f"{time.time():.3f}"
+
+@event.listens_for(RoutingSession, "after_rollback")
+def _forget_write(session):
+    session.info.pop("pending_write", None)
+
+# 비동기 엔진과 세션 (DB_ASYNC=true일 때만 생성하여 동기 모드에서는 비동기 드라이버가 필요 없음)
+async_engine = None
+AsyncSessionLocal = None
+if DB_ASYNC_ENABLED:
+    from sqlalchemy.ext.asyncio import async_sessionmaker, create_async_engine
+
+    # 동기 엔진과 같은 연결 풀 설정 (aiosqlite는 check_same_thread 옵션이 필요 없음)
+    async_engine = create_async_engine(
+        ASYNC_DATABASE_URL,
+        connect_args={} if ASYNC_DATABASE_URL.startswith("sqlite") else connect_args,
+        pool_size=DB_POOL_SIZE,
+        max_overflow=DB_MAX_OVERFLOW,
+        pool_timeout=DB_POOL_TIMEOUT,
+        pool_pre_ping=True,
+        pool_recycle=3600,
+        echo=False,
+    )
+    # 커밋 후에도 응답을 만들 수 있도록 객체를 만료시키지 않음 (async에서는 지연 로딩 불가)
+    AsyncSessionLocal = async_sessionmaker(
+        async_engine, autoflush=False, expire_on_commit=False
+    )
 
 # Base 클래스 생성
 Base = declarative_base()
@@ -54,6 +209,24 @@ def get_db():
     finally:
         db.close()
 
+# 조회 전용 세션 생성 (복제본이 있으면 SELECT를 복제본으로 보냄)
+# 최근에 쓰기를 커밋했으면(last_write_at 또는 sticky_key) 복제 지연으로 옛 데이터를 읽지 않도록 primary 사용
+def read_session(sticky_key: Optional[str] = None, last_write_at: Optional[float] = None):
+    db = SessionLocal(replica=choose_replica(sticky_key, last_write_at))
+    try:
+        yield db
+    finally:
+        db.close()
+
+# 조회 전용 데이터베이스 세션 생성 함수 (학년처럼 선생님과 무관한 조회용)
+def get_read_db():
+    yield from read_session()
+
+# 비동기 데이터베이스 세션 생성 함수 (DB_ASYNC=true일 때 async 라우트에서 사용)
+async def get_async_db():
+    async with AsyncSessionLocal() as db:
+        yield db
+
 # 데이터베이스 연결 테스트 함수
 def test_db_connection():
     """RDS 데이터베이스 연결을 테스트합니다."""
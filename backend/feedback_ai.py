@@ -1,120 +1,217 @@
 import re
+from functools import lru_cache
+from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy.orm import Session
-from typing import List, Dict, Any
-from . import crud, models
-from core_logic import feedback_system
-
-def _convert_orm_to_dict(past_classes: List[models.Class]) -> List[Dict]:
-    """SQLAlchemy ORM 객체 리스트를 표준 딕셔너리 리스트로 변환합니다."""
-    records = []
-    for cls in past_classes:
-        if cls.feedback:
-            records.append({
-                "date": cls.class_date,
-                "attitude_score": cls.feedback.attitude_score,
-                "understanding_score": cls.feedback.understanding_score,
-                "homework_score": cls.feedback.homework_score,
-                "qa_score": cls.feedback.qa_score,
-                "progress_text": cls.progress_text,
-                "class_memo": cls.class_memo,
-            })
-    return sorted(records, key=lambda x: x['date'])
-
-# def _parse_ai_response(ai_response_text: str) -> Dict[str, str]:
-#     """
-#     정규 표현식을 사용하여 AI 응답을 안정적으로 파싱하고 후처리합니다.
-#     """
-#     print(ai_response_text)
-#     try:
-#         improvement_match = re.search(r"1\..*?(?:수업보완|개선 방향).*?:(.*?)(?=2\..*?(?:수업태도|학습 자세)|$)", ai_response_text, re.DOTALL)
-#         attitude_match = re.search(r"2\..*?(?:수업태도|학습 자세).*?:(.*?)(?=3\..*?(?:전체 Comment|종합적 평가)|$)", ai_response_text, re.DOTALL)
-#         overall_match = re.search(r"3\..*?(?:전체 Comment|종합적 평가).*?:(.*)", ai_response_text, re.DOTALL)
-
-#         improvement = improvement_match.group(1).strip() if improvement_match else "내용 없음"
-#         attitude = attitude_match.group(1).strip() if attitude_match else "내용 없음"
-#         overall = overall_match.group(1).strip() if overall_match else "내용 없음"
-
-#         if not improvement and not attitude and not overall:
-#              overall = ai_response_text
-
-#         return {"improvement": improvement, "attitude": attitude, "overall": overall}
-
-#     except Exception:
-#         print("\n--- AI 응답 파싱 실패 ---")
-#         print(ai_response_text)
-#         print("------------------------\n")
-#         return {
-#             "improvement": "AI 응답을 파싱할 수 없습니다.",
-#             "attitude": "형식을 확인해주세요.",
-#             "overall": ai_response_text
-#         }
-
-def _parse_ai_response(ai_response_text: str) -> Dict[str, str]:
+from typing import List, Dict, Any, Iterator, Optional, Tuple
+from . import crud, crud_async, models
+from core_logic import draft_feedback, feedback_system, llm_pool, student_summary
+from core_logic.circuit_breaker import breaker
+
+def _clean_section(text: str) -> str:
+    """
+    섹션 응답 텍스트를 후처리합니다. (앞뒤 공백과 맨 앞의 **제목** 제거)
+    """
+    return re.sub(r'^\*\*.*?\*\*', '', text.strip()).strip()
+
+def generate_draft_feedback(
+    student_name: str,
+    current_class_info: Dict,
+    current_scores: Dict
+) -> Dict[str, str]:
+    """
+    LLM 없이 점수별 해석 가이드 문구로 피드백 초안을 즉시 생성합니다.
+    AI 피드백이 완성되기 전이나 LLM 호출이 실패했을 때 대신 저장합니다.
+    """
+    return draft_feedback.build_draft_feedback(
+        student_name,
+        current_scores,
+        progress_text=current_class_info.get("progress_text") or "",
+        class_memo=current_class_info.get("class_memo") or "",
+    )
+
+def _fill_failed_sections(
+    sections: Dict[str, feedback_system.SectionResult], draft: Dict[str, str]
+) -> Dict[str, str]:
+    """섹션별 생성 결과를 AI 코멘트로 변환하고, 실패했거나 비어 있는 섹션은 초안으로 채웁니다."""
+    filled = {}
+    for key in feedback_system.SECTION_KEYS:
+        result = sections.get(key)
+        text = _clean_section(result) if isinstance(result, str) else ""
+        if not text:
+            print(f"⚠️ {key} 섹션 생성 실패, 규칙 기반 초안으로 대체합니다.")
+            text = draft[key]
+        filled[key] = text
+    return filled
+
+@lru_cache(maxsize=None)
+def _get_analyzer() -> feedback_system.FeedbackSystem:
+    """요청마다 새로 만들지 않고 프로세스 전역에서 공유하는 FeedbackSystem"""
+    return feedback_system.FeedbackSystem()
+
+def _load_feedback_inputs(
+    student_id: int,
+    teacher_id: int,
+    db: Session,
+    current_class_info: Dict,
+    current_scores: Dict,
+    class_id: Optional[int] = None
+) -> Tuple[Dict, Dict, List[Dict]]:
     """
-    AI 응답을 안정적으로 파싱하고 후처리합니다.
-    현재 AI 응답 형식에 최적화되어 있습니다.
+    피드백 생성에 필요한 학생 정보, 현재 수업 정보, 과거 기록을 DB에서 조회합니다.
+    과거 기록은 수업 횟수와 관계없이 크기가 일정한 학생 요약(최근 기록 + 누적 통계)을 사용하며,
+    class_id(현재 수업)는 요약에서 제외합니다.
+    조회가 끝나면 트랜잭션을 끝내 LLM 응답을 기다리는 동안 DB 연결을 풀에 반환합니다.
+    (이후 같은 세션을 사용하면 새 연결로 짧은 트랜잭션이 시작됨)
     """
-    print(f"\n=== AI 응답 파싱 시작 ===")
-    print(f"원본 응답: {ai_response_text[:200]}...")
-    
-    try:
-        if "|||SECTION_SEPARATOR|||" in ai_response_text:
-            sections = ai_response_text.split("|||SECTION_SEPARATOR|||")
-            if len(sections) == 3:
-                improvement = sections[0].strip()
-                attitude = sections[1].strip()
-                overall = sections[2].strip()
-                
-                # 제목 부분 제거
-                improvement = re.sub(r'^\*\*.*?\*\*', '', improvement).strip()
-                attitude = re.sub(r'^\*\*.*?\*\*', '', attitude).strip()
-                overall = re.sub(r'^\*\*.*?\*\*', '', overall).strip()
-                
-                print(f"구분자 파싱 성공")
-                return {"improvement": improvement, "attitude": attitude, "overall": overall}
-        
-        return {
-            "improvement": "AI 응답을 파싱할 수 없습니다.",
-            "attitude": "형식을 확인해주세요.",
-            "overall": ai_response_text
-        }
-
-    except Exception as e:
-        print(f"\n--- AI 응답 파싱 중 예외 발생: {e} ---")
-        print(f"원본 응답: {ai_response_text}")
-        print("------------------------\n")
-        return {
-            "improvement": "AI 응답을 파싱할 수 없습니다.",
-            "attitude": "형식을 확인해주세요.",
-            "overall": ai_response_text
-        }
+    student_orm = crud.get_student(db, student_id, teacher_id)
+    summary = crud.get_student_summary(db, student_id)
+    grade_info = crud.get_grade(db, student_orm.grade_id)
+    # 커밋하면 조회한 객체가 만료되므로 입력을 먼저 구성
+    inputs = _feedback_inputs(student_orm, grade_info, summary, current_class_info, current_scores, class_id)
+    db.commit()
+    return inputs
+
+async def _aload_feedback_inputs(
+    student_id: int,
+    teacher_id: int,
+    db: AsyncSession,
+    current_class_info: Dict,
+    current_scores: Dict,
+    class_id: Optional[int] = None
+) -> Tuple[Dict, Dict, List[Dict]]:
+    """_load_feedback_inputs의 AsyncSession 버전 (조회 후 커밋하여 연결 반환)"""
+    student_orm = await crud_async.get_student(db, student_id, teacher_id)
+    summary = await crud_async.get_student_summary(db, student_id)
+    grade_info = await crud_async.get_grade(db, student_orm.grade_id)
+    inputs = _feedback_inputs(student_orm, grade_info, summary, current_class_info, current_scores, class_id)
+    await db.commit()
+    return inputs
+
+def _feedback_inputs(
+    student_orm: models.Student,
+    grade_info: models.Grade,
+    summary: Dict,
+    current_class_info: Dict,
+    current_scores: Dict,
+    class_id: Optional[int]
+) -> Tuple[Dict, Dict, List[Dict]]:
+    """조회한 학생, 학년, 요약으로 프롬프트 입력 구성"""
+    history = student_summary.exclude_class(summary, class_id)
+    student_info_dict = {
+        "name": student_orm.name,
+        "grade": grade_info.grade_name,
+        "history_summary": student_summary.render_summary(history),
+    }
+    current_full_info = {**current_class_info, **current_scores}
+    return student_info_dict, current_full_info, student_summary.past_records(history)
 
 def generate_ai_feedback(
     student_id: int,
     teacher_id: int,  # 추가
     db: Session,
     current_class_info: Dict,
-    current_scores: Dict
+    current_scores: Dict,
+    use_cache: bool = True,
+    deadline: Optional[float] = None,
+    class_id: Optional[int] = None
 ) -> Dict[str, str]:
     """
     DB에서 데이터를 조회하고, 공유 로직(FeedbackAnalyzer)을 호출하여
     AI 피드백을 생성합니다.
+    use_cache=False이면 캐시된 LLM 응답을 사용하지 않고 새로 생성합니다.
+    deadline(time.monotonic 기준 시각)은 각 섹션 호출의 마감 시간으로 전달됩니다.
+    생성에 실패하거나 마감 시간을 넘긴 섹션은 규칙 기반 초안으로 채워 반환합니다.
+    LLM 서킷 브레이커가 열려 있으면 DB 조회 전에 CircuitOpenError를 발생시킵니다.
+    class_id는 이미 저장된 현재 수업의 ID로, 이전 기록 요약에서 제외됩니다.
     """
-    student_orm = crud.get_student(db, student_id, teacher_id)
-    past_classes_orm = crud.get_student_past_classes(db, student_id)
-    
-    past_records_dict = _convert_orm_to_dict(list(reversed(past_classes_orm)))
-    grade_info = crud.get_grade(db, student_orm.grade_id)
-    student_info_dict = {"name": student_orm.name, "grade": grade_info.grade_name}
-    
-    current_full_info = {**current_class_info, **current_scores}
+    breaker.check()
 
-    analyzer = feedback_system.FeedbackSystem()
+    student_info_dict, current_full_info, past_records_dict = _load_feedback_inputs(
+        student_id, teacher_id, db, current_class_info, current_scores, class_id
+    )
 
-    ai_response_text = analyzer.generate_feedback(
+    analyzer = _get_analyzer()
+
+    # 세 섹션을 동시에 호출하여 LLM 왕복 1회 수준의 지연으로 생성
+    sections = analyzer.generate_feedback_concurrently(
         student_info=student_info_dict,
         current_class_info=current_full_info,
-        past_records=past_records_dict
+        past_records=past_records_dict,
+        use_cache=use_cache,
+        deadline=deadline
     )
-    
-    return _parse_ai_response(ai_response_text)
\ No newline at end of file
+
+    draft = generate_draft_feedback(student_info_dict["name"], current_class_info, current_scores)
+    return _fill_failed_sections(sections, draft)
+
+async def agenerate_ai_feedback(
+    student_id: int,
+    teacher_id: int,
+    db: AsyncSession,
+    current_class_info: Dict,
+    current_scores: Dict,
+    use_cache: bool = True,
+    deadline: Optional[float] = None,
+    class_id: Optional[int] = None
+) -> Dict[str, str]:
+    """
+    generate_ai_feedback의 async 버전 (DB_ASYNC=true의 async 라우트용).
+    LLM 응답을 기다리는 동안 스레드와 DB 연결을 점유하지 않습니다.
+    """
+    breaker.check()
+
+    student_info_dict, current_full_info, past_records_dict = await _aload_feedback_inputs(
+        student_id, teacher_id, db, current_class_info, current_scores, class_id
+    )
+
+    sections = await _get_analyzer().agenerate_feedback_on_pool(
+        student_info=student_info_dict,
+        current_class_info=current_full_info,
+        past_records=past_records_dict,
+        use_cache=use_cache,
+        deadline=deadline
+    )
+
+    draft = generate_draft_feedback(student_info_dict["name"], current_class_info, current_scores)
+    return _fill_failed_sections(sections, draft)
+
+def stream_ai_feedback(
+    student_id: int,
+    teacher_id: int,
+    db: Session,
+    current_class_info: Dict,
+    current_scores: Dict,
+    use_cache: bool = True,
+    class_id: Optional[int] = None
+) -> Iterator[Tuple[str, str, str]]:
+    """
+    generate_ai_feedback의 스트리밍 버전.
+    DB 조회는 호출 시점에 끝내고, (이벤트, 섹션 키, 텍스트)를 생성되는 대로 반환하는
+    동기 이터레이터를 돌려줍니다. (이벤트: token / error(값은 실패 원인 예외) / end)
+    LLM 서킷 브레이커가 열려 있으면 DB 조회 전에 CircuitOpenError를 발생시킵니다.
+    이터레이터를 끝까지 소비하지 않고 닫으면 진행 중인 섹션 스트림도 취소됩니다.
+    """
+    breaker.check()
+
+    student_info_dict, current_full_info, past_records_dict = _load_feedback_inputs(
+        student_id, teacher_id, db, current_class_info, current_scores, class_id
+    )
+
+    analyzer = _get_analyzer()
+    return llm_pool.iterate_async(
+        analyzer.astream_feedback(
+            student_info=student_info_dict,
+            current_class_info=current_full_info,
+            past_records=past_records_dict,
+            use_cache=use_cache
+        )
+    )
+
+def parse_streamed_sections(
+    sections: Dict[str, feedback_system.SectionResult], draft: Dict[str, str]
+) -> Dict[str, str]:
+    """
+    스트리밍으로 모은 섹션별 결과(텍스트 또는 예외)를 generate_ai_feedback과 같은 형식으로 후처리합니다.
+    실패했거나 비어 있는 섹션은 초안으로 채웁니다.
+    """
+    return _fill_failed_sections(sections, draft)
\ No newline at end of file
@@ -1,6 +1,7 @@
+from sqlalchemy import inspect, text
 from sqlalchemy.orm import Session
 
-from .database import SessionLocal
+from .database import SessionLocal, engine
 from . import models
 
 # 삽입할 초기 학년 데이터 목록
@@ -44,3 +45,42 @@ def init_db():
 
     finally:
         db.close()
+
+def create_missing_indexes():
+    """
+    모델에 정의된 인덱스 중 DB에 없는 인덱스를 생성합니다.
+    create_all은 이미 존재하는 테이블에 새 인덱스를 추가하지 않으므로 기존 DB에도 적용하기 위해 사용합니다.
+    """
+    inspector = inspect(engine)
+    for table in models.Base.metadata.sorted_tables:
+        if not inspector.has_table(table.name):
+            continue
+        existing = {index["name"] for index in inspector.get_indexes(table.name)}
+        for index in table.indexes:
+            if index.name not in existing:
+                print(f"인덱스 생성: {table.name}.{index.name}")
+                index.create(bind=engine)
+
+def create_missing_columns():
+    """
+    모델에 정의된 컬럼 중 DB 테이블에 없는 컬럼을 추가합니다. (NULL을 허용하는 컬럼만)
+    create_all은 이미 존재하는 테이블에 새 컬럼을 추가하지 않으므로 기존 DB에도 적용하기 위해 사용합니다.
+    """
+    inspector = inspect(engine)
+    preparer = engine.dialect.identifier_preparer
+    for table in models.Base.metadata.sorted_tables:
+        if not inspector.has_table(table.name):
+            continue
+        existing = {column["name"] for column in inspector.get_columns(table.name)}
+        for column in table.columns:
+            if column.name in existing:
+                continue
+            if not column.nullable:
+                print(f"컬럼 추가 건너뜀 (NOT NULL 컬럼은 직접 추가 필요): {table.name}.{column.name}")
+                continue
+            print(f"컬럼 추가: {table.name}.{column.name}")
+            with engine.begin() as connection:
+                connection.execute(text(
+                    f"ALTER TABLE {preparer.format_table(table)} "
+                    f"ADD COLUMN {preparer.format_column(column)} {column.type.compile(dialect=engine.dialect)}"
+                ))
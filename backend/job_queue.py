@@ -0,0 +1,163 @@
+import os
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime, timedelta
+from typing import Optional, Set
+
+from dotenv import load_dotenv
+
+from . import crud, models
+from .database import SessionLocal
+from .feedback_ai import generate_ai_feedback
+
+load_dotenv()
+
+# 피드백 생성 작업을 처리할 워커 스레드 수
+FEEDBACK_JOB_WORKERS = int(os.getenv("FEEDBACK_JOB_WORKERS", "4"))
+# 처리 중인 작업의 임대 시간(초): 이 시간 동안 임대가 갱신되지 않은 running 작업만 다른 워커가 다시 처리
+FEEDBACK_JOB_LEASE_SECONDS = float(os.getenv("FEEDBACK_JOB_LEASE_SECONDS", "120"))
+# 임대 갱신 주기 (임대 시간의 1/3, 갱신이 한두 번 늦어도 만료되지 않도록)
+FEEDBACK_JOB_HEARTBEAT_SECONDS = FEEDBACK_JOB_LEASE_SECONDS / 3
+
+_executor: Optional[ThreadPoolExecutor] = None
+
+# 이 프로세스에서 처리 중인 작업 (임대 갱신 대상)
+_running_jobs: Set[int] = set()
+_running_jobs_lock = threading.Lock()
+_heartbeat_thread: Optional[threading.Thread] = None
+_heartbeat_stop = threading.Event()
+
+
+def _get_executor() -> ThreadPoolExecutor:
+    global _executor
+    if _executor is None:
+        _executor = ThreadPoolExecutor(
+            max_workers=FEEDBACK_JOB_WORKERS, thread_name_prefix="feedback-job"
+        )
+    return _executor
+
+
+def _lease_expired_before() -> datetime:
+    return datetime.now() - timedelta(seconds=FEEDBACK_JOB_LEASE_SECONDS)
+
+
+def _heartbeat_loop() -> None:
+    # 처리 중인 작업의 임대를 주기적으로 갱신 (작업마다가 아니라 한 번의 UPDATE로 모아서 갱신)
+    while not _heartbeat_stop.wait(FEEDBACK_JOB_HEARTBEAT_SECONDS):
+        with _running_jobs_lock:
+            job_ids = list(_running_jobs)
+        if not job_ids:
+            continue
+        db = SessionLocal()
+        try:
+            crud.renew_feedback_job_leases(db, job_ids)
+        except Exception as e:
+            print(f"AI 피드백 생성 작업 임대 갱신 실패: {e}")
+        finally:
+            db.close()
+
+
+def _start_heartbeat() -> None:
+    global _heartbeat_thread
+    with _running_jobs_lock:
+        if _heartbeat_thread is None:
+            _heartbeat_stop.clear()
+            _heartbeat_thread = threading.Thread(
+                target=_heartbeat_loop, name="feedback-job-heartbeat", daemon=True
+            )
+            _heartbeat_thread.start()
+
+
+def enqueue_feedback_job(job_id: int) -> None:
+    """
+    DB에 저장된 작업을 워커 풀에 등록합니다.
+    """
+    _get_executor().submit(run_feedback_job, job_id)
+
+
+def run_feedback_job(job_id: int) -> None:
+    """
+    작업 하나를 처리합니다.
+    요청과 별개의 세션을 사용하며, 결과와 상태를 DB에 기록합니다.
+    작업을 가져오면(claim) 처리하는 동안 임대(claimed_at)를 주기적으로 갱신하며,
+    이미 완료되었거나 다른 워커가 임대 중인 작업은 건너뜁니다.
+    """
+    db = SessionLocal()
+    try:
+        if not crud.claim_feedback_job(db, job_id, _lease_expired_before()):
+            return
+        job = db.query(models.FeedbackJob).filter(models.FeedbackJob.job_id == job_id).first()
+        with _running_jobs_lock:
+            _running_jobs.add(job_id)
+        _start_heartbeat()
+
+        # 결과를 저장하면 요청한 선생님의 이후 조회를 잠시 primary로 고정 (이 프로세스에서만 적용)
+        db.info["sticky_key"] = (
+            db.query(models.Teacher.email).filter(models.Teacher.teacher_id == job.teacher_id).scalar()
+        )
+
+        try:
+            db_feedback = job.feedback
+            db_class = db_feedback.class_record
+            ai_comments = generate_ai_feedback(
+                student_id=job.student_id,
+                teacher_id=job.teacher_id,
+                db=db,
+                current_class_info={
+                    "subject": db_class.subject,
+                    "class_date": db_class.class_date,
+                    "progress_text": db_class.progress_text,
+                    "class_memo": db_class.class_memo,
+                },
+                current_scores={
+                    "attitude_score": db_feedback.attitude_score,
+                    "understanding_score": db_feedback.understanding_score,
+                    "homework_score": db_feedback.homework_score,
+                    "qa_score": db_feedback.qa_score,
+                },
+                use_cache=job.use_cache,
+                class_id=db_class.class_id,
+            )
+            crud.apply_ai_comments(db=db, feedback_id=job.feedback_id, ai_comments=ai_comments)
+            job.status = models.FeedbackJob.STATUS_SUCCEEDED
+        except Exception as e:
+            db.rollback()
+            print(f"AI 피드백 생성 작업 {job_id} 실패: {e}")
+            job.status = models.FeedbackJob.STATUS_FAILED
+            job.error = str(e)
+
+        job.finished_at = datetime.now()
+        db.commit()
+    finally:
+        with _running_jobs_lock:
+            _running_jobs.discard(job_id)
+        db.close()
+
+
+def recover_feedback_jobs() -> int:
+    """
+    서버 재시작 전에 완료되지 못한 작업을 다시 등록합니다.
+    pending 작업과 임대가 FEEDBACK_JOB_LEASE_SECONDS 이상 갱신되지 않은 running 작업만 대상으로 하며,
+    다른 워커 프로세스가 처리 중인(임대를 갱신하고 있는) 작업은 건드리지 않습니다.
+    등록한 작업 수를 반환합니다.
+    """
+    db = SessionLocal()
+    try:
+        job_ids = [job.job_id for job in crud.get_reclaimable_feedback_jobs(db, _lease_expired_before())]
+    finally:
+        db.close()
+
+    for job_id in job_ids:
+        enqueue_feedback_job(job_id)
+    if job_ids:
+        print(f"미완료 AI 피드백 생성 작업 {len(job_ids)}건을 다시 등록했습니다.")
+    return len(job_ids)
+
+
+def shutdown_job_queue(wait: bool = True) -> None:
+    global _executor, _heartbeat_thread
+    if _executor is not None:
+        _executor.shutdown(wait=wait)
+        _executor = None
+    _heartbeat_stop.set()
+    _heartbeat_thread = None
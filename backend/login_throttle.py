@@ -0,0 +1,147 @@
+"""
+로그인 시도 제한
+
+비밀번호 확인은 해싱 워커의 CPU를 사용하므로, 무차별 대입 요청이 워커를 독점하지 못하도록
+비밀번호를 확인하기 전에 시도 횟수를 제한합니다. (초과 시 429, Retry-After)
+- IP별: 로그인/회원가입 시도 수 (성공 여부와 관계없이 해싱 비용이 들기 때문)
+- 계정별: 로그인 실패 수 (로그인에 성공하면 초기화)
+키마다 토큰 버킷을 두고 최대 LOGIN_THROTTLE_MAX_KEYS개까지 LRU로 보관합니다. (프로세스 단위)
+"""
+import math
+import os
+import threading
+import time
+from collections import OrderedDict
+from typing import Any, Dict, Optional, Tuple
+
+from dotenv import load_dotenv
+from fastapi import HTTPException, Request, status
+
+load_dotenv()
+
+LOGIN_THROTTLE_ENABLED = os.getenv("LOGIN_THROTTLE_ENABLED", "true").lower() == "true"
+# 분당 허용 횟수 (한 번에 이 횟수까지 몰아서 허용)
+LOGIN_IP_ATTEMPTS_PER_MINUTE = float(os.getenv("LOGIN_IP_ATTEMPTS_PER_MINUTE", "30"))
+LOGIN_ACCOUNT_FAILURES_PER_MINUTE = float(os.getenv("LOGIN_ACCOUNT_FAILURES_PER_MINUTE", "5"))
+LOGIN_THROTTLE_MAX_KEYS = int(os.getenv("LOGIN_THROTTLE_MAX_KEYS", "100000"))
+
+
+class KeyedBucket:
+    """키별 토큰 버킷 (분당 per_minute개씩 채워지고 최대 per_minute개까지 보관)"""
+
+    def __init__(self, per_minute: float, max_keys: int = LOGIN_THROTTLE_MAX_KEYS):
+        self.capacity = per_minute
+        self.rate = per_minute / 60.0
+        self.max_keys = max_keys
+        # 키 → (남은 토큰, 갱신 시각(time.monotonic 기준))
+        self._buckets: "OrderedDict[str, Tuple[float, float]]" = OrderedDict()
+
+    def _tokens(self, key: str, now: float) -> float:
+        entry = self._buckets.get(key)
+        if entry is None:
+            return self.capacity
+        tokens, updated_at = entry
+        return min(self.capacity, tokens + (now - updated_at) * self.rate)
+
+    def retry_after(self, key: str) -> float:
+        """토큰이 남아 있으면 0, 없으면 다음 토큰이 채워질 때까지의 시간(초)"""
+        tokens = self._tokens(key, time.monotonic())
+        return 0.0 if tokens >= 1 else (1 - tokens) / self.rate
+
+    def hit(self, key: str) -> None:
+        now = time.monotonic()
+        self._buckets[key] = (self._tokens(key, now) - 1, now)
+        self._buckets.move_to_end(key)
+        while len(self._buckets) > self.max_keys:
+            self._buckets.popitem(last=False)
+
+    def reset(self, key: str) -> None:
+        self._buckets.pop(key, None)
+
+    def __len__(self) -> int:
+        return len(self._buckets)
+
+
+class LoginThrottle:
+    """IP별 시도 수와 계정별 실패 수 제한"""
+
+    def __init__(
+        self,
+        ip_per_minute: float = LOGIN_IP_ATTEMPTS_PER_MINUTE,
+        account_per_minute: float = LOGIN_ACCOUNT_FAILURES_PER_MINUTE,
+        enabled: bool = LOGIN_THROTTLE_ENABLED,
+    ):
+        self.enabled = enabled
+        self._ips = KeyedBucket(ip_per_minute)
+        self._accounts = KeyedBucket(account_per_minute)
+        self._lock = threading.Lock()
+        self._counters = {
+            "allowed": 0,
+            "throttled_ip": 0,
+            "throttled_account": 0,
+            "failures": 0,
+        }
+
+    @staticmethod
+    def _account_key(email: str) -> str:
+        return email.strip().lower()
+
+    def check(self, ip: str, email: Optional[str] = None) -> None:
+        """
+        비밀번호를 확인하기 전에 호출, 허용되면 IP의 시도 횟수를 차감하고 초과하면 429
+        email: 로그인 계정 (회원가입은 None, IP만 제한)
+        """
+        if not self.enabled:
+            return
+        with self._lock:
+            wait = 0.0
+            if email is not None:
+                wait = self._accounts.retry_after(self._account_key(email))
+                if wait > 0:
+                    self._counters["throttled_account"] += 1
+            if wait == 0:
+                wait = self._ips.retry_after(ip)
+                if wait > 0:
+                    self._counters["throttled_ip"] += 1
+            if wait == 0:
+                self._ips.hit(ip)
+                self._counters["allowed"] += 1
+        if wait > 0:
+            raise HTTPException(
+                status_code=status.HTTP_429_TOO_MANY_REQUESTS,
+                detail="로그인 시도가 너무 많습니다. 잠시 후 다시 시도해 주세요.",
+                headers={"Retry-After": str(math.ceil(wait))},
+            )
+
+    def record_failure(self, email: str) -> None:
+        if not self.enabled:
+            return
+        with self._lock:
+            self._accounts.hit(self._account_key(email))
+            self._counters["failures"] += 1
+
+    def record_success(self, email: str) -> None:
+        if not self.enabled:
+            return
+        with self._lock:
+            self._accounts.reset(self._account_key(email))
+
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            return {
+                **self._counters,
+                "tracked_ips": len(self._ips),
+                "tracked_accounts": len(self._accounts),
+                "ip_attempts_per_minute": self._ips.capacity,
+                "account_failures_per_minute": self._accounts.capacity,
+                "enabled": self.enabled,
+            }
+
+
+def client_ip(request: Request) -> str:
+    """요청한 클라이언트 IP (알 수 없으면 "unknown")"""
+    return request.client.host if request.client else "unknown"
+
+
+# 프로세스 전역 제한기
+login_throttle = LoginThrottle()
@@ -1,14 +1,24 @@
 from fastapi import FastAPI
 from fastapi.middleware.cors import CORSMiddleware
 
+from core_logic import llm_pool
+
 from . import models
 from .database import engine
-from .initial_data import init_db
+from .initial_data import create_missing_columns, create_missing_indexes, init_db
 
 models.Base.metadata.create_all(bind=engine)
+create_missing_columns()
+create_missing_indexes()
 init_db()
+# LLM 클라이언트 풀을 앱 시작 시 한 번 생성하여 모든 워커 스레드가 공유
+llm_pool.init_pool()
 
-from .api import students, feedbacks, feedback_details, auth, grades, teachers
+from .api import students, feedbacks, feedback_details, auth, grades, teachers, jobs, monitoring
+from .database import DB_ASYNC_ENABLED, LAST_WRITE_HEADER
+from .job_queue import recover_feedback_jobs, shutdown_job_queue
+from .pagination import NEXT_CURSOR_HEADER
+from .password_hasher import password_hasher
 
 app = FastAPI()
 
@@ -27,14 +37,41 @@ app.add_middleware(
     allow_credentials=True,
     allow_methods=["*"],
     allow_headers=["*"],
+    # 목록 API의 다음 페이지 커서와 쓰기 시각(읽기 복제본 고정용)을 브라우저에서 읽을 수 있도록 노출
+    expose_headers=[NEXT_CURSOR_HEADER, LAST_WRITE_HEADER],
 )
 
 app.include_router(auth.router, prefix="/api/v1")
 app.include_router(grades.router)
-app.include_router(students.router)
-app.include_router(feedbacks.router)
+if DB_ASYNC_ENABLED:
+    # 비동기 DB 모드: 학생/피드백/작업 조회 API를 AsyncSession을 사용하는 async 라우트로 등록
+    from .api import feedbacks_async, jobs_async, students_async
+
+    app.include_router(students_async.router)
+    app.include_router(feedbacks_async.router)
+    app.include_router(jobs_async.router)
+else:
+    app.include_router(students.router)
+    app.include_router(feedbacks.router)
+    app.include_router(jobs.router)
 app.include_router(feedback_details.router)
 app.include_router(teachers.router)
+app.include_router(monitoring.router)
+
+@app.on_event("startup")
+def resume_feedback_jobs():
+    # 재시작 전에 완료되지 못한 AI 피드백 생성 작업 재등록
+    recover_feedback_jobs()
+
+@app.on_event("startup")
+def start_password_hasher():
+    # 비밀번호 해싱 워커 프로세스를 미리 생성
+    password_hasher.start()
+
+@app.on_event("shutdown")
+def stop_feedback_jobs():
+    shutdown_job_queue(wait=False)
+    password_hasher.shutdown()
 
 @app.get("/")
 def read_root():
@@ -1,4 +1,4 @@
-from sqlalchemy import Column, Integer, String, Text, Date, DateTime, ForeignKey
+from sqlalchemy import Boolean, Column, Integer, String, Text, Date, DateTime, ForeignKey, Index
 from sqlalchemy.orm import relationship
 from sqlalchemy.sql import func
 from .database import Base
@@ -36,6 +36,10 @@ class Student(Base):
     학생 정보 테이블 모델
     """
     __tablename__ = "students"
+    __table_args__ = (
+        # 선생님별 학생 목록 (student_id 키셋 페이지네이션)
+        Index("ix_students_teacher_id_student_id", "teacher_id", "student_id"),
+    )
 
     student_id = Column(Integer, primary_key=True, autoincrement=True)
     teacher_id = Column(Integer, ForeignKey("teachers.teacher_id", ondelete="CASCADE"), nullable=False)
@@ -49,12 +53,20 @@ class Student(Base):
     classes = relationship("Class", back_populates="student", cascade="all, delete-orphan")
 
     grade_info = relationship("Grade", back_populates="students")
+    # Student -> StudentSummary (One-to-One)
+    summary = relationship("StudentSummary", back_populates="student", uselist=False, cascade="all, delete-orphan")
     
 class Class(Base):
     """
     수업 기록 테이블 모델
     """
     __tablename__ = "classes"
+    __table_args__ = (
+        # 학생별 수업/피드백 목록 ((class_date, class_id) 최신순 키셋 페이지네이션)
+        Index("ix_classes_student_id_class_date_class_id", "student_id", "class_date", "class_id"),
+        # 선생님 소유 수업 조회 (수업 ID 목록 + 소유권 확인)
+        Index("ix_classes_teacher_id_class_id", "teacher_id", "class_id"),
+    )
 
     class_id = Column(Integer, primary_key=True, autoincrement=True)
     student_id = Column(Integer, ForeignKey("students.student_id", ondelete="CASCADE"), nullable=False)
@@ -92,3 +104,56 @@ class Feedback(Base):
     
     # Feedback -> Class (One-to-One)
     class_record = relationship("Class", back_populates="feedback")
+
+
+class StudentSummary(Base):
+    """
+    학생별 누적 수업 요약 테이블 모델
+    (수업이 추가될 때마다 갱신되며, AI 피드백 프롬프트에 이전 기록 대신 사용)
+    """
+    __tablename__ = "student_summaries"
+
+    student_id = Column(Integer, ForeignKey("students.student_id", ondelete="CASCADE"), primary_key=True)
+    class_count = Column(Integer, nullable=False, default=0)
+    # recent_records에서 밀려난 기록의 횟수와 점수 합계
+    archived_count = Column(Integer, nullable=False, default=0)
+    attitude_score_sum = Column(Integer, nullable=False, default=0)
+    understanding_score_sum = Column(Integer, nullable=False, default=0)
+    homework_score_sum = Column(Integer, nullable=False, default=0)
+    qa_score_sum = Column(Integer, nullable=False, default=0)
+    first_class_date = Column(Date)
+    recent_records = Column(Text)  # 최근 수업 기록 (JSON)
+    digest = Column(Text)  # 지난 학습 주제 요약 (JSON 목록)
+    updated_at = Column(DateTime, server_default=func.now(), onupdate=func.now())
+
+    # StudentSummary -> Student (One-to-One)
+    student = relationship("Student", back_populates="summary")
+
+
+class FeedbackJob(Base):
+    """
+    AI 피드백 비동기 생성 작업 테이블 모델
+    (서버 재시작 시 미완료 작업을 다시 처리할 수 있도록 DB에 저장)
+    """
+    __tablename__ = "feedback_jobs"
+
+    STATUS_PENDING = "pending"
+    STATUS_RUNNING = "running"
+    STATUS_SUCCEEDED = "succeeded"
+    STATUS_FAILED = "failed"
+
+    job_id = Column(Integer, primary_key=True, autoincrement=True)
+    feedback_id = Column(Integer, ForeignKey("feedbacks.feedback_id", ondelete="CASCADE"), nullable=False)
+    teacher_id = Column(Integer, ForeignKey("teachers.teacher_id", ondelete="CASCADE"), nullable=False)
+    student_id = Column(Integer, ForeignKey("students.student_id", ondelete="CASCADE"), nullable=False)
+    status = Column(String(20), nullable=False, default=STATUS_PENDING, index=True)
+    use_cache = Column(Boolean, nullable=False, default=True)
+    error = Column(Text)
+    created_at = Column(DateTime, server_default=func.now())
+    started_at = Column(DateTime)
+    finished_at = Column(DateTime)
+    # 처리 중인 워커가 주기적으로 갱신하는 임대 시각 (오래 갱신되지 않은 running 작업만 다시 처리)
+    claimed_at = Column(DateTime)
+
+    # FeedbackJob -> Feedback (Many-to-One)
+    feedback = relationship("Feedback")
@@ -0,0 +1,42 @@
+import base64
+import json
+from typing import Any, List
+
+from fastapi import HTTPException, Response
+
+# 다음 페이지 커서를 전달하는 응답 헤더 (마지막 페이지면 헤더 없음)
+NEXT_CURSOR_HEADER = "X-Next-Cursor"
+
+
+def encode_cursor(values: List[Any]) -> str:
+    """
+    마지막 항목의 정렬 키(예: [class_date, class_id])를 불투명한 커서 문자열로 변환
+    """
+    raw = json.dumps(values, default=str, separators=(",", ":"))
+    return base64.urlsafe_b64encode(raw.encode("utf-8")).decode("ascii").rstrip("=")
+
+
+def decode_cursor(cursor: str, size: int) -> List[Any]:
+    """
+    커서 문자열을 정렬 키 목록으로 복원
+    형식이 잘못되었거나 키 개수가 size와 다르면 400 오류
+    """
+    try:
+        raw = base64.urlsafe_b64decode(cursor + "=" * (-len(cursor) % 4))
+        values = json.loads(raw)
+    except ValueError:
+        values = None
+    if not isinstance(values, list) or len(values) != size:
+        raise HTTPException(status_code=400, detail="Invalid cursor")
+    return values
+
+
+def paginate(response: Response, items: list, limit: int, key) -> list:
+    """
+    limit + 1건을 조회한 결과에서 limit건만 반환하고,
+    다음 페이지가 있으면 마지막 항목의 정렬 키(key(item))로 만든 커서를 응답 헤더에 설정
+    """
+    page = items[:limit]
+    if len(items) > limit and page:
+        response.headers[NEXT_CURSOR_HEADER] = encode_cursor(key(page[-1]))
+    return page
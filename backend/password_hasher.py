@@ -0,0 +1,180 @@
+"""
+비밀번호 해싱 전용 워커 풀
+
+bcrypt 해싱/검증은 호출마다 수십 ms의 CPU를 사용하므로, 요청 스레드풀에서 직접 실행하면
+로그인/회원가입이 몰릴 때 GIL과 CPU를 점유해 다른 API까지 느려집니다.
+- 별도 프로세스 풀(PASSWORD_HASH_WORKERS개)에서 실행하여 GIL을 피하고 CPU 사용량을 워커 수로 제한
+- 대기 중인 작업이 PASSWORD_HASH_MAX_QUEUE개를 넘으면 기다리지 않고 바로 503 (Retry-After)
+- 요청마다 전체 지연(대기 + 해싱)과 해싱 시간, 큐 깊이를 기록 (/api/v1/monitoring/auth)
+PASSWORD_HASH_WORKERS=0이면 풀 없이 요청 스레드에서 직접 실행합니다.
+"""
+import math
+import multiprocessing
+import os
+import threading
+import time
+from concurrent.futures import ProcessPoolExecutor
+from concurrent.futures import TimeoutError as FutureTimeoutError
+from concurrent.futures.process import BrokenProcessPool
+from typing import Any, Callable, Dict, Optional, Tuple
+
+from dotenv import load_dotenv
+from fastapi import HTTPException, status
+
+from . import security
+from core_logic.llm_metrics import Histogram
+
+load_dotenv()
+
+PASSWORD_HASH_WORKERS = int(os.getenv("PASSWORD_HASH_WORKERS", str(min(2, os.cpu_count() or 1))))
+PASSWORD_HASH_MAX_QUEUE = int(os.getenv("PASSWORD_HASH_MAX_QUEUE", "16"))
+PASSWORD_HASH_TIMEOUT_SECONDS = float(os.getenv("PASSWORD_HASH_TIMEOUT_SECONDS", "10"))
+
+HASH_BUCKETS = (0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10)
+
+
+def _timed(func: Callable[..., Any], *args: Any) -> Tuple[Any, float]:
+    """워커 프로세스에서 실행: 결과와 해싱에 걸린 시간(초) 반환"""
+    started = time.perf_counter()
+    result = func(*args)
+    return result, time.perf_counter() - started
+
+
+def _warm_up() -> None:
+    # 워커 프로세스를 미리 띄우고 bcrypt 백엔드를 불러옴
+    security.pwd_context.hash("warm-up")
+
+
+class PasswordHasher:
+    """비밀번호 해싱/검증을 프로세스 풀에서 실행하고 대기열 길이를 제한"""
+
+    def __init__(
+        self,
+        workers: int = PASSWORD_HASH_WORKERS,
+        max_queue: int = PASSWORD_HASH_MAX_QUEUE,
+        timeout_seconds: float = PASSWORD_HASH_TIMEOUT_SECONDS,
+    ):
+        self.workers = workers
+        self.max_queue = max_queue
+        self.timeout_seconds = timeout_seconds
+        self._executor: Optional[ProcessPoolExecutor] = None
+        self._lock = threading.Lock()
+        self._in_flight = 0
+        self._counters = {
+            "hash": 0,
+            "verify": 0,
+            "rejected": 0,
+            "timeouts": 0,
+            "max_queue_depth": 0,
+        }
+        # 요청 스레드가 기다린 전체 시간과 워커에서 해싱에 쓴 시간
+        self._latency = Histogram(HASH_BUCKETS)
+        self._hash_time = Histogram(HASH_BUCKETS)
+
+    def _get_executor(self) -> ProcessPoolExecutor:
+        with self._lock:
+            if self._executor is None:
+                # 스레드가 여럿 떠 있는 서버 프로세스를 fork하지 않도록 spawn으로 워커 생성
+                self._executor = ProcessPoolExecutor(
+                    max_workers=self.workers, mp_context=multiprocessing.get_context("spawn")
+                )
+            return self._executor
+
+    def start(self) -> None:
+        """워커 프로세스를 미리 생성 (첫 로그인에서 프로세스 생성 시간을 기다리지 않도록)"""
+        if self.workers <= 0:
+            return
+        executor = self._get_executor()
+        for future in [executor.submit(_warm_up) for _ in range(self.workers)]:
+            future.result()
+
+    def shutdown(self) -> None:
+        with self._lock:
+            executor, self._executor = self._executor, None
+        if executor is not None:
+            executor.shutdown(wait=False, cancel_futures=True)
+
+    def _retry_after(self) -> int:
+        """대기열이 비워질 때까지의 예상 시간(초)"""
+        average = self._hash_time.sum / self._hash_time.count if self._hash_time.count else 0.1
+        return max(1, math.ceil(average * self._in_flight / max(self.workers, 1)))
+
+    def _busy(self, detail: str) -> HTTPException:
+        return HTTPException(
+            status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
+            detail=detail,
+            headers={"Retry-After": str(self._retry_after())},
+        )
+
+    def _run(self, operation: str, func: Callable[..., Any], *args: Any) -> Any:
+        started = time.perf_counter()
+        if self.workers <= 0:
+            result, hash_seconds = _timed(func, *args)
+            self._record(operation, started, hash_seconds)
+            return result
+
+        with self._lock:
+            if self._in_flight >= self.workers + self.max_queue:
+                self._counters["rejected"] += 1
+                raise self._busy("로그인 요청이 많아 잠시 후 다시 시도해 주세요.")
+            self._in_flight += 1
+            queue_depth = max(0, self._in_flight - self.workers)
+            self._counters["max_queue_depth"] = max(self._counters["max_queue_depth"], queue_depth)
+        try:
+            future = self._get_executor().submit(_timed, func, *args)
+        except BaseException:
+            self._finish()
+            raise
+        # 시간 초과로 먼저 응답해도 워커에서 실행 중인 작업은 끝날 때까지 대기열 자리를 차지하므로
+        # 작업이 실제로 끝나거나 취소되었을 때 반환
+        future.add_done_callback(self._finish)
+        try:
+            result, hash_seconds = future.result(timeout=self.timeout_seconds)
+        except FutureTimeoutError:
+            future.cancel()
+            with self._lock:
+                self._counters["timeouts"] += 1
+            raise self._busy("비밀번호 확인이 지연되고 있습니다. 잠시 후 다시 시도해 주세요.")
+        except BrokenProcessPool:
+            # 워커 프로세스가 비정상 종료되면 다음 요청부터 새 풀 사용
+            print("비밀번호 해싱 워커 풀이 중단되어 다시 생성합니다.")
+            self.shutdown()
+            raise self._busy("비밀번호 확인을 처리할 수 없습니다. 잠시 후 다시 시도해 주세요.")
+        self._record(operation, started, hash_seconds)
+        return result
+
+    def _finish(self, future: Any = None) -> None:
+        """작업 하나가 끝나 대기열 자리를 반환"""
+        with self._lock:
+            self._in_flight -= 1
+
+    def _record(self, operation: str, started: float, hash_seconds: float) -> None:
+        with self._lock:
+            self._counters[operation] += 1
+            self._latency.observe(time.perf_counter() - started)
+            self._hash_time.observe(hash_seconds)
+
+    def hash_password(self, password: str) -> str:
+        """비밀번호 해싱 (워커 풀에서 실행, 대기열이 가득 차면 503)"""
+        return self._run("hash", security.get_password_hash, password)
+
+    def verify_password(self, plain_password: str, hashed_password: str) -> bool:
+        """비밀번호 검증 (워커 풀에서 실행, 대기열이 가득 차면 503)"""
+        return self._run("verify", security.verify_password, plain_password, hashed_password)
+
+    def stats(self) -> Dict[str, Any]:
+        """해싱/검증 건수, 거절/시간 초과 건수, 현재/최대 큐 깊이, 전체 지연과 해싱 시간 분포"""
+        with self._lock:
+            return {
+                **self._counters,
+                "workers": self.workers,
+                "max_queue": self.max_queue,
+                "in_flight": self._in_flight,
+                "queue_depth": max(0, self._in_flight - self.workers),
+                "latency_seconds": self._latency.snapshot(),
+                "hash_seconds": self._hash_time.snapshot(),
+            }
+
+
+# 프로세스 전역 해싱 풀
+password_hasher = PasswordHasher()
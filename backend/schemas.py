@@ -1,6 +1,6 @@
 from pydantic import BaseModel, EmailStr
 from typing import List, Optional
-from datetime import date
+from datetime import date, datetime
 
 class TeacherCreate(BaseModel):
     email: EmailStr
@@ -30,6 +30,8 @@ class TokenData(BaseModel):
     JWT 토큰을 디코딩했을 때 얻게 될 데이터(payload) 스키마
     """
     email: Optional[EmailStr] = None
+    teacher_id: Optional[int] = None  # tid 클레임 (이전에 발급된 토큰에는 없음)
+    expires: Optional[float] = None  # exp 클레임 (epoch 초)
     
 class FeedbackBase(BaseModel):
     attitude_score: int
@@ -98,6 +100,17 @@ class Student(StudentBase):
     class Config:
         from_attributes = True
 
+class StudentListItem(StudentBase):
+    """
+    학생 목록 API (GET /students/summary)의 응답 항목 스키마
+    (수업 기록과 피드백을 포함하지 않는 가벼운 목록용)
+    """
+    student_id: int
+    grade_info: Grade
+
+    class Config:
+        from_attributes = True
+
 class FeedbackCreateRequest(BaseModel):
     """
     피드백 생성 API (POST /students/{student_id}/feedbacks)의
@@ -106,4 +119,48 @@ class FeedbackCreateRequest(BaseModel):
     class_info: ClassCreate
     feedback_info: FeedbackCreate
 
+class FeedbackBatchItem(BaseModel):
+    """
+    일괄 피드백 생성 요청의 항목 하나 (학생 + 수업 정보 + 평가 점수)
+    """
+    student_id: int
+    class_info: ClassCreate
+    feedback_info: FeedbackCreate
+
+class FeedbackBatchRequest(BaseModel):
+    """
+    일괄 피드백 생성 API (POST /students/feedbacks/batch)의
+    Request Body를 위한 스키마
+    """
+    items: List[FeedbackBatchItem]
+
+class FeedbackBatchResult(BaseModel):
+    """
+    일괄 피드백 생성 결과 (요청 항목 순서와 동일한 index)
+    status: succeeded / failed (수업 저장 실패) / ai_failed (수업은 저장되었으나 AI 생성 실패)
+    """
+    index: int
+    student_id: int
+    status: str
+    error: Optional[str] = None
+    result: Optional[Class] = None
+
+class FeedbackJob(BaseModel):
+    """
+    AI 피드백 비동기 생성 작업 상태 스키마
+    (status: pending / running / succeeded / failed)
+    """
+    job_id: int
+    feedback_id: int
+    student_id: int
+    status: str
+    error: Optional[str] = None
+    created_at: Optional[datetime] = None
+    started_at: Optional[datetime] = None
+    finished_at: Optional[datetime] = None
+    feedback: Optional[Feedback] = None
+
+    class Config:
+        from_attributes = True
+
 Class.update_forward_refs()
@@ -0,0 +1,161 @@
+"""
+인증된 선생님 캐시
+
+요청마다 JWT 검증 후 DB에서 선생님을 조회하던 것을 프로세스 메모리에서 처리합니다.
+- 토큰 캐시: 검증이 끝난 토큰 → teacher_id (토큰 만료 시각과 TTL 중 이른 시각까지)
+- 선생님 캐시: teacher_id → 선생님 정보(schemas.Teacher, 세션과 무관한 값 객체)
+선생님 행이 수정/삭제되면 매퍼 이벤트로 해당 선생님과 그 토큰을 바로 무효화하며,
+다른 프로세스의 변경은 TTL이 지나면 반영됩니다.
+"""
+import os
+import threading
+import time
+from collections import OrderedDict
+from typing import Any, Dict, Optional, Tuple
+
+from dotenv import load_dotenv
+from sqlalchemy import event
+
+from . import models, schemas
+
+load_dotenv()
+
+AUTH_CACHE_ENABLED = os.getenv("AUTH_CACHE_ENABLED", "true").lower() == "true"
+AUTH_CACHE_MAX_ENTRIES = int(os.getenv("AUTH_CACHE_MAX_ENTRIES", "10000"))
+AUTH_CACHE_TTL_SECONDS = float(os.getenv("AUTH_CACHE_TTL_SECONDS", "60"))
+
+
+class TeacherCache:
+    """검증된 토큰과 선생님 정보의 TTL + LRU 캐시"""
+
+    def __init__(
+        self,
+        max_entries: int = AUTH_CACHE_MAX_ENTRIES,
+        ttl_seconds: float = AUTH_CACHE_TTL_SECONDS,
+        enabled: bool = AUTH_CACHE_ENABLED,
+    ):
+        self.max_entries = max_entries
+        self.ttl_seconds = ttl_seconds
+        self.enabled = enabled
+        # 값: (만료 시각(time.monotonic 기준), teacher_id 또는 schemas.Teacher)
+        self._tokens: "OrderedDict[str, Tuple[float, int]]" = OrderedDict()
+        self._teachers: "OrderedDict[int, Tuple[float, schemas.Teacher]]" = OrderedDict()
+        self._lock = threading.Lock()
+        self._counters = {
+            "token_hits": 0,
+            "teacher_hits": 0,
+            "misses": 0,
+            "evictions": 0,
+            "expirations": 0,
+            "invalidations": 0,
+        }
+        # 선생님 DB 조회 시간 합계와 횟수 (절약한 지연 추정용)
+        self._lookup_seconds = 0.0
+        self._lookups = 0
+
+    def _get(self, entries: OrderedDict, key: Any) -> Optional[Any]:
+        entry = entries.get(key)
+        if entry is None:
+            return None
+        expires_at, value = entry
+        if expires_at <= time.monotonic():
+            del entries[key]
+            self._counters["expirations"] += 1
+            return None
+        entries.move_to_end(key)
+        return value
+
+    def _put(self, entries: OrderedDict, key: Any, value: Any, ttl: float) -> None:
+        if ttl <= 0:
+            return
+        entries[key] = (time.monotonic() + ttl, value)
+        entries.move_to_end(key)
+        while len(entries) > self.max_entries:
+            entries.popitem(last=False)
+            self._counters["evictions"] += 1
+
+    def get_by_token(self, token: str) -> Optional[schemas.Teacher]:
+        """검증된 적이 있는 토큰이면 선생님 정보 반환 (JWT 검증과 DB 조회 모두 생략)"""
+        if not self.enabled:
+            return None
+        with self._lock:
+            teacher_id = self._get(self._tokens, token)
+            teacher = self._get(self._teachers, teacher_id) if teacher_id is not None else None
+            if teacher is not None:
+                self._counters["token_hits"] += 1
+            return teacher
+
+    def get_by_id(self, teacher_id: Optional[int]) -> Optional[schemas.Teacher]:
+        """
+        토큰의 teacher_id 클레임으로 선생님 정보 조회 (새 토큰도 DB 조회 생략), 없으면 미스로 집계
+        (teacher_id 클레임이 없는 이전 형식의 토큰은 항상 미스)
+        """
+        if not self.enabled:
+            return None
+        with self._lock:
+            teacher = self._get(self._teachers, teacher_id) if teacher_id is not None else None
+            self._counters["teacher_hits" if teacher is not None else "misses"] += 1
+            return teacher
+
+    def put(self, teacher: schemas.Teacher, token: Optional[str] = None, token_expires: Optional[float] = None) -> None:
+        """
+        선생님 정보를 저장하고, token이 있으면 검증된 토큰으로 함께 저장
+        token_expires: 토큰의 exp 클레임(epoch 초), 토큰 항목은 이 시각을 넘겨 보관하지 않음
+        """
+        if not self.enabled:
+            return
+        with self._lock:
+            self._put(self._teachers, teacher.teacher_id, teacher, self.ttl_seconds)
+            if token is not None:
+                ttl = self.ttl_seconds
+                if token_expires is not None:
+                    ttl = min(ttl, token_expires - time.time())
+                self._put(self._tokens, token, teacher.teacher_id, ttl)
+
+    def record_lookup(self, seconds: float) -> None:
+        """선생님 DB 조회 시간 기록 (캐시 미스, 로그인 시 조회)"""
+        with self._lock:
+            self._lookup_seconds += seconds
+            self._lookups += 1
+
+    def invalidate(self, teacher_id: int) -> None:
+        """선생님 정보와 그 선생님의 검증된 토큰을 모두 제거"""
+        with self._lock:
+            self._teachers.pop(teacher_id, None)
+            for token in [token for token, (_, tid) in self._tokens.items() if tid == teacher_id]:
+                del self._tokens[token]
+            self._counters["invalidations"] += 1
+
+    def clear(self) -> None:
+        with self._lock:
+            self._tokens.clear()
+            self._teachers.clear()
+
+    def stats(self) -> Dict[str, Any]:
+        """히트/미스 카운터, 히트율, 미스 1건의 평균 DB 조회 시간과 캐시로 절약한 시간 추정치"""
+        with self._lock:
+            hits = self._counters["token_hits"] + self._counters["teacher_hits"]
+            lookups = hits + self._counters["misses"]
+            avg_lookup = self._lookup_seconds / self._lookups if self._lookups else 0.0
+            return {
+                **self._counters,
+                "hit_ratio": round(hits / lookups, 4) if lookups else 0.0,
+                "avg_lookup_ms": round(avg_lookup * 1000, 3),
+                "estimated_saved_ms": round(hits * avg_lookup * 1000, 1),
+                "token_entries": len(self._tokens),
+                "teacher_entries": len(self._teachers),
+                "max_entries": self.max_entries,
+                "ttl_seconds": self.ttl_seconds,
+                "enabled": self.enabled,
+            }
+
+
+# 프로세스 전역 캐시
+teacher_cache = TeacherCache()
+
+
+@event.listens_for(models.Teacher, "after_update")
+@event.listens_for(models.Teacher, "after_delete")
+def _invalidate_changed_teacher(mapper, connection, target):
+    # 이메일/비밀번호 변경, 탈퇴 시 캐시된 정보와 기존 토큰을 바로 무효화
+    teacher_cache.invalidate(target.teacher_id)
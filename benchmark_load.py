@@ -0,0 +1,445 @@
+#!/usr/bin/env python3
+"""
+FastAPI 백엔드 부하 테스트 벤치마크
+
+로컬 데이터베이스(기본 sqlite)와 가짜 LLM 제공자(LLM_PROVIDER=fake)로 backend.main:app을 띄우고,
+로그인 / 학생 목록 / 피드백 생성 / 피드백 목록 요청을 섞어 동시 사용자 수를 늘려가며 측정합니다.
+단계별로 엔드포인트마다 처리량, p50/p95/p99 지연, 오류율, DB 연결 풀 포화도를 JSON 파일로 저장하여
+커밋 간 결과를 비교할 수 있습니다.
+
+사용법:
+    python benchmark_load.py --levels 1,5,10,20 --duration 15
+    python benchmark_load.py --db-url mysql+pymysql://user:pw@localhost/bench --output results.json
+    # 피드백 생성 폭주 중 조회 지연 확인 (생성 전용 사용자 30명 + 조회 사용자 10명)
+    python benchmark_load.py --levels 10 --storm 30 --mix list_students=1,list_feedbacks=1
+    # 동기 DB(스레드풀) / 비동기 DB(DB_ASYNC=true) 모드를 같은 조건으로 각각 실행하여 비교
+    python benchmark_load.py --db-mode compare --levels 20,60,120 --mix create_feedback=1,list_feedbacks=1
+"""
+
+import argparse
+import json
+import os
+import random
+import socket
+import subprocess
+import sys
+import threading
+import time
+from datetime import datetime
+from typing import Any, Dict, List, Tuple
+
+# 프로젝트 루트 디렉토리를 Python 경로에 추가
+sys.path.append(os.path.dirname(os.path.abspath(__file__)))
+
+DEFAULT_MIX = "login=1,list_students=4,create_feedback=2,list_feedbacks=4"
+PASSWORD = "benchmark-password"
+
+
+def parse_args():
+    parser = argparse.ArgumentParser(description="FastAPI 백엔드 부하 테스트")
+    parser.add_argument("--levels", default="1,5,10,20", help="동시 사용자 수 단계 (쉼표 구분)")
+    parser.add_argument("--duration", type=float, default=15.0, help="단계별 측정 시간(초)")
+    parser.add_argument("--teachers", type=int, default=20, help="가상 선생님 계정 수")
+    parser.add_argument("--students", type=int, default=5, help="선생님당 학생 수")
+    parser.add_argument("--mix", default=DEFAULT_MIX, help="요청 비율 (이름=가중치, 쉼표 구분)")
+    parser.add_argument("--db-url", default="sqlite:///benchmark.db", help="벤치마크용 데이터베이스 URL")
+    parser.add_argument("--pool-size", type=int, default=None, help="DB 연결 풀 크기 (기본: DB_POOL_SIZE)")
+    parser.add_argument("--max-overflow", type=int, default=None, help="DB 추가 연결 수 (기본: DB_MAX_OVERFLOW)")
+    parser.add_argument("--llm-latency", type=float, default=0.8, help="가짜 LLM 지연 중앙값(초)")
+    parser.add_argument("--llm-error-rate", type=float, default=0.0, help="가짜 LLM 오류 비율")
+    parser.add_argument("--storm", type=int, default=0, help="단계마다 함께 실행할 피드백 생성 전용 사용자 수")
+    parser.add_argument(
+        "--db-mode",
+        choices=["sync", "async", "compare"],
+        default="sync",
+        help="DB 모드 (sync: 스레드풀 + Session, async: DB_ASYNC=true, compare: 두 모드를 차례로 실행하여 비교)",
+    )
+    parser.add_argument("--seed", type=int, default=42)
+    parser.add_argument("--output", default="", help="결과 JSON 경로 (기본: benchmark_results/load_<시각>.json)")
+    return parser.parse_args()
+
+
+def configure_environment(args) -> None:
+    """backend를 import하기 전에 로컬 DB와 가짜 LLM 설정"""
+    if args.db_url.startswith("sqlite:///"):
+        # 매 실행을 같은 초기 상태에서 시작
+        path = args.db_url[len("sqlite:///"):]
+        if os.path.exists(path):
+            os.remove(path)
+    os.environ["DATABASE_URL"] = args.db_url
+    os.environ["DB_ASYNC"] = "true" if args.db_mode == "async" else "false"
+    os.environ["LLM_PROVIDER"] = "fake"
+    if args.pool_size is not None:
+        os.environ["DB_POOL_SIZE"] = str(args.pool_size)
+    if args.max_overflow is not None:
+        os.environ["DB_MAX_OVERFLOW"] = str(args.max_overflow)
+    os.environ["LLM_FAKE_LATENCY_MEDIAN"] = str(args.llm_latency)
+    os.environ["LLM_FAKE_ERROR_RATE"] = str(args.llm_error_rate)
+    os.environ["LLM_FAKE_SEED"] = str(args.seed)
+    # 서버 처리량을 측정하기 위해 클라이언트 측 API 한도는 충분히 크게 (환경변수로 지정하면 그 값 사용)
+    os.environ.setdefault("LLM_REQUESTS_PER_MINUTE", "1000000")
+    os.environ.setdefault("LLM_TOKENS_PER_MINUTE", "1000000000")
+    os.environ.setdefault("LLM_MAX_CONCURRENCY", "1000")
+    os.environ.setdefault("LLM_INITIAL_CONCURRENCY", "1000")
+    os.environ.setdefault("LLM_MAX_POOL_SIZE", "1000")
+    # 모든 가상 사용자가 같은 IP(127.0.0.1)에서 로그인하므로 IP별 로그인 시도 제한도 크게
+    os.environ.setdefault("LOGIN_IP_ATTEMPTS_PER_MINUTE", "1000000")
+    os.environ.setdefault("SECRET_KEY", "benchmark-secret")
+
+
+def free_port() -> int:
+    with socket.socket() as s:
+        s.bind(("127.0.0.1", 0))
+        return s.getsockname()[1]
+
+
+def start_server(port: int):
+    """uvicorn 서버를 같은 프로세스의 스레드에서 실행 (DB 풀 상태를 직접 관찰하기 위함)"""
+    import uvicorn
+    from backend.main import app
+
+    config = uvicorn.Config(app, host="127.0.0.1", port=port, log_level="warning")
+    server = uvicorn.Server(config)
+    thread = threading.Thread(target=server.run, name="benchmark-server", daemon=True)
+    thread.start()
+    while not server.started:
+        time.sleep(0.05)
+    return server, thread
+
+
+def seed_data(base_url: str, teachers: int, students: int) -> List[Dict[str, Any]]:
+    """가상 선생님 계정과 학생 생성"""
+    import httpx
+
+    accounts = []
+    with httpx.Client(base_url=base_url, timeout=60) as client:
+        for i in range(teachers):
+            email = f"bench{i}@example.com"
+            client.post(
+                "/api/v1/teachers/",
+                json={"email": email, "password": PASSWORD, "name": f"선생님{i}"},
+            ).raise_for_status()
+            token = client.post(
+                "/api/v1/auth/token", data={"username": email, "password": PASSWORD}
+            ).json()["access_token"]
+            headers = {"Authorization": f"Bearer {token}"}
+            student_ids = [
+                client.post(
+                    "/api/v1/students",
+                    json={"name": f"학생{i}-{j}", "grade_id": 1 + j % 13},
+                    headers=headers,
+                ).json()["student_id"]
+                for j in range(students)
+            ]
+            accounts.append({"email": email, "headers": headers, "student_ids": student_ids})
+    print(f"✅ 테스트 데이터 생성: 선생님 {teachers}명, 학생 {teachers * students}명")
+    return accounts
+
+
+def feedback_body(rng: random.Random) -> Dict[str, Any]:
+    return {
+        "class_info": {
+            "subject": "수학",
+            "class_date": f"2024-{rng.randint(1, 12):02d}-{rng.randint(1, 28):02d}",
+            "progress_text": "이차방정식의 근과 계수의 관계",
+            "class_memo": "벤치마크 수업 메모",
+        },
+        "feedback_info": {
+            "attitude_score": rng.randint(1, 5),
+            "understanding_score": rng.randint(1, 5),
+            "homework_score": rng.randint(1, 5),
+            "qa_score": rng.randint(1, 5),
+        },
+    }
+
+
+def run_operation(client, name: str, account: Dict[str, Any], rng: random.Random):
+    """요청 하나를 보내고 응답을 반환"""
+    headers = account["headers"]
+    if name == "login":
+        return client.post(
+            "/api/v1/auth/token", data={"username": account["email"], "password": PASSWORD}
+        )
+    if name == "list_students":
+        return client.get("/api/v1/students", headers=headers)
+    student_id = rng.choice(account["student_ids"])
+    if name == "create_feedback":
+        return client.post(
+            f"/api/v1/students/{student_id}/feedbacks", json=feedback_body(rng), headers=headers
+        )
+    if name == "list_feedbacks":
+        return client.get(f"/api/v1/students/{student_id}/feedbacks", headers=headers)
+    raise ValueError(f"알 수 없는 요청 종류: {name}")
+
+
+def percentile(values: List[float], q: float) -> float:
+    if not values:
+        return 0.0
+    ordered = sorted(values)
+    index = min(len(ordered) - 1, max(0, int(round(q * len(ordered) + 0.5)) - 1))
+    return ordered[index]
+
+
+def sample_pool(engine, stop: threading.Event, samples: List[Tuple[int, int]]) -> None:
+    """DB 연결 풀 사용량을 주기적으로 기록 (사용 중 연결 수, 대기 가능 여유)"""
+    pool = engine.pool
+    while not stop.is_set():
+        samples.append((pool.checkedout(), pool.overflow()))
+        time.sleep(0.05)
+
+
+def run_level(
+    base_url: str,
+    concurrency: int,
+    duration: float,
+    accounts: List[Dict[str, Any]],
+    mix: List[Tuple[str, float]],
+    seed: int,
+    storm: int = 0,
+) -> Dict[str, Any]:
+    """
+    동시 사용자 concurrency명으로 duration초 동안 요청을 보내고 결과 집계
+    storm명은 별도로 피드백 생성만 계속 요청 (storm_create_feedback으로 집계)
+    """
+    import httpx
+    from backend.database import DB_ASYNC_ENABLED, DB_MAX_OVERFLOW, DB_POOL_SIZE, async_engine, engine
+
+    names = [name for name, _ in mix]
+    weights = [weight for _, weight in mix]
+    results: Dict[str, List[Tuple[float, bool]]] = {name: [] for name in names}
+    if storm:
+        results["storm_create_feedback"] = []
+    lock = threading.Lock()
+    deadline = time.monotonic() + duration
+
+    def worker(index: int, storm_worker: bool = False) -> None:
+        rng = random.Random(seed * 1000 + index)
+        account = accounts[index % len(accounts)]
+        with httpx.Client(base_url=base_url, timeout=120) as client:
+            while time.monotonic() < deadline:
+                name = "create_feedback" if storm_worker else rng.choices(names, weights)[0]
+                started = time.perf_counter()
+                try:
+                    ok = run_operation(client, name, account, rng).status_code < 400
+                except httpx.HTTPError:
+                    ok = False
+                elapsed = time.perf_counter() - started
+                with lock:
+                    results["storm_create_feedback" if storm_worker else name].append((elapsed, ok))
+
+    samples: List[Tuple[int, int]] = []
+    stop = threading.Event()
+    # 비동기 모드에서는 주요 API가 비동기 엔진의 연결 풀을 사용
+    sampled_engine = async_engine.sync_engine if DB_ASYNC_ENABLED else engine
+    sampler = threading.Thread(target=sample_pool, args=(sampled_engine, stop, samples), daemon=True)
+    sampler.start()
+
+    started = time.monotonic()
+    workers = [threading.Thread(target=worker, args=(i,)) for i in range(concurrency)]
+    workers += [
+        threading.Thread(target=worker, args=(concurrency + i, True)) for i in range(storm)
+    ]
+    for thread in workers:
+        thread.start()
+    for thread in workers:
+        thread.join()
+    elapsed = time.monotonic() - started
+    stop.set()
+    sampler.join()
+
+    endpoints = {}
+    total = 0
+    for name, records in results.items():
+        latencies = [latency for latency, _ in records]
+        errors = sum(1 for _, ok in records if not ok)
+        total += len(records)
+        endpoints[name] = {
+            "requests": len(records),
+            "throughput_rps": round(len(records) / elapsed, 3),
+            "errors": errors,
+            "error_rate": round(errors / len(records), 4) if records else 0.0,
+            "p50_ms": round(percentile(latencies, 0.50) * 1000, 2),
+            "p95_ms": round(percentile(latencies, 0.95) * 1000, 2),
+            "p99_ms": round(percentile(latencies, 0.99) * 1000, 2),
+            "max_ms": round(max(latencies) * 1000, 2) if latencies else 0.0,
+        }
+
+    capacity = DB_POOL_SIZE + DB_MAX_OVERFLOW
+    checked_out = [used for used, _ in samples] or [0]
+    return {
+        "concurrency": concurrency,
+        "storm": storm,
+        "duration_s": round(elapsed, 3),
+        "total_requests": total,
+        "total_throughput_rps": round(total / elapsed, 3),
+        "endpoints": endpoints,
+        "db_pool": {
+            "pool_size": DB_POOL_SIZE,
+            "max_overflow": DB_MAX_OVERFLOW,
+            "max_checked_out": max(checked_out),
+            "avg_checked_out": round(sum(checked_out) / len(checked_out), 2),
+            "peak_utilization": round(max(checked_out) / capacity, 4),
+            # 모든 연결이 사용 중이던 시간 비율 (이때 새 요청은 연결을 기다림)
+            "saturated_ratio": round(
+                sum(1 for used in checked_out if used >= capacity) / len(checked_out), 4
+            ),
+        },
+    }
+
+
+def git_commit() -> str:
+    try:
+        return subprocess.check_output(
+            ["git", "rev-parse", "--short", "HEAD"],
+            cwd=os.path.dirname(os.path.abspath(__file__)),
+            text=True,
+        ).strip()
+    except Exception:
+        return ""
+
+
+def print_level(result: Dict[str, Any]) -> None:
+    print(
+        f"\n📊 동시 사용자 {result['concurrency']}명"
+        + (f" + 생성 전용 {result['storm']}명" if result.get("storm") else "")
+        + ": "
+        f"{result['total_throughput_rps']} req/s, "
+        f"DB 풀 최대 사용 {result['db_pool']['max_checked_out']}"
+        f" (포화 {result['db_pool']['saturated_ratio'] * 100:.1f}%)"
+    )
+    for name, stats in result["endpoints"].items():
+        print(
+            f"  {name:<16} {stats['requests']:>6}건 {stats['throughput_rps']:>8} req/s "
+            f"p50 {stats['p50_ms']:>8}ms p95 {stats['p95_ms']:>8}ms p99 {stats['p99_ms']:>8}ms "
+            f"오류 {stats['error_rate'] * 100:.1f}%"
+        )
+
+
+def _mode_argv(argv: List[str], mode: str, output: str) -> List[str]:
+    """현재 실행 인자에서 --db-mode, --output을 바꾼 인자 목록"""
+    result = []
+    skip = False
+    for arg in argv:
+        if skip:
+            skip = False
+            continue
+        if arg in ("--db-mode", "--output"):
+            skip = True
+            continue
+        if arg.startswith(("--db-mode=", "--output=")):
+            continue
+        result.append(arg)
+    return result + ["--db-mode", mode, "--output", output]
+
+
+def compare_db_modes(args) -> None:
+    """
+    같은 인자로 동기/비동기 DB 모드를 각각 별도 프로세스에서 실행하고 단계별 결과 비교
+    (DB 모드는 backend import 시점에 정해지므로 모드마다 새 프로세스 사용)
+    """
+    base = args.output or os.path.join(
+        "benchmark_results", f"load_{datetime.now().strftime('%Y%m%d_%H%M%S')}.json"
+    )
+    base = base[: -len(".json")] if base.endswith(".json") else base
+    reports = {}
+    for mode in ("sync", "async"):
+        output = f"{base}_{mode}.json"
+        print(f"\n===== DB 모드: {mode} =====")
+        subprocess.run(
+            [sys.executable, os.path.abspath(__file__)] + _mode_argv(sys.argv[1:], mode, output),
+            check=True,
+        )
+        with open(output, encoding="utf-8") as f:
+            reports[mode] = json.load(f)
+
+    print("\n📊 DB 모드 비교 (동시 사용자 수별 처리량 / 엔드포인트 p95)")
+    for sync_level, async_level in zip(reports["sync"]["levels"], reports["async"]["levels"]):
+        print(f"  동시 사용자 {sync_level['concurrency']}명")
+        for mode, level in (("sync", sync_level), ("async", async_level)):
+            p95 = ", ".join(
+                f"{name} {stats['p95_ms']}ms" for name, stats in level["endpoints"].items()
+            )
+            errors = sum(stats["errors"] for stats in level["endpoints"].values())
+            print(
+                f"    {mode:<5} {level['total_throughput_rps']:>8} req/s  "
+                f"DB 풀 최대 {level['db_pool']['max_checked_out']:>3}  오류 {errors:>4}  p95: {p95}"
+            )
+
+
+def main():
+    args = parse_args()
+    if args.db_mode == "compare":
+        compare_db_modes(args)
+        return
+    configure_environment(args)
+
+    levels = [int(level) for level in args.levels.split(",")]
+    mix = [
+        (name.strip(), float(weight))
+        for name, weight in (item.split("=") for item in args.mix.split(","))
+    ]
+
+    port = free_port()
+    base_url = f"http://127.0.0.1:{port}"
+    server, thread = start_server(port)
+    print(f"🚀 벤치마크 서버 시작: {base_url} (DB: {args.db_url}, DB 모드: {args.db_mode}, LLM: fake)")
+
+    try:
+        accounts = seed_data(base_url, args.teachers, args.students)
+        results = []
+        for concurrency in levels:
+            result = run_level(
+                base_url, concurrency, args.duration, accounts, mix, args.seed, args.storm
+            )
+            print_level(result)
+            results.append(result)
+    finally:
+        server.should_exit = True
+        thread.join(timeout=10)
+
+    from backend.password_hasher import password_hasher
+    from backend.teacher_cache import teacher_cache
+    from core_logic.llm_metrics import llm_metrics
+
+    auth_cache = teacher_cache.stats()
+    print(
+        f"\n🔑 인증 캐시 히트율 {auth_cache['hit_ratio'] * 100:.1f}% "
+        f"(미스 {auth_cache['misses']}건, 조회 평균 {auth_cache['avg_lookup_ms']}ms, "
+        f"절약 추정 {auth_cache['estimated_saved_ms']}ms)"
+    )
+    password_hashing = password_hasher.stats()
+    print(
+        f"🔐 비밀번호 해싱 워커 {password_hashing['workers']}개: "
+        f"해싱 {password_hashing['hash']}건, 검증 {password_hashing['verify']}건, "
+        f"평균 지연 {password_hashing['latency_seconds']['avg']}s "
+        f"(해싱 {password_hashing['hash_seconds']['avg']}s), "
+        f"최대 큐 깊이 {password_hashing['max_queue_depth']}, 거절 {password_hashing['rejected']}건"
+    )
+
+    report = {
+        "meta": {
+            "commit": git_commit(),
+            "timestamp": datetime.now().isoformat(timespec="seconds"),
+            "python": sys.version.split()[0],
+            "args": vars(args),
+            # 동기 모드의 라우트는 anyio 스레드풀(기본 40개)에서 실행되어 동시 처리 수가 제한됨
+            "db_mode": args.db_mode,
+            "mix": dict(mix),
+        },
+        "levels": results,
+        "llm_calls": llm_metrics.snapshot(),
+        "auth_cache": auth_cache,
+        "password_hashing": password_hashing,
+    }
+
+    output = args.output or os.path.join(
+        "benchmark_results", f"load_{datetime.now().strftime('%Y%m%d_%H%M%S')}.json"
+    )
+    os.makedirs(os.path.dirname(output) or ".", exist_ok=True)
+    with open(output, "w", encoding="utf-8") as f:
+        json.dump(report, f, ensure_ascii=False, indent=2)
+    print(f"\n💾 결과 저장: {output}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,186 @@
+#!/usr/bin/env python3
+"""
+학생 목록 / 피드백 생성 API의 SQL 쿼리 수 회귀 검사
+
+로컬 sqlite 데이터베이스에 학생과 수업 기록을 만든 뒤 API를 호출하며 DB 왕복 수를 셉니다.
+- 학생 목록: 학생 수가 늘어도 쿼리 수가 같아야 함 (N+1 없음)
+- 피드백 생성(가짜 LLM): SQL 문 + 커밋 수가 기준 이하여야 함
+기준을 넘으면 종료 코드 1로 실패합니다.
+
+사용법:
+    python check_query_count.py
+    python check_query_count.py --students 10,100 --classes 3
+"""
+
+import argparse
+import os
+import sys
+import tempfile
+from typing import Dict, List, Tuple
+
+# 프로젝트 루트 디렉토리를 Python 경로에 추가
+sys.path.append(os.path.dirname(os.path.abspath(__file__)))
+
+PASSWORD = "query-count-password"
+# 요청 하나에 허용하는 최대 SQL 문 수 (로그인 후에는 인증된 선생님 캐시로 인증 조회 없음)
+MAX_QUERIES = {
+    "/api/v1/students": 4,
+    "/api/v1/students/summary": 2,
+}
+# 피드백 생성 요청 하나에 허용하는 최대 DB 왕복 수 (SQL 문 + 커밋)
+# 소유권 조회 1 + 수업/피드백/요약 저장 4 + 커밋 + 프롬프트 입력 조회 3 + 커밋 + AI 코멘트 저장 + 커밋
+MAX_CREATE_ROUND_TRIPS = 12
+
+
+def parse_args():
+    parser = argparse.ArgumentParser(description="학생 목록 API 쿼리 수 검사")
+    parser.add_argument("--students", default="10,100", help="검사할 학생 수 (쉼표 구분)")
+    parser.add_argument("--classes", type=int, default=3, help="학생당 수업 기록 수")
+    return parser.parse_args()
+
+
+def configure_environment() -> str:
+    """backend를 import하기 전에 임시 sqlite DB와 가짜 LLM 설정"""
+    path = os.path.join(tempfile.mkdtemp(prefix="query_count_"), "query_count.db")
+    os.environ["DATABASE_URL"] = f"sqlite:///{path}"
+    os.environ["LLM_PROVIDER"] = "fake"
+    os.environ.setdefault("LLM_FAKE_LATENCY_MEDIAN", "0.01")
+    os.environ.setdefault("SECRET_KEY", "query-count-secret")
+    return path
+
+
+def seed_students(teacher_id: int, students: int, classes: int) -> None:
+    """선생님 한 명에게 학생과 수업 기록(피드백 포함)을 한 번에 생성"""
+    from datetime import date
+
+    from backend import models
+    from backend.database import SessionLocal
+
+    with SessionLocal() as db:
+        for i in range(students):
+            db_student = models.Student(
+                teacher_id=teacher_id, name=f"학생{i}", grade_id=1 + i % 13
+            )
+            db_student.classes = [
+                models.Class(
+                    teacher_id=teacher_id,
+                    subject="수학",
+                    class_date=date(2024, 1, 1 + j % 28),
+                    progress_text="이차방정식",
+                    class_memo="메모",
+                    feedback=models.Feedback(
+                        attitude_score=3, understanding_score=4, homework_score=5, qa_score=2
+                    ),
+                )
+                for j in range(classes)
+            ]
+            db.add(db_student)
+        db.commit()
+
+
+def count_round_trips(send) -> Tuple[int, int]:
+    """send()로 요청 하나를 보내는 동안 실행된 (SQL 문 수, 커밋 수)"""
+    from sqlalchemy import event
+
+    from backend.database import engine
+
+    statements: List[str] = []
+    commits: List[None] = []
+
+    def on_execute(conn, cursor, statement, parameters, context, executemany):
+        statements.append(statement)
+
+    def on_commit(conn):
+        commits.append(None)
+
+    event.listen(engine, "before_cursor_execute", on_execute)
+    event.listen(engine, "commit", on_commit)
+    try:
+        response = send()
+        response.raise_for_status()
+    finally:
+        event.remove(engine, "before_cursor_execute", on_execute)
+        event.remove(engine, "commit", on_commit)
+    return len(statements), len(commits)
+
+
+def count_queries(client, path: str, headers: Dict[str, str]) -> int:
+    """요청 하나가 실행한 SQL 문 수"""
+    statements, _ = count_round_trips(lambda: client.get(path, headers=headers))
+    return statements
+
+
+def count_create_round_trips(client, student_id: int, headers: Dict[str, str]) -> Tuple[int, int]:
+    """피드백 생성 요청 하나의 (SQL 문 수, 커밋 수) - 누적 요약이 만들어진 뒤의 정상 상태 기준"""
+    body = {
+        "class_info": {
+            "subject": "수학",
+            "class_date": "2024-03-01",
+            "progress_text": "이차방정식",
+            "class_memo": "메모",
+        },
+        "feedback_info": {
+            "attitude_score": 3, "understanding_score": 4, "homework_score": 5, "qa_score": 2
+        },
+    }
+    # 첫 요청은 시드 데이터의 누적 요약을 한 번 만들기 위해 조회가 더 필요하므로 제외
+    client.post(f"/api/v1/students/{student_id}/feedbacks", json=body, headers=headers).raise_for_status()
+    return count_round_trips(
+        lambda: client.post(f"/api/v1/students/{student_id}/feedbacks", json=body, headers=headers)
+    )
+
+
+def main():
+    args = parse_args()
+    configure_environment()
+    sizes = [int(size) for size in args.students.split(",")]
+
+    from fastapi.testclient import TestClient
+
+    from backend.main import app
+
+    results: Dict[str, Dict[int, int]] = {path: {} for path in MAX_QUERIES}
+    create_round_trips: Dict[int, Tuple[int, int]] = {}
+    with TestClient(app) as client:
+        for index, size in enumerate(sizes):
+            email = f"query{index}@example.com"
+            teacher = client.post(
+                "/api/v1/teachers/", json={"email": email, "password": PASSWORD, "name": "선생님"}
+            ).json()
+            token = client.post(
+                "/api/v1/auth/token", data={"username": email, "password": PASSWORD}
+            ).json()["access_token"]
+            headers = {"Authorization": f"Bearer {token}"}
+            seed_students(teacher["teacher_id"], size, args.classes)
+
+            for path in MAX_QUERIES:
+                results[path][size] = count_queries(client, path, headers)
+
+            student_id = client.get("/api/v1/students/summary", headers=headers).json()[0]["student_id"]
+            create_round_trips[size] = count_create_round_trips(client, student_id, headers)
+
+    failed = False
+    print(f"\n📊 학생 목록 API 쿼리 수 (학생당 수업 {args.classes}건)")
+    for path, counts in results.items():
+        detail = ", ".join(f"학생 {size}명: {count}개" for size, count in counts.items())
+        constant = len(set(counts.values())) == 1
+        within = max(counts.values()) <= MAX_QUERIES[path]
+        status = "✅" if constant and within else "❌"
+        print(f"  {status} {path:<28} {detail} (최대 {MAX_QUERIES[path]}개)")
+        failed = failed or not (constant and within)
+
+    print(f"\n📊 피드백 생성 API DB 왕복 수 (SQL 문 + 커밋, 최대 {MAX_CREATE_ROUND_TRIPS})")
+    for size, (statements, commits) in create_round_trips.items():
+        within = statements + commits <= MAX_CREATE_ROUND_TRIPS
+        status = "✅" if within else "❌"
+        print(f"  {status} 학생 {size}명: SQL {statements}개 + 커밋 {commits}회 = {statements + commits}")
+        failed = failed or not within
+
+    if failed:
+        print("\n❌ 쿼리 수가 학생 수에 따라 늘어나거나 기준을 넘었습니다. (N+1 지연 로딩, 불필요한 재조회/커밋 확인)")
+        sys.exit(1)
+    print("\n✅ 쿼리 수가 기준 이내이며 학생 수와 관계없이 일정합니다.")
+
+
+if __name__ == "__main__":
+    main()
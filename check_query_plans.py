@@ -0,0 +1,238 @@
+#!/usr/bin/env python3
+"""
+crud.py 조회 쿼리의 실행 계획(EXPLAIN) 회귀 검사
+
+로컬 데이터베이스(기본: 임시 sqlite)에 테스트 데이터를 만든 뒤 crud.py의 조회 함수를 호출하며
+실행된 SELECT 문을 모으고, 각 문장의 실행 계획에 테이블 전체 스캔이 있으면 종료 코드 1로 실패합니다.
+- sqlite: EXPLAIN QUERY PLAN 결과에 'SCAN <테이블>'이 있으면 전체 스캔
+- MySQL: EXPLAIN 결과의 type이 ALL(테이블 전체) 또는 index(인덱스 전체)이면 전체 스캔
+
+사용법:
+    python check_query_plans.py
+    python check_query_plans.py --db-url mysql+pymysql://user:pw@localhost/plan_check  # 빈 테스트용 DB
+"""
+
+import argparse
+import os
+import re
+import sys
+import tempfile
+from datetime import date, datetime
+from typing import Any, Callable, Dict, List, Tuple
+
+# 프로젝트 루트 디렉토리를 Python 경로에 추가
+sys.path.append(os.path.dirname(os.path.abspath(__file__)))
+
+# 행 수가 고정된 작은 참조 테이블은 전체 스캔 허용
+ALLOWED_FULL_SCAN_TABLES = {"grades"}
+
+
+def parse_args():
+    parser = argparse.ArgumentParser(description="crud.py 조회 쿼리 실행 계획 검사")
+    parser.add_argument("--db-url", default="", help="검사용 데이터베이스 URL (기본: 임시 sqlite)")
+    parser.add_argument("--teachers", type=int, default=5, help="가상 선생님 수")
+    parser.add_argument("--students", type=int, default=20, help="선생님당 학생 수")
+    parser.add_argument("--classes", type=int, default=10, help="학생당 수업 기록 수")
+    parser.add_argument("--verbose", action="store_true", help="모든 쿼리의 실행 계획 출력")
+    return parser.parse_args()
+
+
+def configure_environment(db_url: str) -> None:
+    """backend를 import하기 전에 검사용 DB와 가짜 LLM 설정"""
+    if not db_url:
+        path = os.path.join(tempfile.mkdtemp(prefix="query_plans_"), "query_plans.db")
+        db_url = f"sqlite:///{path}"
+    os.environ["DATABASE_URL"] = db_url
+    os.environ["LLM_PROVIDER"] = "fake"
+    os.environ.setdefault("SECRET_KEY", "query-plan-secret")
+
+
+def seed_data(db, teachers: int, students: int, classes: int) -> Dict[str, Any]:
+    """선생님, 학생, 수업 기록(피드백 포함)과 피드백 생성 작업을 만든 뒤 검사에 사용할 ID 반환"""
+    from backend import crud, models
+
+    for t in range(teachers):
+        teacher = models.Teacher(
+            name=f"선생님{t}", email=f"plan{t}@example.com", hashed_password="x"
+        )
+        for s in range(students):
+            student = models.Student(name=f"학생{t}-{s}", grade_id=1 + s % 13)
+            student.classes = [
+                models.Class(
+                    teacher=teacher,
+                    subject="수학",
+                    class_date=date(2024, 1 + c % 12, 1 + c % 28),
+                    progress_text="이차방정식",
+                    class_memo="메모",
+                    feedback=models.Feedback(
+                        attitude_score=3, understanding_score=4, homework_score=5, qa_score=2
+                    ),
+                )
+                for c in range(classes)
+            ]
+            teacher.students.append(student)
+        db.add(teacher)
+    db.commit()
+
+    teacher = db.query(models.Teacher).order_by(models.Teacher.teacher_id).first()
+    # 완료된 작업이 대부분인 실제 분포 (미완료 작업 조회가 status 인덱스를 사용하는지 확인)
+    db.add_all(
+        models.FeedbackJob(
+            feedback_id=db_class.feedback.feedback_id,
+            student_id=db_student.student_id,
+            teacher_id=teacher.teacher_id,
+            status=models.FeedbackJob.STATUS_SUCCEEDED,
+        )
+        for db_student in teacher.students
+        for db_class in db_student.classes
+    )
+    db.commit()
+
+    student = teacher.students[0]
+    db_class = student.classes[0]
+    job = crud.create_feedback_job(
+        db,
+        feedback_id=db_class.feedback.feedback_id,
+        student_id=student.student_id,
+        teacher_id=teacher.teacher_id,
+    )
+    return {
+        "teacher_id": teacher.teacher_id,
+        "email": teacher.email,
+        "student_id": student.student_id,
+        "student_ids": [s.student_id for s in teacher.students[:5]],
+        "class_id": db_class.class_id,
+        "class_date": db_class.class_date,
+        "feedback_id": db_class.feedback.feedback_id,
+        "job_id": job.job_id,
+    }
+
+
+def crud_calls(ids: Dict[str, Any]) -> List[Tuple[str, Callable]]:
+    """검사할 crud.py 조회 함수 호출 목록 (이름, db를 받는 함수)"""
+    from backend import crud
+
+    t, s = ids["teacher_id"], ids["student_id"]
+    return [
+        ("get_teacher_by_email", lambda db: crud.get_teacher_by_email(db, ids["email"])),
+        ("get_student", lambda db: crud.get_student(db, s, t)),
+        ("get_student_with_classes", lambda db: crud.get_student_with_classes(db, s, t)),
+        ("get_students_by_teacher", lambda db: crud.get_students_by_teacher(db, t, limit=10)),
+        (
+            "get_students_by_teacher(cursor)",
+            lambda db: crud.get_students_by_teacher(db, t, limit=10, after_student_id=s),
+        ),
+        ("get_student_list_by_teacher", lambda db: crud.get_student_list_by_teacher(db, t, limit=10)),
+        (
+            "get_student_list_by_teacher(cursor)",
+            lambda db: crud.get_student_list_by_teacher(db, t, limit=10, after_student_id=s),
+        ),
+        ("get_student_past_classes", lambda db: crud.get_student_past_classes(db, s)),
+        ("get_student_summary", lambda db: crud.get_student_summary(db, s)),
+        ("get_student_names_by_teacher", lambda db: crud.get_student_names_by_teacher(db, ids["student_ids"], t)),
+        ("get_classes_with_feedback", lambda db: crud.get_classes_with_feedback(db, [ids["class_id"]], t)),
+        ("get_feedback", lambda db: crud.get_feedback(db, ids["feedback_id"], t)),
+        ("get_feedbacks_by_student", lambda db: crud.get_feedbacks_by_student(db, s, limit=20)),
+        (
+            "get_feedbacks_by_student(cursor)",
+            lambda db: crud.get_feedbacks_by_student(
+                db, s, limit=20, before=(ids["class_date"], ids["class_id"])
+            ),
+        ),
+        ("get_grade", lambda db: crud.get_grade(db, 1)),
+        ("get_feedback_job", lambda db: crud.get_feedback_job(db, ids["job_id"], t)),
+        ("get_reclaimable_feedback_jobs", lambda db: crud.get_reclaimable_feedback_jobs(db, datetime.now())),
+    ]
+
+
+def capture_selects(engine, db, call: Callable) -> List[Tuple[str, Any]]:
+    """call(db) 실행 중 발생한 SELECT 문과 파라미터"""
+    from sqlalchemy import event
+
+    statements: List[Tuple[str, Any]] = []
+
+    def on_execute(conn, cursor, statement, parameters, context, executemany):
+        if statement.lstrip().upper().startswith("SELECT"):
+            statements.append((statement, parameters))
+
+    event.listen(engine, "before_cursor_execute", on_execute)
+    try:
+        call(db)
+    finally:
+        event.remove(engine, "before_cursor_execute", on_execute)
+        db.rollback()
+    return statements
+
+
+def explain(engine, statement: str, parameters: Any) -> Tuple[List[str], List[str]]:
+    """실행 계획 행(문자열)과 전체 스캔 테이블 목록"""
+    connection = engine.raw_connection()
+    try:
+        cursor = connection.cursor()
+        if engine.dialect.name == "sqlite":
+            cursor.execute("EXPLAIN QUERY PLAN " + statement, parameters)
+            details = [row[-1] for row in cursor.fetchall()]
+            scans = [
+                match.group(1)
+                for detail in details
+                for match in [re.match(r"SCAN (?:TABLE )?(\w+)", detail)]
+                if match and "USING" not in detail
+            ]
+            return details, scans
+
+        cursor.execute("EXPLAIN " + statement, parameters)
+        columns = [column[0] for column in cursor.description]
+        rows = [dict(zip(columns, row)) for row in cursor.fetchall()]
+        details = [
+            f"{row.get('table')}: type={row.get('type')} key={row.get('key')} rows={row.get('rows')}"
+            for row in rows
+        ]
+        scans = [row["table"] for row in rows if row.get("type") in ("ALL", "index") and row.get("table")]
+        return details, scans
+    finally:
+        connection.close()
+
+
+def main():
+    args = parse_args()
+    configure_environment(args.db_url)
+
+    from backend import main as _app  # noqa: F401  (테이블, 인덱스, 학년 데이터 생성)
+    from backend.database import SessionLocal, engine
+
+    if engine.dialect.name not in ("sqlite", "mysql"):
+        print(f"❌ 지원하지 않는 데이터베이스: {engine.dialect.name}")
+        sys.exit(1)
+
+    failures = []
+    with SessionLocal() as db:
+        ids = seed_data(db, args.teachers, args.students, args.classes)
+
+        print(f"\n📋 crud.py 조회 쿼리 실행 계획 ({engine.dialect.name})")
+        for name, call in crud_calls(ids):
+            statements = capture_selects(engine, db, call)
+            full_scans = []
+            plans = []
+            for statement, parameters in statements:
+                details, scans = explain(engine, statement, parameters)
+                plans.append(details)
+                full_scans += [table for table in scans if table not in ALLOWED_FULL_SCAN_TABLES]
+
+            status = "❌" if full_scans else "✅"
+            suffix = f" 전체 스캔: {', '.join(sorted(set(full_scans)))}" if full_scans else ""
+            print(f"  {status} {name:<38} 쿼리 {len(statements)}개{suffix}")
+            if full_scans or args.verbose:
+                for details in plans:
+                    for detail in details:
+                        print(f"      {detail}")
+            if full_scans:
+                failures.append(name)
+
+    if failures:
+        print(f"\n❌ 전체 스캔이 있는 쿼리: {', '.join(failures)}")
+        sys.exit(1)
+    print("\n✅ 모든 조회 쿼리가 인덱스를 사용합니다.")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,218 @@
+#!/usr/bin/env python3
+"""
+읽기 복제본 라우팅 검사
+
+sqlite 파일 세 개를 primary 1개 + 복제본 2개로 사용합니다. (복제는 파일 복사로 흉내내며,
+복사 이후의 쓰기는 복제본에 반영되지 않으므로 복제 지연이 있는 상태가 됩니다)
+- 조회 API(학생 목록/상세, 피드백 목록/상세, 학년 목록)는 복제본에서 실행되고 복제본 사이에 분산
+- 쓰기 API는 primary에서 실행
+- 쓰기를 한 선생님은 DB_REPLICA_STICKY_SECONDS 동안 자신이 쓴 데이터를 primary에서 읽음 (read-your-writes)
+- 쓰기 응답의 X-Last-Write 헤더를 보내면 다른 워커(프로세스 내 쓰기 기록이 없는 경우)에서도 primary 사용
+- 다른 선생님의 조회는 계속 복제본 사용, 고정 시간이 지나면 다시 복제본 사용
+하나라도 기대와 다르면 종료 코드 1로 실패합니다.
+
+사용법:
+    python check_read_replica.py
+"""
+
+import os
+import sqlite3
+import sys
+import tempfile
+import time
+from typing import Callable, Dict, List
+
+# 프로젝트 루트 디렉토리를 Python 경로에 추가
+sys.path.append(os.path.dirname(os.path.abspath(__file__)))
+
+PASSWORD = "read-replica-password"
+STICKY_SECONDS = 1.0
+FEEDBACK_BODY = {
+    "class_info": {
+        "subject": "수학",
+        "class_date": "2024-03-01",
+        "progress_text": "이차방정식",
+        "class_memo": "메모",
+    },
+    "feedback_info": {"attitude_score": 3, "understanding_score": 4, "homework_score": 5, "qa_score": 2},
+}
+
+
+def configure_environment() -> Dict[str, str]:
+    """backend를 import하기 전에 primary / 복제본 sqlite 파일과 가짜 LLM 설정"""
+    directory = tempfile.mkdtemp(prefix="read_replica_")
+    paths = {name: os.path.join(directory, f"{name}.db") for name in ("primary", "replica1", "replica2")}
+    os.environ["DATABASE_URL"] = f"sqlite:///{paths['primary']}"
+    os.environ["DB_REPLICA_URLS"] = ",".join(
+        f"sqlite:///{paths[name]}" for name in ("replica1", "replica2")
+    )
+    os.environ["DB_REPLICA_STICKY_SECONDS"] = str(STICKY_SECONDS)
+    os.environ["DB_ASYNC"] = "false"
+    os.environ["LLM_PROVIDER"] = "fake"
+    os.environ.setdefault("LLM_FAKE_LATENCY_MEDIAN", "0.01")
+    os.environ.setdefault("SECRET_KEY", "read-replica-secret")
+    return paths
+
+
+def replicate(paths: Dict[str, str]) -> None:
+    """primary의 현재 내용을 복제본 파일로 복사 (복제 1회)"""
+    with sqlite3.connect(paths["primary"]) as source:
+        for name in ("replica1", "replica2"):
+            with sqlite3.connect(paths[name]) as target:
+                source.backup(target)
+
+
+class StatementCounter:
+    """엔진별로 실행된 SQL 문 수 집계"""
+
+    def __init__(self, engines: Dict[str, object]):
+        from sqlalchemy import event
+
+        self.counts = {name: 0 for name in engines}
+        for name, engine in engines.items():
+            event.listen(engine, "before_cursor_execute", self._listener(name))
+
+    def _listener(self, name: str) -> Callable:
+        def on_execute(conn, cursor, statement, parameters, context, executemany):
+            self.counts[name] += 1
+        return on_execute
+
+    def during(self, send: Callable) -> Dict[str, int]:
+        """send()를 실행하는 동안 엔진별로 실행된 SQL 문 수"""
+        before = dict(self.counts)
+        response = send()
+        response.raise_for_status()
+        self.last_response = response
+        return {name: self.counts[name] - before[name] for name in self.counts}
+
+
+def login(client, email: str) -> Dict[str, str]:
+    client.post(
+        "/api/v1/teachers/", json={"email": email, "password": PASSWORD, "name": "선생님"}
+    ).raise_for_status()
+    token = client.post(
+        "/api/v1/auth/token", data={"username": email, "password": PASSWORD}
+    ).json()["access_token"]
+    return {"Authorization": f"Bearer {token}"}
+
+
+def main():
+    paths = configure_environment()
+
+    from fastapi.testclient import TestClient
+
+    from backend import database
+    from backend.database import LAST_WRITE_HEADER, engine, replica_engines
+    from backend.main import app
+
+    counter = StatementCounter(
+        {"primary": engine, "replica1": replica_engines[0], "replica2": replica_engines[1]}
+    )
+    results: List[tuple] = []
+
+    def check(name: str, ok: bool, detail: str) -> None:
+        results.append((name, ok, detail))
+
+    with TestClient(app) as client:
+        headers_a = login(client, "replica-a@example.com")
+        headers_b = login(client, "replica-b@example.com")
+        student_id = client.post(
+            "/api/v1/students", json={"name": "기존 학생", "grade_id": 3}, headers=headers_a
+        ).json()["student_id"]
+        class_info = client.post(
+            f"/api/v1/students/{student_id}/feedbacks", json=FEEDBACK_BODY, headers=headers_a
+        ).json()
+        feedback_id = class_info["feedback"]["feedback_id"]
+        client.post("/api/v1/students", json={"name": "B 학생", "grade_id": 4}, headers=headers_b)
+        replicate(paths)
+        # 시드 데이터 쓰기로 생긴 primary 고정이 풀릴 때까지 대기
+        time.sleep(STICKY_SECONDS + 0.2)
+
+        reads = {
+            "학생 목록": "/api/v1/students",
+            "학생 목록(요약)": "/api/v1/students/summary",
+            "학생 상세": f"/api/v1/students/{student_id}",
+            "피드백 목록": f"/api/v1/students/{student_id}/feedbacks",
+            "피드백 상세": f"/api/v1/feedbacks/{feedback_id}",
+            "학년 목록": "/api/v1/grades",
+        }
+        used = []
+        for name, path in reads.items():
+            counts = counter.during(lambda: client.get(path, headers=headers_a))
+            replica_queries = counts["replica1"] + counts["replica2"]
+            used += [replica for replica in ("replica1", "replica2") if counts[replica]]
+            # 인증(선생님 조회)만 primary에서 실행
+            check(
+                f"{name} → 복제본",
+                replica_queries > 0 and counts["primary"] <= 1,
+                f"primary {counts['primary']}, 복제본 {replica_queries}",
+            )
+        check("복제본 분산", set(used) == {"replica1", "replica2"}, f"사용한 복제본: {sorted(set(used))}")
+
+        counts = counter.during(
+            lambda: client.post("/api/v1/students", json={"name": "새 학생", "grade_id": 5}, headers=headers_a)
+        )
+        new_student_id = counter.last_response.json()["student_id"]
+        last_write = counter.last_response.headers.get(LAST_WRITE_HEADER)
+        check("쓰기 응답 → 쓰기 시각 헤더", bool(last_write), f"{LAST_WRITE_HEADER}: {last_write}")
+        check(
+            "쓰기 → primary",
+            counts["primary"] > 0 and counts["replica1"] + counts["replica2"] == 0,
+            f"primary {counts['primary']}, 복제본 {counts['replica1'] + counts['replica2']}",
+        )
+
+        counts = counter.during(lambda: client.get("/api/v1/students/summary", headers=headers_a))
+        names = [student["name"] for student in counter.last_response.json()]
+        check(
+            "쓴 선생님의 조회 → primary (read-your-writes)",
+            counts["replica1"] + counts["replica2"] == 0 and "새 학생" in names,
+            f"학생 {len(names)}명, 복제본 쿼리 {counts['replica1'] + counts['replica2']}",
+        )
+
+        # 다른 워커가 조회를 받은 경우: 프로세스 내 쓰기 기록 없이 클라이언트가 보낸 헤더로만 판단
+        database._recent_writes.clear()
+        counts = counter.during(
+            lambda: client.get(
+                "/api/v1/students/summary", headers={**headers_a, LAST_WRITE_HEADER: last_write}
+            )
+        )
+        names = [student["name"] for student in counter.last_response.json()]
+        check(
+            "다른 워커 + 쓰기 시각 헤더 → primary",
+            counts["replica1"] + counts["replica2"] == 0 and "새 학생" in names,
+            f"학생 {len(names)}명, 복제본 쿼리 {counts['replica1'] + counts['replica2']}",
+        )
+        counts = counter.during(lambda: client.get("/api/v1/students/summary", headers=headers_a))
+        check(
+            "다른 워커 + 헤더 없음 → 복제본",
+            counts["replica1"] + counts["replica2"] > 0,
+            f"복제본 쿼리 {counts['replica1'] + counts['replica2']}",
+        )
+
+        counts = counter.during(lambda: client.get("/api/v1/students/summary", headers=headers_b))
+        check(
+            "다른 선생님의 조회 → 복제본",
+            counts["replica1"] + counts["replica2"] > 0,
+            f"복제본 쿼리 {counts['replica1'] + counts['replica2']}",
+        )
+
+        time.sleep(STICKY_SECONDS + 0.2)
+        counts = counter.during(lambda: client.get("/api/v1/students/summary", headers=headers_a))
+        ids = [student["student_id"] for student in counter.last_response.json()]
+        check(
+            "고정 시간 이후 → 다시 복제본",
+            counts["replica1"] + counts["replica2"] > 0 and new_student_id not in ids,
+            f"복제본 쿼리 {counts['replica1'] + counts['replica2']} (복제 전 학생 {len(ids)}명)",
+        )
+
+    print(f"\n📋 읽기 복제본 라우팅 (복제본 2개, 고정 시간 {STICKY_SECONDS}초)")
+    for name, ok, detail in results:
+        print(f"  {'✅' if ok else '❌'} {name:<36} {detail}")
+    if not all(ok for _, ok, _ in results):
+        print("\n❌ 복제본 라우팅이 기대와 다릅니다.")
+        sys.exit(1)
+    print("\n✅ 조회는 복제본, 쓰기와 직후 조회는 primary로 전달됩니다.")
+
+
+if __name__ == "__main__":
+    main()
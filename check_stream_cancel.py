@@ -0,0 +1,172 @@
+#!/usr/bin/env python3
+"""
+피드백 스트리밍(SSE) 연결 종료 검사
+
+실제 HTTP 서버(uvicorn)를 띄우고 가짜 LLM으로 스트리밍 API를 호출합니다.
+- 첫 토큰을 받은 뒤 클라이언트가 연결을 끊으면, 세 섹션의 LLM 스트림이 끝나기 전에
+  취소되어 동시성 슬롯(in_flight)이 바로 반환되는지 확인
+- 끝까지 받은 스트림은 done 이벤트로 완료되고 슬롯이 반환되는지 확인
+- 서킷 브레이커가 열려 있으면 LLM을 호출하지 않고(시험 호출 자리도 차지하지 않음) 초안으로 완료되는지 확인
+하나라도 기대와 다르면 종료 코드 1로 실패합니다.
+
+사용법:
+    python check_stream_cancel.py
+"""
+
+import json
+import os
+import socket
+import sys
+import tempfile
+import threading
+import time
+from typing import Dict, List
+
+# 프로젝트 루트 디렉토리를 Python 경로에 추가
+sys.path.append(os.path.dirname(os.path.abspath(__file__)))
+
+PASSWORD = "stream-cancel-password"
+# 가짜 LLM 스트림 한 번에 걸리는 시간(초), 연결 종료 후 이보다 훨씬 빨리 슬롯이 반환되어야 함
+STREAM_SECONDS = 3.0
+RELEASE_TIMEOUT_SECONDS = 1.0
+FEEDBACK_BODY = {
+    "class_info": {
+        "subject": "수학",
+        "class_date": "2024-03-01",
+        "progress_text": "이차방정식",
+        "class_memo": "메모",
+    },
+    "feedback_info": {"attitude_score": 3, "understanding_score": 4, "homework_score": 5, "qa_score": 2},
+}
+
+
+def configure_environment() -> None:
+    """backend를 import하기 전에 임시 sqlite DB와 느린 가짜 LLM 설정"""
+    directory = tempfile.mkdtemp(prefix="stream_cancel_")
+    os.environ["DATABASE_URL"] = f"sqlite:///{os.path.join(directory, 'stream.db')}"
+    os.environ["DB_ASYNC"] = "false"
+    os.environ["LLM_PROVIDER"] = "fake"
+    os.environ["LLM_FAKE_LATENCY_MEDIAN"] = str(STREAM_SECONDS)
+    os.environ["LLM_FAKE_LATENCY_SIGMA"] = "0"
+    os.environ["LLM_CACHE_ENABLED"] = "false"
+    os.environ["PASSWORD_HASH_WORKERS"] = "0"
+    os.environ.setdefault("SECRET_KEY", "stream-cancel-secret")
+
+
+def start_server(app) -> str:
+    """빈 포트에서 uvicorn 서버를 백그라운드 스레드로 시작하고 기본 URL 반환"""
+    import uvicorn
+
+    with socket.socket() as sock:
+        sock.bind(("127.0.0.1", 0))
+        port = sock.getsockname()[1]
+    server = uvicorn.Server(uvicorn.Config(app, host="127.0.0.1", port=port, log_level="warning"))
+    threading.Thread(target=server.run, daemon=True).start()
+    while not server.started:
+        time.sleep(0.05)
+    return f"http://127.0.0.1:{port}"
+
+
+def wait_for_release(concurrency, timeout: float) -> float:
+    """동시성 슬롯이 모두 반환될 때까지 기다린 시간(초), timeout 안에 반환되지 않으면 -1"""
+    started = time.monotonic()
+    while time.monotonic() - started < timeout:
+        if concurrency.snapshot()["in_flight"] == 0:
+            return time.monotonic() - started
+        time.sleep(0.02)
+    return -1.0
+
+
+def read_events(response, stop_after: str = "") -> List[str]:
+    """SSE 응답의 이벤트 이름 목록 (stop_after 이벤트를 받으면 그 자리에서 중단)"""
+    events = []
+    for line in response.iter_lines():
+        if line.startswith("event: "):
+            events.append(line[len("event: "):])
+            if events[-1] == stop_after:
+                break
+        elif line.startswith("data: ") and events and events[-1] == "done":
+            events.append(json.loads(line[len("data: "):])["ai_comment_overall"])
+    return events
+
+
+def main():
+    configure_environment()
+
+    import httpx
+
+    from backend.main import app
+    from core_logic.circuit_breaker import breaker
+    from core_logic.rate_limiter import limiter
+
+    concurrency = limiter.concurrency
+    results: List[tuple] = []
+
+    def check(name: str, ok: bool, detail: str) -> None:
+        results.append((name, ok, detail))
+
+    base_url = start_server(app)
+    with httpx.Client(base_url=base_url, timeout=30) as client:
+        client.post(
+            "/api/v1/teachers/", json={"email": "stream@example.com", "password": PASSWORD, "name": "선생님"}
+        ).raise_for_status()
+        token = client.post(
+            "/api/v1/auth/token", data={"username": "stream@example.com", "password": PASSWORD}
+        ).json()["access_token"]
+        headers: Dict[str, str] = {"Authorization": f"Bearer {token}"}
+        student_id = client.post(
+            "/api/v1/students", json={"name": "스트림 학생", "grade_id": 3}, headers=headers
+        ).json()["student_id"]
+        url = f"/api/v1/students/{student_id}/feedbacks/stream"
+
+        # 1. 첫 토큰 이후 연결 종료
+        cancelled_before = concurrency.snapshot()["cancelled"]
+        with client.stream("POST", url, json=FEEDBACK_BODY, headers=headers) as response:
+            events = read_events(response, stop_after="token")
+            in_flight = concurrency.snapshot()["in_flight"]
+        released = wait_for_release(concurrency, RELEASE_TIMEOUT_SECONDS)
+        cancelled = concurrency.snapshot()["cancelled"] - cancelled_before
+        check(
+            "연결 종료 → 슬롯 반환",
+            events[-1:] == ["token"] and in_flight == 3 and 0 <= released,
+            f"종료 시 in_flight {in_flight}, 반환까지 {released:.2f}초 (스트림 {STREAM_SECONDS:.0f}초)",
+        )
+        check("연결 종료 → 섹션 스트림 취소", cancelled == 3, f"취소된 호출 {cancelled}건")
+
+        # 2. 끝까지 받은 스트림
+        with client.stream("POST", url, json=FEEDBACK_BODY, headers=headers) as response:
+            events = read_events(response)
+        in_flight = concurrency.snapshot()["in_flight"]
+        check(
+            "전체 수신 → done",
+            "done" in events and in_flight == 0,
+            f"이벤트 {len(events)}개, in_flight {in_flight}",
+        )
+
+        # 3. 서킷 브레이커가 열린 상태
+        breaker._open(time.monotonic())
+        rejected_before = breaker.snapshot()["rejected"]
+        started = time.monotonic()
+        with client.stream("POST", url, json=FEEDBACK_BODY, headers=headers) as response:
+            events = read_events(response)
+        elapsed = time.monotonic() - started
+        rejected = breaker.snapshot()["rejected"] - rejected_before
+        breaker.state = breaker.STATE_CLOSED
+        check(
+            "브레이커 열림 → 초안으로 완료",
+            events.count("error") == 3 and "done" in events and elapsed < STREAM_SECONDS,
+            f"이벤트 {events[:-1]}, {elapsed:.2f}초",
+        )
+        check("브레이커 열림 → LLM 호출 전 거부", rejected == 1, f"거부 {rejected}회 (섹션 호출 없이 1회 확인)")
+
+    print(f"\n📋 피드백 스트리밍 연결 종료 (가짜 LLM 스트림 {STREAM_SECONDS:.0f}초)")
+    for name, ok, detail in results:
+        print(f"  {'✅' if ok else '❌'} {name:<24} {detail}")
+    if not all(ok for _, ok, _ in results):
+        print("\n❌ 스트리밍 정리가 기대와 다릅니다.")
+        sys.exit(1)
+    print("\n✅ 연결이 끊기면 LLM 스트림이 취소되고 슬롯이 반환됩니다.")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,185 @@
+# circuit_breaker.py
+"""
+LLM 제공자 호출용 서킷 브레이커
+
+최근 호출(시간 창)의 오류율과 지연 비율을 보고 제공자 상태를 판단합니다.
+- closed: 정상 호출
+- open: 오류/지연이 기준을 넘으면 일정 시간 호출을 바로 거부 (요청 스레드가 타임아웃을 기다리지 않도록)
+- half_open: 대기 시간이 지나면 소수의 시험 호출만 허용하고, 성공하면 closed, 실패하면 다시 open
+"""
+import os
+import threading
+import time
+from collections import deque
+from typing import Any, Deque, Dict, Tuple
+
+from dotenv import load_dotenv
+
+load_dotenv()
+
+BREAKER_ENABLED = os.getenv("LLM_BREAKER_ENABLED", "true").lower() == "true"
+WINDOW_SECONDS = float(os.getenv("LLM_BREAKER_WINDOW_SECONDS", "60"))
+# 창 안의 호출 수가 이보다 적으면 판단하지 않음
+MIN_CALLS = int(os.getenv("LLM_BREAKER_MIN_CALLS", "10"))
+ERROR_RATE_THRESHOLD = float(os.getenv("LLM_BREAKER_ERROR_RATE", "0.5"))
+SLOW_RATE_THRESHOLD = float(os.getenv("LLM_BREAKER_SLOW_RATE", "0.5"))
+# 이 시간(초) 이상 걸린 호출은 느린 호출로 집계
+SLOW_CALL_SECONDS = float(os.getenv("LLM_BREAKER_SLOW_SECONDS", "20"))
+OPEN_SECONDS = float(os.getenv("LLM_BREAKER_OPEN_SECONDS", "30"))
+HALF_OPEN_PROBES = int(os.getenv("LLM_BREAKER_HALF_OPEN_PROBES", "1"))
+
+
+class CircuitOpenError(RuntimeError):
+    """서킷이 열려 있어 LLM 호출을 거부함"""
+
+    def __init__(self, retry_after: float):
+        super().__init__(f"LLM 서킷 브레이커 열림 ({retry_after:.1f}초 후 재시도 가능)")
+        self.retry_after = retry_after
+
+
+class CircuitBreaker:
+    STATE_CLOSED = "closed"
+    STATE_OPEN = "open"
+    STATE_HALF_OPEN = "half_open"
+
+    def __init__(
+        self,
+        window_seconds: float = WINDOW_SECONDS,
+        min_calls: int = MIN_CALLS,
+        error_rate_threshold: float = ERROR_RATE_THRESHOLD,
+        slow_rate_threshold: float = SLOW_RATE_THRESHOLD,
+        slow_call_seconds: float = SLOW_CALL_SECONDS,
+        open_seconds: float = OPEN_SECONDS,
+        half_open_probes: int = HALF_OPEN_PROBES,
+        enabled: bool = BREAKER_ENABLED,
+    ):
+        self.window_seconds = window_seconds
+        self.min_calls = min_calls
+        self.error_rate_threshold = error_rate_threshold
+        self.slow_rate_threshold = slow_rate_threshold
+        self.slow_call_seconds = slow_call_seconds
+        self.open_seconds = open_seconds
+        self.half_open_probes = half_open_probes
+        self.enabled = enabled
+
+        self.state = self.STATE_CLOSED
+        self.opened_at = 0.0
+        self._probes = 0
+        # (완료 시각, 실패 여부, 느린 호출 여부)
+        self._calls: Deque[Tuple[float, bool, bool]] = deque()
+        self._counters = {"opened": 0, "rejected": 0}
+        self._lock = threading.Lock()
+
+    def _trim(self, now: float) -> None:
+        while self._calls and now - self._calls[0][0] > self.window_seconds:
+            self._calls.popleft()
+
+    def _open(self, now: float) -> None:
+        self.state = self.STATE_OPEN
+        self.opened_at = now
+        self._probes = 0
+        self._counters["opened"] += 1
+        print(f"🚨 LLM 서킷 브레이커 열림: {self.open_seconds:.0f}초 동안 호출을 거부합니다.")
+
+    def check(self) -> None:
+        """
+        호출이 바로 거부될 상태이면 CircuitOpenError를 발생시킵니다.
+        시험 호출 자리를 차지하지 않으므로 LLM 호출 전 준비 작업을 건너뛸 때 사용합니다.
+        """
+        if not self.enabled:
+            return
+        with self._lock:
+            if self.state == self.STATE_OPEN:
+                remaining = self.open_seconds - (time.monotonic() - self.opened_at)
+                if remaining > 0:
+                    self._counters["rejected"] += 1
+                    raise CircuitOpenError(remaining)
+
+    def allow(self) -> bool:
+        """
+        호출 허용 여부를 확인합니다. 거부되면 CircuitOpenError를 발생시킵니다.
+        half_open 상태의 시험 호출이면 True를 반환하며, 결과는 record(probe=True)로 알려야 합니다.
+        """
+        if not self.enabled:
+            return False
+
+        with self._lock:
+            now = time.monotonic()
+            if self.state == self.STATE_OPEN:
+                remaining = self.open_seconds - (now - self.opened_at)
+                if remaining > 0:
+                    self._counters["rejected"] += 1
+                    raise CircuitOpenError(remaining)
+                self.state = self.STATE_HALF_OPEN
+                self._probes = 0
+
+            if self.state == self.STATE_HALF_OPEN:
+                if self._probes >= self.half_open_probes:
+                    self._counters["rejected"] += 1
+                    raise CircuitOpenError(0.0)
+                self._probes += 1
+                return True
+            return False
+
+    def record(self, latency: float, failed: bool, probe: bool = False) -> None:
+        """호출 결과 기록 (failed: 제공자 오류)"""
+        if not self.enabled:
+            return
+
+        slow = latency >= self.slow_call_seconds
+        with self._lock:
+            now = time.monotonic()
+            if probe:
+                if self.state != self.STATE_HALF_OPEN:
+                    return
+                self._probes -= 1
+                if failed or slow:
+                    self._open(now)
+                else:
+                    print("✅ LLM 서킷 브레이커 닫힘: 시험 호출 성공")
+                    self.state = self.STATE_CLOSED
+                    self._calls.clear()
+                return
+
+            self._calls.append((now, failed, slow))
+            self._trim(now)
+            if self.state != self.STATE_CLOSED or len(self._calls) < self.min_calls:
+                return
+            total = len(self._calls)
+            failures = sum(1 for _, call_failed, _ in self._calls if call_failed)
+            slow_calls = sum(1 for _, _, call_slow in self._calls if call_slow)
+            if (
+                failures / total >= self.error_rate_threshold
+                or slow_calls / total >= self.slow_rate_threshold
+            ):
+                self._open(now)
+
+    def cancel(self, probe: bool) -> None:
+        """허용된 호출이 제공자에 도달하지 못하고 끝난 경우 (시험 호출 자리 반환)"""
+        if probe:
+            with self._lock:
+                if self.state == self.STATE_HALF_OPEN and self._probes > 0:
+                    self._probes -= 1
+
+    def snapshot(self) -> Dict[str, Any]:
+        with self._lock:
+            now = time.monotonic()
+            self._trim(now)
+            total = len(self._calls)
+            failures = sum(1 for _, failed, _ in self._calls if failed)
+            slow_calls = sum(1 for _, _, slow in self._calls if slow)
+            return {
+                "enabled": self.enabled,
+                "state": self.state,
+                "window_calls": total,
+                "error_rate": round(failures / total, 4) if total else 0.0,
+                "slow_rate": round(slow_calls / total, 4) if total else 0.0,
+                "open_remaining_seconds": round(
+                    max(0.0, self.open_seconds - (now - self.opened_at)), 2
+                ) if self.state == self.STATE_OPEN else 0.0,
+                **self._counters,
+            }
+
+
+# 프로세스 전역 브레이커 (모든 LLM 호출이 공유)
+breaker = CircuitBreaker()
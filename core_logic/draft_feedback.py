@@ -0,0 +1,119 @@
+# draft_feedback.py
+"""
+규칙 기반 즉시 피드백 초안
+
+점수별 해석 가이드 문구로 수업보완 / 수업태도 / 전체 Comment 초안을 조립합니다.
+LLM을 호출하지 않으므로 즉시(1ms 미만) 생성되며, LLM 응답이 늦거나 실패해도 사용할 수 있습니다.
+(data/math_feedback.csv의 참고 컬럼도 같은 문구로 구성되어 있습니다.)
+"""
+from typing import Any, Dict, List, Tuple
+
+# (점수 키, 항목명, {점수: 해석 문구})
+SCORE_GUIDE: List[Tuple[str, str, Dict[int, str]]] = [
+    (
+        "attitude_score",
+        "수업 태도",
+        {
+            5: "수업 전반에 활발히 참여하며, 질문과 의견 제시로 분위기를 이끎.",
+            4: "대부분 성실하게 임하며, 잠깐 흐트러져도 곧 집중을 회복함.",
+            3: "참여 의지는 있으나 발언 빈도가 낮아 추가적인 참여 유도가 필요함.",
+            2: "집중 유지가 어렵고 참여가 소극적이어서 지속적인 관심과 지원이 필요함.",
+            1: "수업 몰입도와 참여도가 매우 낮아 목표 달성을 위해 강력한 지도·관리가 요구됨.",
+        },
+    ),
+    (
+        "understanding_score",
+        "수업 이해도",
+        {
+            5: "학습 내용을 깊이 있게 파악하고, 변형·응용 과제도 스스로 해결함.",
+            4: "핵심 내용을 잘 이해하며, 기본 수준의 응용 문제는 큰 어려움 없이 수행함.",
+            3: "기초 개념은 이해하나, 난도가 높은 문제 해결에는 도움을 필요로 함.",
+            2: "주요 개념 이해가 미흡해 반복 학습과 추가 자료 지원이 필요함.",
+            1: "전반적인 기초부터 재학습이 필요한 수준임.",
+        },
+    ),
+    (
+        "homework_score",
+        "과제 수행",
+        {
+            5: "모든 과제를 정성껏 완수하며, 정확성과 완성도가 높고 제출 기한을 지킴.",
+            4: "대부분 수행하였으나 일부 세부 사항에서 실수나 누락이 있음.",
+            3: "과제의 절반 이상을 제출했으나 정확성·완성도가 부족함.",
+            2: "일부만 제출하거나 기한을 지키지 않는 경우가 잦음.",
+            1: "과제를 거의 제출하지 않거나 미제출함.",
+        },
+    ),
+    (
+        "qa_score",
+        "질문(상호작용)",
+        {
+            5: "적극적으로 질문하며, 질문의 내용이 심화적임",
+            4: "빈번하게 질문하며, 질문의 내용이 기초, 응용 수준임",
+            3: "질문하기는 하되, 질문의 내용이 기초적인 수준임",
+            2: "질문이 거의 없으며, 질문의 내용이 수업과 무관함",
+            1: "질문이 없으며, 교수자의 질문에도 대답을 거의 하지 않음",
+        },
+    ),
+]
+
+_PHRASES = {key: phrases for key, _, phrases in SCORE_GUIDE}
+
+
+def render_score_guide() -> str:
+    """프롬프트에 넣는 항목별 해석 가이드 텍스트"""
+    blocks = []
+    for _, label, phrases in SCORE_GUIDE:
+        lines = [label] + [f"{score}점: {phrases[score]}" for score in sorted(phrases, reverse=True)]
+        blocks.append("\n".join(lines))
+    return "\n\n".join(blocks)
+
+
+def _phrase(scores: Dict[str, Any], key: str) -> str:
+    """점수에 해당하는 해석 문구 (끝의 마침표 제외, 점수는 1~5로 보정)"""
+    try:
+        score = min(5, max(1, int(scores.get(key) or 3)))
+    except (TypeError, ValueError):
+        score = 3
+    return _PHRASES[key][score].rstrip(".")
+
+
+def _object_particle(word: str) -> str:
+    """목적격 조사 (마지막 글자에 받침이 있으면 '을', 없으면 '를')"""
+    last = word[-1] if word else ""
+    if "가" <= last <= "힣":
+        return "을" if (ord(last) - ord("가")) % 28 else "를"
+    return "를"
+
+
+def build_draft_feedback(
+    student_name: str,
+    scores: Dict[str, Any],
+    progress_text: str = "",
+    class_memo: str = "",
+) -> Dict[str, str]:
+    """
+    네 가지 점수와 진도, 수업 메모로 피드백 초안을 만듭니다.
+    반환 형식은 AI 피드백(generate_ai_feedback)과 같습니다. (improvement / attitude / overall)
+    """
+    attitude = _phrase(scores, "attitude_score")
+    understanding = _phrase(scores, "understanding_score")
+    homework = _phrase(scores, "homework_score")
+    qa = _phrase(scores, "qa_score")
+    progress_text = (progress_text or "").strip()
+    class_memo = (class_memo or "").strip()
+
+    improvement = f"{understanding}. {homework}. {qa}."
+    if progress_text:
+        improvement = f"{progress_text}{_object_particle(progress_text)} 학습했습니다. {improvement}"
+    if class_memo:
+        improvement = f"{improvement} {class_memo}"
+
+    overall = f"{student_name} 학생은 {attitude}. 또한 {understanding}. {homework}."
+    if progress_text:
+        overall += f" 향후 {progress_text} 영역에서의 성취를 높이기 위해 노력한다면 더 큰 발전이 기대됩니다."
+
+    return {
+        "improvement": improvement,
+        "attitude": f"{attitude}. {qa}.",
+        "overall": overall,
+    }
@@ -1,22 +1,171 @@
 # feedback_system.py
+import asyncio
+import json
 import pandas as pd
 import os
-from typing import Dict, List, Any
-from langchain_upstage import ChatUpstage
+from typing import Any, AsyncIterator, Dict, List, Optional, Tuple, Union
 from langchain_core.prompts import PromptTemplate
 from langchain_core.output_parsers import StrOutputParser
 from dotenv import load_dotenv
 
+from core_logic import llm_cache, llm_pool
+from core_logic.hedging import HEDGING_ENABLED
+from core_logic.token_budget import (
+    PROMPT_TOKEN_BUDGET,
+    count_message_tokens,
+    count_tokens,
+    prompt_token_stats,
+)
+
 load_dotenv()
 
+SECTION_SEPARATOR = "|||SECTION_SEPARATOR|||"
+
+# 섹션별 생성 결과: 생성된 텍스트 또는 실패 원인 예외 (오류 문구는 render_section으로 표시할 때만 만듦)
+SectionResult = Union[str, Exception]
+
+# 섹션 키(AI 피드백 키)와 섹션별 요청 문구
+SECTION_PROMPTS = [
+    (
+        "improvement",
+        """
+            위 정보를 바탕으로 반드시 다음 피드백을 작성해주세요:
+
+            1. 수업보완: 부족한 부분과 개선 방향 (3-5문장)
+
+            **중요**: 
+            - 점수는 언급하지 말고, 학생의 행동과 태도를 집중하여 작성
+            - 학생명은 반드시 실제 이름으로 표시 (S1001 같은 ID 사용 금지)
+            - 학부모님이 학생의 학습 상황을 종합적으로 파악할 수 있도록 작성
+            - 영역을 구분하지 않고 한문단으로 자연스럽게 작성""",
+    ),
+    (
+        "attitude",
+        """
+            위 정보를 바탕으로 반드시 다음 피드백을 작성해주세요:
+            
+            2. 수업태도: 참여도와 학습 자세 평가
+            [참여도와 학습 자세를 3-5문장으로 한 문단으로 작성]
+            
+            **중요**: 
+            - 점수는 언급하지 말고, 학생의 행동과 태도를 집중하여 작성
+            - 학생명은 반드시 실제 이름으로 표시 (S1001 같은 ID 사용 금지)
+            - 학부모님이 학생의 학습 상황을 종합적으로 파악할 수 있도록 작성
+            - 영역을 구분하지 않고 한문단으로 자연스럽게 작성""",
+    ),
+    (
+        "overall",
+        """
+            위 정보를 바탕으로 반드시 다음 피드백을 작성해주세요:
+
+            3. 전체 Comment: 종합적 평가와 향후 방향
+            
+            1파트: 오늘 수업에서 보인 모습과 평가 (3-4문장)
+            2파트: 이전 수업들과 비교한 학습 추세 분석 (3-4문장)
+
+            
+            **중요**: 
+            - 금지: '1파트', '2파트' 같은 표현, 소제목, 번호, 불릿, 줄바꿈으로 파트 구분.
+            - 반드시 1파트,2파트를 한문단으로 줄바꿈 없이 작성.
+            - 문장 사이 연결어를 사용해 자연스럽게 서술할 것.
+            - 점수는 언급하지 말고, 학생의 행동과 태도를 집중하여 작성
+            - 학생명은 반드시 실제 이름으로 표시 (S1001 같은 ID 사용 금지)
+            - 학부모님이 학생의 학습 상황을 종합적으로 파악할 수 있도록 작성
+            - 전체 Comment의 2파트는 자연스럽게 연결되어야 함
+            - 2파트에서는 구체적인 변화점과 추세를 언급
+            - 학부모님이 학생의 학습 상황을 종합적으로 파악할 수 있도록 작성
+            """,
+    ),
+]
+SECTION_KEYS = [key for key, _ in SECTION_PROMPTS]
+
+# 구조화(JSON) 단일 호출 모드: 세 섹션을 한 번의 호출로 요청 (기본값 비활성)
+STRUCTURED_OUTPUT = os.getenv("FEEDBACK_STRUCTURED_OUTPUT", "false").lower() == "true"
+
+# 프롬프트 예산 초과 시 이전 기록의 수업내용/특이사항을 줄일 최대 글자 수
+PAST_RECORD_TEXT_CHARS = int(os.getenv("PAST_RECORD_TEXT_CHARS", "80"))
+
+STRUCTURED_PROMPT = """
+            위 정보를 바탕으로 아래 세 섹션의 피드백을 한 번에 작성하고, 다른 설명 없이 JSON 객체 하나로만 응답해주세요.
+            {"improvement": "...", "attitude": "...", "overall": "..."}
+
+            - improvement: 수업보완 - 부족한 부분과 개선 방향 (3-5문장)
+            - attitude: 수업태도 - 참여도와 학습 자세 평가 (3-5문장)
+            - overall: 전체 Comment - 오늘 수업에서 보인 모습과 평가(3-4문장)와 이전 수업들과 비교한 학습 추세 분석(3-4문장)을 한 문단으로 자연스럽게 연결
+
+            **중요**: 
+            - 각 값은 줄바꿈 없이 한 문단의 순수 텍스트 문자열로 작성
+            - '1파트', '2파트' 같은 표현, 소제목, 번호, 불릿 금지
+            - 점수는 언급하지 말고, 학생의 행동과 태도를 집중하여 작성
+            - 학생명은 반드시 실제 이름으로 표시 (S1001 같은 ID 사용 금지)
+            - 학부모님이 학생의 학습 상황을 종합적으로 파악할 수 있도록 작성"""
+
+
+def parse_structured_sections(text: str) -> Dict[str, Optional[str]]:
+    """
+    구조화 응답(JSON)을 섹션별로 검증합니다.
+    섹션 키마다 비어 있지 않은 문자열이면 채택하고,
+    검증에 실패한 섹션은 None으로 반환합니다.
+    """
+    sections: Dict[str, Optional[str]] = dict.fromkeys(SECTION_KEYS)
+    body = text.strip()
+    # ```json ... ``` 코드 블록으로 감싸서 응답하는 경우 처리
+    if body.startswith("```"):
+        body = body.strip("`")
+        if body.startswith("json"):
+            body = body[len("json"):]
+    try:
+        data = json.loads(body)
+    except ValueError:
+        return sections
+    if not isinstance(data, dict):
+        return sections
+
+    for key in SECTION_KEYS:
+        value = data.get(key)
+        if (
+            isinstance(value, str)
+            and value.strip()
+            and SECTION_SEPARATOR not in value
+        ):
+            sections[key] = value.strip()
+    return sections
+
+
+def render_section(result: SectionResult) -> str:
+    """섹션 결과를 표시용 텍스트로 변환 (실패한 섹션은 오류 메시지)"""
+    if isinstance(result, Exception):
+        return f"피드백 생성 중 오류 발생: {result}"
+    return result
+
+
+def _failed_sections(error: Exception) -> Dict[str, SectionResult]:
+    """모든 섹션을 같은 원인으로 실패 처리 (프롬프트 생성 실패 등)"""
+    return {key: error for key in SECTION_KEYS}
+
+
+def _shorten(text: str, max_chars: int) -> str:
+    return text if len(text) <= max_chars else text[:max_chars] + "…"
+
 
 class FeedbackSystem:
-    def __init__(self, model: str = "solar-pro2", temperature: float = 0.3):
-        api_key = os.getenv("UPSTAGE_API_KEY")
-        if not api_key:
-            raise RuntimeError("UPSTAGE_API_KEY 환경변수가 필요합니다.")
-        self.llm = ChatUpstage(model=model, temperature=temperature, api_key=api_key)
+    def __init__(
+        self,
+        model: str = "solar-pro2",
+        temperature: float = 0.3,
+        structured_output: bool = STRUCTURED_OUTPUT,
+        provider: Optional[str] = None,
+        hedging: bool = HEDGING_ENABLED,
+    ):
+        # 프로세스 전역 풀에서 공유 클라이언트를 가져와 연결을 재사용
+        # provider가 None이면 LLM_PROVIDER 설정값 사용 (fake: 네트워크 없이 가짜 응답)
+        self.llm = llm_pool.get_llm(
+            model=model, temperature=temperature, provider=provider
+        )
         self.output_parser = StrOutputParser()
+        self.structured_output = structured_output
+        # 비동기 섹션 호출이 늦으면 헤지 요청을 보낼지 여부 (LLM_HEDGING_ENABLED)
+        self.hedging = hedging
 
     def calculate_score_changes(
         self, past_records: List[Dict[str, Any]]
@@ -62,68 +211,58 @@ class FeedbackSystem:
 
         return {"changes": changes, "latest_data": latest, "previous_data": previous}
 
-    def generate_feedback(
+    def _build_prompts(
         self,
         student_info: Dict[str, Any],
         current_class_info: Dict[str, Any],
         past_records: List[Dict[str, Any]],
-    ) -> str:
-        """Upstage API를 사용하여 피드백 생성"""
+    ) -> Tuple[str, str]:
+        """세 섹션이 공통으로 사용하는 system/user 메시지 구성"""
         is_new = len(past_records) < 1
 
-        try:
-            system_msg = "너는 경험 많은 수학 과외 선생님입니다."
-            if is_new:
-                system_msg += "신규 학생의 첫 수업 평가 데이터를 바탕으로 학부모님께 전달할 수 있는 전문적이고 따뜻한 피드백을 작성합니다."
-            else:
-                system_msg += "교수자가 입력한 수업 평가 데이터와 학생의 이전 수업 기록을 참고하여 피드백을 담은 레포트를 제공해야합니다."
-
-            system_msg += """
-            **중요**: 이 피드백은 학부모님께 전달되는 것이므로, 
-            - 존댓말을 사용하고 정중한 어조로 작성
-            - 학부모님이 이해하기 쉽게 명확하게 설명
-            - 학생의 첫인상과 학습 태도를 잘 반영
-            - 구체적이고 실용적인 조언 제공
-            - 마크다운 문법(굵게, 목록, 번호, 헤딩) 없이 '순수 텍스트'로만 작성
-            - 섹션 제목 외에 추가 제목/번호/구분라인을 쓰지 말 것"""
-
-            user_msg = f"""
-            [학생 정보]
-            - 학생: {student_info.get("name")}
-            - 학년: {student_info.get("grade")}"""
-
-            if is_new:
-                user_msg += f"""
-
-            [첫 수업 평가 점수]
-            - 수업태도: {current_class_info.get("attitude_score")}점
-            - 수업이해도: {current_class_info.get("understanding_score")}점
-            - 과제평가: {current_class_info.get("homework_score")}점
-            - 질문상호작용: {current_class_info.get("qa_score")}점
-
-            [첫 수업 내용]
-            {current_class_info.get("progress_text")}
-
-            [첫 수업 특이사항]
-            {current_class_info.get("class_memo") if str(current_class_info.get("class_memo", "")).strip() else "특별한 특이사항 없음"}"""
-
-            else:
-                # 프롬프트 구성 (기존 데이터 참고 포함)
-                all_records = past_records + [current_class_info]
-                changes_data = self.calculate_score_changes(all_records)
-                if "error" in changes_data:
-                    return changes_data["error"]
-
-                past_summary = "\n".join(
-                    [
-                        f"- {record.get('date', record.get('class_date'))}: 태도{record['attitude_score']}점, 이해도{record['understanding_score']}점, 과제{record['homework_score']}점, 질문{record['qa_score']}점"
-                        f"\n  수업내용: {record.get('progress_text', 'N/A')}"
-                        f"\n  특이사항: {record.get('class_memo', 'N/A')}"
-                        for record in all_records[-4:-1]  # 최근 3회 기록
-                    ]
-                )
-
-                user_msg += f"""
+        system_msg = "너는 경험 많은 수학 과외 선생님입니다."
+        if is_new:
+            system_msg += "신규 학생의 첫 수업 평가 데이터를 바탕으로 학부모님께 전달할 수 있는 전문적이고 따뜻한 피드백을 작성합니다."
+        else:
+            system_msg += "교수자가 입력한 수업 평가 데이터와 학생의 이전 수업 기록을 참고하여 피드백을 담은 레포트를 제공해야합니다."
+
+        system_msg += """
+        **중요**: 이 피드백은 학부모님께 전달되는 것이므로, 
+        - 존댓말을 사용하고 정중한 어조로 작성
+        - 학부모님이 이해하기 쉽게 명확하게 설명
+        - 학생의 첫인상과 학습 태도를 잘 반영
+        - 구체적이고 실용적인 조언 제공
+        - 마크다운 문법(굵게, 목록, 번호, 헤딩) 없이 '순수 텍스트'로만 작성
+        - 섹션 제목 외에 추가 제목/번호/구분라인을 쓰지 말 것"""
+
+        user_msg = f"""
+        [학생 정보]
+        - 학생: {student_info.get("name")}
+        - 학년: {student_info.get("grade")}"""
+
+        if is_new:
+            user_msg += f"""
+
+        [첫 수업 평가 점수]
+        - 수업태도: {current_class_info.get("attitude_score")}점
+        - 수업이해도: {current_class_info.get("understanding_score")}점
+        - 과제평가: {current_class_info.get("homework_score")}점
+        - 질문상호작용: {current_class_info.get("qa_score")}점
+
+        [첫 수업 내용]
+        {current_class_info.get("progress_text")}
+
+        [첫 수업 특이사항]
+        {current_class_info.get("class_memo") if str(current_class_info.get("class_memo", "")).strip() else "특별한 특이사항 없음"}"""
+
+        else:
+            # 프롬프트 구성 (기존 데이터 참고 포함)
+            all_records = past_records + [current_class_info]
+            changes_data = self.calculate_score_changes(all_records)
+            if "error" in changes_data:
+                raise ValueError(changes_data["error"])
+
+            user_msg += f"""
 [학생 정보]
 - 학생: {student_info.get("name")}
 
@@ -138,107 +277,321 @@ class FeedbackSystem:
 
 [현재 특이사항]
 {changes_data['latest_data'].get('class_memo', 'N/A')}
+"""
 
-[이전 수업 기록 (참고용)]
-{past_summary}"""
-
-        except Exception as e:
-            return f"프롬포트 생성 중 오류 발생: {e}"
-
-        try:
-            # AI 모델 호출
-            user_msg_1 = (
-                user_msg
-                + """
-            위 정보를 바탕으로 반드시 다음 피드백을 작성해주세요:
+            # 최근 기록 밖의 누적 이력 (학생 요약이 있으면 크기가 일정한 통계/주제 요약)
+            history_summary = student_info.get("history_summary")
+            if history_summary:
+                prompt_token_stats.record("history_summary", count_tokens(history_summary))
+                user_msg += f"""
+[누적 수업 요약]
+{history_summary}
+"""
 
-            1. 수업보완: 부족한 부분과 개선 방향 (3-5문장)
+            user_msg += """
+[이전 수업 기록 (참고용)]
+"""
 
-            **중요**: 
-            - 점수는 언급하지 말고, 학생의 행동과 태도를 집중하여 작성
-            - 학생명은 반드시 실제 이름으로 표시 (S1001 같은 ID 사용 금지)
-            - 학부모님이 학생의 학습 상황을 종합적으로 파악할 수 있도록 작성
-            - 영역을 구분하지 않고 한문단으로 자연스럽게 작성"""
+            # 이전 기록을 제외한 프롬프트 크기를 뺀 나머지만 이전 기록에 사용
+            fixed_tokens = (
+                count_tokens(system_msg)
+                + count_tokens(user_msg)
+                + max(count_tokens(instruction) for _, instruction in SECTION_PROMPTS)
             )
-            response_section1 = self.llm.invoke(
-                [("system", system_msg), ("user", user_msg_1)]
+            past_summary, truncated = self._fit_past_summary(
+                all_records[-4:-1],  # 최근 3회 기록
+                PROMPT_TOKEN_BUDGET - fixed_tokens,
             )
-            response_section1 = (
-                response_section1.content
-                if hasattr(response_section1, "content")
-                else str(response_section1)
+            prompt_token_stats.record(
+                "past_records", count_tokens(past_summary), truncated
+            )
+            user_msg += past_summary
+
+        return system_msg, user_msg
+
+    @staticmethod
+    def _format_past_record(record: Dict[str, Any], level: int) -> str:
+        """
+        이전 수업 기록 한 건을 프롬프트용 텍스트로 변환
+        level 0: 전체, 1: 수업내용/특이사항 축약, 2: 점수만
+        """
+        line = (
+            f"- {record.get('date', record.get('class_date'))}: 태도{record['attitude_score']}점, 이해도{record['understanding_score']}점, 과제{record['homework_score']}점, 질문{record['qa_score']}점"
+        )
+        if level >= 2:
+            return line
+
+        progress_text = str(record.get("progress_text", "N/A"))
+        class_memo = str(record.get("class_memo", "N/A"))
+        if level == 1:
+            progress_text = _shorten(progress_text, PAST_RECORD_TEXT_CHARS)
+            class_memo = _shorten(class_memo, PAST_RECORD_TEXT_CHARS)
+        return line + f"\n  수업내용: {progress_text}" + f"\n  특이사항: {class_memo}"
+
+    def _fit_past_summary(
+        self, records: List[Dict[str, Any]], budget: int
+    ) -> Tuple[str, bool]:
+        """
+        이전 기록 요약이 토큰 예산(budget) 안에 들어가도록 가장 오래된 기록부터
+        축약 → 점수만 남김 → 제외 순서로 줄입니다. (입력이 같으면 결과도 항상 같음)
+        """
+        records = list(records)
+        levels = [0] * len(records)
+
+        def render() -> str:
+            if not records:
+                return "- 이전 기록 생략 (프롬프트 길이 제한)"
+            return "\n".join(
+                self._format_past_record(record, level)
+                for record, level in zip(records, levels)
             )
 
-        except Exception as e:
-            return f"피드백 생성 중 오류 발생: {e}"
+        summary = render()
+        truncated = False
+        while records and count_tokens(summary) > budget:
+            for i, level in enumerate(levels):
+                if level < 2:
+                    levels[i] += 1
+                    break
+            else:
+                records.pop(0)
+                levels.pop(0)
+            truncated = True
+            summary = render()
+        return summary, truncated
+
+    def _section_messages(
+        self, system_msg: str, user_msg: str
+    ) -> List[Tuple[str, List[Tuple[str, str]]]]:
+        """섹션 키와 해당 섹션 호출에 사용할 메시지 목록을 순서대로 반환"""
+        section_messages = [
+            (key, [("system", system_msg), ("user", user_msg + instruction)])
+            for key, instruction in SECTION_PROMPTS
+        ]
+        for key, messages in section_messages:
+            prompt_token_stats.record(key, count_message_tokens(messages))
+        return section_messages
 
+    def generate_feedback(
+        self,
+        student_info: Dict[str, Any],
+        current_class_info: Dict[str, Any],
+        past_records: List[Dict[str, Any]],
+        use_cache: bool = True,
+        deadline: Optional[float] = None,
+    ) -> str:
+        """Upstage API를 사용하여 피드백 생성 (섹션별 순차 호출)"""
         try:
-            user_msg_2 = (
-                user_msg
-                + """
-            위 정보를 바탕으로 반드시 다음 피드백을 작성해주세요:
-            
-            2. 수업태도: 참여도와 학습 자세 평가
-            [참여도와 학습 자세를 3-5문장으로 한 문단으로 작성]
-            
-            **중요**: 
-            - 점수는 언급하지 말고, 학생의 행동과 태도를 집중하여 작성
-            - 학생명은 반드시 실제 이름으로 표시 (S1001 같은 ID 사용 금지)
-            - 학부모님이 학생의 학습 상황을 종합적으로 파악할 수 있도록 작성
-            - 영역을 구분하지 않고 한문단으로 자연스럽게 작성"""
-            )
-            response_section2 = self.llm.invoke(
-                [("system", system_msg), ("user", user_msg_2)]
+            system_msg, user_msg = self._build_prompts(
+                student_info, current_class_info, past_records
             )
-            response_section2 = (
-                response_section2.content
-                if hasattr(response_section2, "content")
-                else str(response_section2)
-            )
-
         except Exception as e:
-            return f"피드백 생성 중 오류 발생: {e}"
-        try:
-            user_msg_3 = (
-                user_msg
-                + """
-            위 정보를 바탕으로 반드시 다음 피드백을 작성해주세요:
+            return f"프롬포트 생성 중 오류 발생: {e}"
 
-            3. 전체 Comment: 종합적 평가와 향후 방향
-            
-            1파트: 오늘 수업에서 보인 모습과 평가 (3-4문장)
-            2파트: 이전 수업들과 비교한 학습 추세 분석 (3-4문장)
+        sections = []
+        for key, messages in self._section_messages(system_msg, user_msg):
+            try:
+                # AI 모델 호출
+                sections.append(
+                    llm_cache.cached_invoke(
+                        self.llm, messages, use_cache, section=key, deadline=deadline
+                    )
+                )
+            except Exception as e:
+                return f"피드백 생성 중 오류 발생: {e}"
 
-            
-            **중요**: 
-            - 금지: '1파트', '2파트' 같은 표현, 소제목, 번호, 불릿, 줄바꿈으로 파트 구분.
-            - 반드시 1파트,2파트를 한문단으로 줄바꿈 없이 작성.
-            - 문장 사이 연결어를 사용해 자연스럽게 서술할 것.
-            - 점수는 언급하지 말고, 학생의 행동과 태도를 집중하여 작성
-            - 학생명은 반드시 실제 이름으로 표시 (S1001 같은 ID 사용 금지)
-            - 학부모님이 학생의 학습 상황을 종합적으로 파악할 수 있도록 작성
-            - 전체 Comment의 2파트는 자연스럽게 연결되어야 함
-            - 2파트에서는 구체적인 변화점과 추세를 언급
-            - 학부모님이 학생의 학습 상황을 종합적으로 파악할 수 있도록 작성
-            """
-            )
-            response_section3 = self.llm.invoke(
-                [("system", system_msg), ("user", user_msg_3)]
+        return SECTION_SEPARATOR.join(sections)
+
+    async def agenerate_feedback(
+        self,
+        student_info: Dict[str, Any],
+        current_class_info: Dict[str, Any],
+        past_records: List[Dict[str, Any]],
+        use_cache: bool = True,
+        deadline: Optional[float] = None,
+    ) -> Dict[str, SectionResult]:
+        """
+        세 섹션 프롬프트를 동시에 호출하여 섹션 키별 결과(텍스트 또는 예외)를 반환.
+        실패한 섹션은 예외로 남기고 다른 섹션 결과는 유지합니다.
+        deadline(time.monotonic 기준 시각)까지 끝나지 않은 섹션 호출은 취소되어 실패로 처리됩니다.
+        """
+        try:
+            system_msg, user_msg = self._build_prompts(
+                student_info, current_class_info, past_records
             )
-            response_section3 = (
-                response_section3.content
-                if hasattr(response_section3, "content")
-                else str(response_section3)
+        except Exception as e:
+            print(f"❌ 프롬프트 생성 실패: {e}")
+            return _failed_sections(e)
+
+        section_messages = self._section_messages(system_msg, user_msg)
+        results = await self._ainvoke_sections(section_messages, use_cache, deadline)
+        return {key: result for (key, _), result in zip(section_messages, results)}
+
+    async def _ainvoke_sections(
+        self,
+        section_messages: List[Tuple[str, List[Tuple[str, str]]]],
+        use_cache: bool = True,
+        deadline: Optional[float] = None,
+    ) -> List[SectionResult]:
+        """섹션별 호출을 동시에 실행하고, 섹션 순서대로 응답 텍스트 또는 실패 원인 예외를 반환"""
+        responses = await asyncio.gather(
+            *(
+                llm_cache.acached_invoke(
+                    self.llm,
+                    messages,
+                    use_cache,
+                    section=key,
+                    deadline=deadline,
+                    hedge=self.hedging,
+                )
+                for key, messages in section_messages
+            ),
+            return_exceptions=True,
+        )
+
+        for (key, _), response in zip(section_messages, responses):
+            if isinstance(response, Exception):
+                print(f"❌ {key} 섹션 생성 실패: {response}")
+        return responses
+
+    async def agenerate_feedback_structured(
+        self,
+        student_info: Dict[str, Any],
+        current_class_info: Dict[str, Any],
+        past_records: List[Dict[str, Any]],
+        use_cache: bool = True,
+        deadline: Optional[float] = None,
+    ) -> Dict[str, SectionResult]:
+        """
+        세 섹션을 JSON 응답 한 번으로 생성 (공통 컨텍스트를 한 번만 전송).
+        검증에 실패한 섹션만 기존 섹션별 프롬프트로 다시 생성합니다.
+        반환 형식은 agenerate_feedback과 같습니다.
+        """
+        try:
+            system_msg, user_msg = self._build_prompts(
+                student_info, current_class_info, past_records
             )
-            return (
-                response_section1
-                + "|||SECTION_SEPARATOR|||"
-                + response_section2
-                + "|||SECTION_SEPARATOR|||"
-                + response_section3
+        except Exception as e:
+            print(f"❌ 프롬프트 생성 실패: {e}")
+            return _failed_sections(e)
+
+        sections: Dict[str, Optional[SectionResult]] = dict.fromkeys(SECTION_KEYS)
+        try:
+            messages = [("system", system_msg), ("user", user_msg + STRUCTURED_PROMPT)]
+            prompt_token_stats.record("structured", count_message_tokens(messages))
+            response = await llm_cache.acached_invoke(
+                self.llm,
+                messages,
+                use_cache,
+                section="structured",
+                deadline=deadline,
+                hedge=self.hedging,
             )
+            sections.update(parse_structured_sections(response))
         except Exception as e:
-            return f"피드백 생성 중 오류 발생: {e}"
+            print(f"❌ 구조화 응답 생성 실패: {e}")
+
+        missing = [key for key in SECTION_KEYS if sections[key] is None]
+        if missing:
+            print(f"⚠️ 구조화 응답 검증 실패, 섹션별 재생성: {missing}")
+            fallback = [
+                (key, messages)
+                for key, messages in self._section_messages(system_msg, user_msg)
+                if key in missing
+            ]
+            regenerated = await self._ainvoke_sections(fallback, use_cache, deadline)
+            for key, result in zip(missing, regenerated):
+                sections[key] = result
+
+        return sections
+
+    async def astream_feedback(
+        self,
+        student_info: Dict[str, Any],
+        current_class_info: Dict[str, Any],
+        past_records: List[Dict[str, Any]],
+        use_cache: bool = True,
+    ) -> AsyncIterator[Tuple[str, str, SectionResult]]:
+        """
+        세 섹션을 동시에 스트리밍하며 (이벤트, 섹션 키, 값)을 도착 순서대로 반환.
+        이벤트는 token(생성된 토큰), error(섹션 생성 실패, 값은 실패 원인 예외), end(섹션 완료) 중 하나입니다.
+        """
+        system_msg, user_msg = self._build_prompts(
+            student_info, current_class_info, past_records
+        )
+        section_messages = self._section_messages(system_msg, user_msg)
+        events: "asyncio.Queue[Tuple[str, str, SectionResult]]" = asyncio.Queue()
+
+        async def _stream_section(key: str, messages: List[Tuple[str, str]]) -> None:
+            try:
+                async for token in llm_cache.acached_stream(
+                    self.llm, messages, use_cache, section=key
+                ):
+                    await events.put(("token", key, token))
+            except Exception as e:
+                print(f"❌ {key} 섹션 스트리밍 실패: {e}")
+                await events.put(("error", key, e))
+            finally:
+                await events.put(("end", key, ""))
+
+        tasks = [
+            asyncio.create_task(_stream_section(key, messages))
+            for key, messages in section_messages
+        ]
+        remaining = len(tasks)
+        try:
+            while remaining:
+                event = await events.get()
+                if event[0] == "end":
+                    remaining -= 1
+                yield event
+        finally:
+            for task in tasks:
+                task.cancel()
+
+    def generate_feedback_concurrently(
+        self,
+        student_info: Dict[str, Any],
+        current_class_info: Dict[str, Any],
+        past_records: List[Dict[str, Any]],
+        use_cache: bool = True,
+        deadline: Optional[float] = None,
+    ) -> Dict[str, SectionResult]:
+        """
+        동기 코드(FastAPI 스레드풀 등)에서 비동기 생성 경로를 실행하는 래퍼.
+        structured_output이 켜져 있으면 단일 호출 구조화 모드를 사용합니다.
+        use_cache=False이면 캐시된 응답을 쓰지 않고 새로 생성합니다.
+        deadline은 요청 마감 시각(time.monotonic 기준)으로 각 섹션 호출에 전달됩니다.
+        """
+        generate = (
+            self.agenerate_feedback_structured
+            if self.structured_output
+            else self.agenerate_feedback
+        )
+        return llm_pool.run_async(
+            generate(student_info, current_class_info, past_records, use_cache, deadline)
+        )
+
+    async def agenerate_feedback_on_pool(
+        self,
+        student_info: Dict[str, Any],
+        current_class_info: Dict[str, Any],
+        past_records: List[Dict[str, Any]],
+        use_cache: bool = True,
+        deadline: Optional[float] = None,
+    ) -> Dict[str, SectionResult]:
+        """
+        generate_feedback_concurrently의 async 버전.
+        다른 이벤트 루프(async 라우트)에서 스레드를 점유하지 않고 풀 전용 루프의 결과를 기다립니다.
+        """
+        generate = (
+            self.agenerate_feedback_structured
+            if self.structured_output
+            else self.agenerate_feedback
+        )
+        return await llm_pool.await_async(
+            generate(student_info, current_class_info, past_records, use_cache, deadline)
+        )
 
 
 # CSV 데이터 어댑터 및 실행기
@@ -0,0 +1,152 @@
+# hedging.py
+"""
+LLM 요청 헤징 (tail latency 완화)
+
+섹션 호출이 적응형 기준 시간(최근 응답 지연의 p90) 안에 끝나지 않으면
+같은 요청을 한 번 더 보내고 먼저 끝난 응답을 사용합니다.
+- 추가 요청은 예산(요청 수 대비 비율) 안에서만 보내 비용 증가를 제한
+- 헤지 발동 횟수와 어느 쪽이 이겼는지 집계
+"""
+import asyncio
+import os
+import threading
+import time
+from collections import deque
+from typing import Any, Awaitable, Callable, Deque, Dict, Optional
+
+from dotenv import load_dotenv
+
+load_dotenv()
+
+HEDGING_ENABLED = os.getenv("LLM_HEDGING_ENABLED", "false").lower() == "true"
+HEDGE_QUANTILE = float(os.getenv("LLM_HEDGE_QUANTILE", "0.9"))
+# 지연 표본이 충분히 쌓이기 전에 사용하는 기준 시간(초)
+HEDGE_INITIAL_DELAY = float(os.getenv("LLM_HEDGE_INITIAL_DELAY", "8"))
+HEDGE_MIN_DELAY = float(os.getenv("LLM_HEDGE_MIN_DELAY", "0.5"))
+HEDGE_MIN_SAMPLES = int(os.getenv("LLM_HEDGE_MIN_SAMPLES", "20"))
+HEDGE_WINDOW = int(os.getenv("LLM_HEDGE_WINDOW", "200"))
+# 요청 1건마다 적립되는 헤지 예산 (0.1이면 요청의 최대 약 10%만 헤지)
+HEDGE_BUDGET_RATIO = float(os.getenv("LLM_HEDGE_BUDGET_RATIO", "0.1"))
+HEDGE_BUDGET_BURST = float(os.getenv("LLM_HEDGE_BUDGET_BURST", "3"))
+
+
+class RequestHedger:
+    """적응형 기준 시간과 예산을 가진 헤지 실행기"""
+
+    def __init__(
+        self,
+        quantile: float = HEDGE_QUANTILE,
+        initial_delay: float = HEDGE_INITIAL_DELAY,
+        min_delay: float = HEDGE_MIN_DELAY,
+        min_samples: int = HEDGE_MIN_SAMPLES,
+        window: int = HEDGE_WINDOW,
+        budget_ratio: float = HEDGE_BUDGET_RATIO,
+        budget_burst: float = HEDGE_BUDGET_BURST,
+    ):
+        self.quantile = quantile
+        self.initial_delay = initial_delay
+        self.min_delay = min_delay
+        self.min_samples = min_samples
+        self.budget_ratio = budget_ratio
+        self.budget_burst = budget_burst
+        self._budget = budget_burst
+        self._latencies: Deque[float] = deque(maxlen=window)
+        self._counters = {
+            "requests": 0,
+            "hedges": 0,
+            "hedge_wins": 0,
+            "primary_wins": 0,
+            "budget_denied": 0,
+        }
+        self._lock = threading.Lock()
+
+    def threshold(self) -> float:
+        """헤지를 보내기까지 기다리는 시간 (최근 성공 지연의 분위수)"""
+        with self._lock:
+            if len(self._latencies) < self.min_samples:
+                return self.initial_delay
+            ordered = sorted(self._latencies)
+        index = min(len(ordered) - 1, int(self.quantile * len(ordered)))
+        return max(self.min_delay, ordered[index])
+
+    def _observe(self, latency: float) -> None:
+        with self._lock:
+            self._latencies.append(latency)
+
+    def _start_request(self) -> None:
+        with self._lock:
+            self._counters["requests"] += 1
+            self._budget = min(self.budget_burst, self._budget + self.budget_ratio)
+
+    def _try_spend(self) -> bool:
+        with self._lock:
+            if self._budget >= 1:
+                self._budget -= 1
+                self._counters["hedges"] += 1
+                return True
+            self._counters["budget_denied"] += 1
+            return False
+
+    def _count_win(self, hedge_won: bool) -> None:
+        with self._lock:
+            self._counters["hedge_wins" if hedge_won else "primary_wins"] += 1
+
+    async def _timed(self, call: Callable[[], Awaitable[Any]]) -> Any:
+        started = time.monotonic()
+        result = await call()
+        self._observe(time.monotonic() - started)
+        return result
+
+    async def run(self, call: Callable[[], Awaitable[Any]], section: str = "") -> Any:
+        """
+        call()로 요청을 보내고, 기준 시간 안에 끝나지 않으면 예산 안에서 한 번 더 보냅니다.
+        먼저 성공한 응답을 반환하고 남은 요청은 취소합니다. (둘 다 실패하면 마지막 오류 발생)
+        """
+        self._start_request()
+        tasks = [asyncio.ensure_future(self._timed(call))]
+        try:
+            done, _ = await asyncio.wait(tasks, timeout=self.threshold())
+            if done:
+                return tasks[0].result()
+            if not self._try_spend():
+                return await tasks[0]
+
+            print(f"⏱️ {section or 'LLM'} 응답 지연, 헤지 요청 전송")
+            tasks.append(asyncio.ensure_future(self._timed(call)))
+            pending = set(tasks)
+            error: Optional[BaseException] = None
+            while pending:
+                done, pending = await asyncio.wait(
+                    pending, return_when=asyncio.FIRST_COMPLETED
+                )
+                for task in done:
+                    if task.exception() is None:
+                        self._count_win(hedge_won=task is tasks[1])
+                        return task.result()
+                    error = task.exception()
+            raise error
+        finally:
+            for task in tasks:
+                if not task.done():
+                    task.cancel()
+
+    def snapshot(self) -> Dict[str, Any]:
+        threshold = self.threshold()
+        with self._lock:
+            hedges = self._counters["hedges"]
+            return {
+                **self._counters,
+                "hedge_rate": round(hedges / self._counters["requests"], 4)
+                if self._counters["requests"]
+                else 0.0,
+                "hedge_win_ratio": round(self._counters["hedge_wins"] / hedges, 4)
+                if hedges
+                else 0.0,
+                "threshold_seconds": round(threshold, 3),
+                "budget_available": round(self._budget, 2),
+                "samples": len(self._latencies),
+            }
+
+
+# 프로세스 전역 헤지 실행기
+hedger = RequestHedger()
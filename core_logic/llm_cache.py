@@ -0,0 +1,331 @@
+# llm_cache.py
+"""
+LLM 응답 캐시
+
+(model, temperature, system 메시지, user 메시지)의 해시를 키로 사용하여
+동일한 프롬프트에 대한 재요청(클라이언트 재시도, 반복 테스트 등)을 API 호출 없이 처리합니다.
+
+- 1차: 메모리 LRU 캐시 (TTL 적용)
+- 2차: SQLite 파일 캐시 (선택, 재시작 후에도 유지)
+"""
+import asyncio
+import hashlib
+import json
+import os
+import sqlite3
+import threading
+import time
+from collections import OrderedDict
+from typing import Any, AsyncIterator, Dict, List, Optional, Tuple
+
+from dotenv import load_dotenv
+
+from core_logic.hedging import hedger
+from core_logic.llm_metrics import llm_metrics
+from core_logic.rate_limiter import limiter
+
+load_dotenv()
+
+CACHE_ENABLED = os.getenv("LLM_CACHE_ENABLED", "true").lower() == "true"
+CACHE_MAX_ENTRIES = int(os.getenv("LLM_CACHE_MAX_ENTRIES", "1024"))
+CACHE_TTL_SECONDS = float(os.getenv("LLM_CACHE_TTL_SECONDS", "86400"))
+CACHE_DB_PATH = os.getenv("LLM_CACHE_DB_PATH", "")  # 비어 있으면 디스크 캐시 사용 안 함
+
+
+def make_cache_key(
+    provider: str, model: str, temperature: float, system_msg: str, user_msg: str
+) -> str:
+    """
+    캐시 키 생성 (입력 전체에 대한 SHA-256)
+    모델 이름이 같아도 제공자(예: 가짜 모델과 Upstage)가 다르면 응답을 공유하지 않도록 제공자를 포함
+    """
+    payload = json.dumps(
+        [provider, model, float(temperature), system_msg, user_msg], ensure_ascii=False
+    )
+    return hashlib.sha256(payload.encode("utf-8")).hexdigest()
+
+
+class LLMResponseCache:
+    """메모리 LRU + 선택적 SQLite 2단계 응답 캐시"""
+
+    def __init__(
+        self,
+        max_entries: int = CACHE_MAX_ENTRIES,
+        ttl_seconds: float = CACHE_TTL_SECONDS,
+        db_path: str = CACHE_DB_PATH,
+        enabled: bool = CACHE_ENABLED,
+    ):
+        self.max_entries = max_entries
+        self.ttl_seconds = ttl_seconds
+        self.enabled = enabled
+        self._memory: "OrderedDict[str, Tuple[float, str]]" = OrderedDict()
+        # 메모리 캐시와 카운터용 잠금 (디스크 I/O 중에는 잡지 않음)
+        self._lock = threading.Lock()
+        # SQLite 연결은 여러 스레드가 함께 쓰므로 별도 잠금으로 직렬화
+        self._db_lock = threading.Lock()
+        self._counters = {
+            "hits": 0,
+            "memory_hits": 0,
+            "disk_hits": 0,
+            "misses": 0,
+            "evictions": 0,
+            "expirations": 0,
+            "writes": 0,
+        }
+
+        self._db: Optional[sqlite3.Connection] = None
+        if db_path:
+            self._db = sqlite3.connect(db_path, check_same_thread=False)
+            self._db.execute(
+                "CREATE TABLE IF NOT EXISTS llm_cache "
+                "(key TEXT PRIMARY KEY, value TEXT NOT NULL, created_at REAL NOT NULL)"
+            )
+            self._db.commit()
+
+    def _is_expired(self, created_at: float) -> bool:
+        return self.ttl_seconds > 0 and time.time() - created_at > self.ttl_seconds
+
+    def _put_memory(self, key: str, created_at: float, value: str) -> None:
+        self._memory[key] = (created_at, value)
+        self._memory.move_to_end(key)
+        while len(self._memory) > self.max_entries:
+            self._memory.popitem(last=False)
+            self._counters["evictions"] += 1
+
+    def _get_memory(self, key: str) -> Optional[str]:
+        with self._lock:
+            entry = self._memory.get(key)
+            if entry is None:
+                return None
+            created_at, value = entry
+            if not self._is_expired(created_at):
+                self._memory.move_to_end(key)
+                self._counters["hits"] += 1
+                self._counters["memory_hits"] += 1
+                return value
+            del self._memory[key]
+            self._counters["expirations"] += 1
+            return None
+
+    def _get_disk(self, key: str) -> Optional[str]:
+        """디스크 캐시 조회 (메모리 잠금 밖에서 실행, 히트이면 메모리에도 저장)"""
+        with self._db_lock:
+            row = self._db.execute(
+                "SELECT value, created_at FROM llm_cache WHERE key = ?", (key,)
+            ).fetchone()
+            expired = row is not None and self._is_expired(row[1])
+            if expired:
+                self._db.execute("DELETE FROM llm_cache WHERE key = ?", (key,))
+                self._db.commit()
+
+        with self._lock:
+            if row is None:
+                return None
+            if expired:
+                self._counters["expirations"] += 1
+                return None
+            value, created_at = row
+            self._put_memory(key, created_at, value)
+            self._counters["hits"] += 1
+            self._counters["disk_hits"] += 1
+            return value
+
+    def _count_miss(self) -> None:
+        with self._lock:
+            self._counters["misses"] += 1
+
+    def get(self, key: str) -> Optional[str]:
+        """캐시된 응답을 반환하고, 없거나 만료되었으면 None을 반환"""
+        if not self.enabled:
+            return None
+
+        value = self._get_memory(key)
+        if value is None and self._db is not None:
+            value = self._get_disk(key)
+        if value is None:
+            self._count_miss()
+        return value
+
+    async def aget(self, key: str) -> Optional[str]:
+        """get의 비동기 버전 (디스크 캐시 조회는 스레드에서 실행하여 이벤트 루프를 막지 않음)"""
+        if not self.enabled:
+            return None
+
+        value = self._get_memory(key)
+        if value is None and self._db is not None:
+            value = await asyncio.to_thread(self._get_disk, key)
+        if value is None:
+            self._count_miss()
+        return value
+
+    def _set_memory(self, key: str, created_at: float, value: str) -> None:
+        with self._lock:
+            self._put_memory(key, created_at, value)
+            self._counters["writes"] += 1
+
+    def _set_disk(self, key: str, created_at: float, value: str) -> None:
+        with self._db_lock:
+            self._db.execute(
+                "INSERT OR REPLACE INTO llm_cache (key, value, created_at) VALUES (?, ?, ?)",
+                (key, value, created_at),
+            )
+            self._db.commit()
+
+    def set(self, key: str, value: str) -> None:
+        """응답을 캐시에 저장 (디스크 캐시가 설정되어 있으면 함께 저장)"""
+        if not self.enabled:
+            return
+
+        created_at = time.time()
+        self._set_memory(key, created_at, value)
+        if self._db is not None:
+            self._set_disk(key, created_at, value)
+
+    async def aset(self, key: str, value: str) -> None:
+        """set의 비동기 버전 (디스크 캐시 저장은 스레드에서 실행)"""
+        if not self.enabled:
+            return
+
+        created_at = time.time()
+        self._set_memory(key, created_at, value)
+        if self._db is not None:
+            await asyncio.to_thread(self._set_disk, key, created_at, value)
+
+    def clear(self) -> None:
+        with self._lock:
+            self._memory.clear()
+        if self._db is not None:
+            with self._db_lock:
+                self._db.execute("DELETE FROM llm_cache")
+                self._db.commit()
+
+    def stats(self) -> Dict[str, Any]:
+        """히트/미스/축출 카운터와 현재 크기"""
+        with self._lock:
+            lookups = self._counters["hits"] + self._counters["misses"]
+            return {
+                **self._counters,
+                "hit_ratio": round(self._counters["hits"] / lookups, 4) if lookups else 0.0,
+                "memory_entries": len(self._memory),
+                "max_entries": self.max_entries,
+                "ttl_seconds": self.ttl_seconds,
+                "disk_enabled": self._db is not None,
+            }
+
+
+# 프로세스 전역 캐시
+response_cache = LLMResponseCache()
+
+
+def _key_for(llm: Any, messages: List[Tuple[str, str]]) -> str:
+    system_msg = "".join(content for role, content in messages if role == "system")
+    user_msg = "".join(content for role, content in messages if role != "system")
+    return make_cache_key(
+        # langchain 채팅 모델의 구현 식별자 (ChatUpstage: "upstage-chat", FakeChatModel: "fake-chat")
+        getattr(llm, "_llm_type", type(llm).__name__),
+        getattr(llm, "model_name", ""),
+        getattr(llm, "temperature", 0.0) or 0.0,
+        system_msg,
+        user_msg,
+    )
+
+
+def _to_text(response: Any) -> str:
+    return response.content if hasattr(response, "content") else str(response)
+
+
+def _cache_lookup(llm: Any, key: str, section: str) -> Optional[str]:
+    cached = response_cache.get(key)
+    if cached is not None:
+        llm_metrics.record(
+            getattr(llm, "model_name", ""), section, "cache_hit", called=False
+        )
+    return cached
+
+
+async def _acache_lookup(llm: Any, key: str, section: str) -> Optional[str]:
+    cached = await response_cache.aget(key)
+    if cached is not None:
+        llm_metrics.record(
+            getattr(llm, "model_name", ""), section, "cache_hit", called=False
+        )
+    return cached
+
+
+def cached_invoke(
+    llm: Any,
+    messages: List[Tuple[str, str]],
+    use_cache: bool = True,
+    section: str = "",
+    deadline: Optional[float] = None,
+) -> str:
+    """
+    캐시를 거쳐 llm.invoke를 호출하고 응답 텍스트를 반환합니다.
+    캐시 미스일 때의 실제 호출은 전역 속도 제한기(rate_limiter)를 거칩니다.
+    use_cache=False이면 캐시 조회를 건너뛰고 새로 생성한 결과로 캐시를 갱신합니다.
+    section은 호출 계측(llm_metrics)에 기록할 이름이고,
+    deadline(time.monotonic 기준 시각)은 속도 제한기에 전달되는 요청 마감 시간입니다.
+    """
+    key = _key_for(llm, messages)
+    if use_cache:
+        cached = _cache_lookup(llm, key, section)
+        if cached is not None:
+            return cached
+
+    text = _to_text(limiter.invoke(llm, messages, section, deadline))
+    response_cache.set(key, text)
+    return text
+
+
+async def acached_invoke(
+    llm: Any,
+    messages: List[Tuple[str, str]],
+    use_cache: bool = True,
+    section: str = "",
+    deadline: Optional[float] = None,
+    hedge: bool = False,
+) -> str:
+    """
+    cached_invoke의 비동기 버전 (llm.ainvoke 사용)
+    hedge=True이면 응답이 늦을 때 같은 요청을 한 번 더 보내 먼저 끝난 응답을 사용합니다.
+    """
+    key = _key_for(llm, messages)
+    if use_cache:
+        cached = await _acache_lookup(llm, key, section)
+        if cached is not None:
+            return cached
+
+    def call():
+        return limiter.ainvoke(llm, messages, section, deadline)
+
+    response = await (hedger.run(call, section) if hedge else call())
+    text = _to_text(response)
+    await response_cache.aset(key, text)
+    return text
+
+
+async def acached_stream(
+    llm: Any,
+    messages: List[Tuple[str, str]],
+    use_cache: bool = True,
+    section: str = "",
+) -> AsyncIterator[str]:
+    """
+    캐시를 거쳐 llm.astream으로 응답을 토큰 단위로 반환합니다.
+    캐시 히트이면 저장된 응답 전체를 한 번에 반환하고,
+    스트림이 끝까지 완료된 경우에만 응답을 캐시에 저장합니다.
+    """
+    key = _key_for(llm, messages)
+    if use_cache:
+        cached = await _acache_lookup(llm, key, section)
+        if cached is not None:
+            yield cached
+            return
+
+    chunks = []
+    async for chunk in limiter.astream(llm, messages, section):
+        text = _to_text(chunk)
+        if text:
+            chunks.append(text)
+            yield text
+    await response_cache.aset(key, "".join(chunks))
@@ -0,0 +1,209 @@
+# llm_metrics.py
+"""
+LLM 호출 계측
+
+호출마다 모델, 섹션, 프롬프트/응답 토큰 수, 대기 시간(속도 제한기 큐), 응답 지연, 결과를 기록합니다.
+- 메모리 히스토그램: 모니터링 엔드포인트에서 Prometheus 텍스트 형식 또는 JSON으로 조회
+- JSONL 장부(선택): LLM_METRICS_LEDGER_PATH를 설정하면 호출마다 한 줄씩 추가 (용량 계획용)
+"""
+import json
+import os
+import threading
+import time
+from typing import Any, Dict, List, Optional, Sequence, Tuple
+
+from dotenv import load_dotenv
+
+load_dotenv()
+
+LEDGER_PATH = os.getenv("LLM_METRICS_LEDGER_PATH", "")  # 비어 있으면 장부 기록 안 함
+
+LATENCY_BUCKETS = (0.1, 0.25, 0.5, 1, 2, 4, 8, 15, 30, 60)
+TOKEN_BUCKETS = (50, 100, 250, 500, 1000, 2000, 4000, 8000)
+
+# 결과 구분
+# - success / rate_limited / error: 제공자를 실제로 호출한 결과
+# - cache_hit: 응답 캐시에서 반환
+# - circuit_open / deadline_exceeded: 서킷 브레이커 또는 요청 마감 시간으로 중단
+# - cancelled: 헤지 요청이 먼저 끝나 취소됨
+OUTCOMES = (
+    "success",
+    "rate_limited",
+    "error",
+    "cache_hit",
+    "circuit_open",
+    "deadline_exceeded",
+    "cancelled",
+)
+
+
+class Histogram:
+    """누적 버킷 히스토그램 (Prometheus histogram과 같은 구조)"""
+
+    def __init__(self, buckets: Sequence[float]):
+        self.buckets = tuple(buckets)
+        self.counts = [0] * (len(self.buckets) + 1)  # 마지막은 +Inf
+        self.count = 0
+        self.sum = 0.0
+
+    def observe(self, value: float) -> None:
+        for i, bound in enumerate(self.buckets):
+            if value <= bound:
+                self.counts[i] += 1
+                break
+        else:
+            self.counts[-1] += 1
+        self.count += 1
+        self.sum += value
+
+    def cumulative(self) -> List[Tuple[str, int]]:
+        result = []
+        total = 0
+        for bound, count in zip(self.buckets + (float("inf"),), self.counts):
+            total += count
+            result.append(("+Inf" if bound == float("inf") else f"{bound:g}", total))
+        return result
+
+    def quantile(self, q: float) -> Optional[float]:
+        """
+        버킷 상한 기준 근사 분위수 (관측값이 없으면 None)
+        분위수가 가장 큰 버킷을 넘으면 그 상한을 반환합니다. (JSON으로 직렬화할 수 없는 inf 대신 "상한 이상"의 의미)
+        """
+        if self.count == 0:
+            return None
+        target = q * self.count
+        for bound, total in zip(self.buckets, self.cumulative()):
+            if total[1] >= target:
+                return bound
+        return self.buckets[-1]
+
+    def snapshot(self) -> Dict[str, Any]:
+        return {
+            "count": self.count,
+            "sum": round(self.sum, 4),
+            "avg": round(self.sum / self.count, 4) if self.count else None,
+            "p50": self.quantile(0.5),
+            "p90": self.quantile(0.9),
+            "p99": self.quantile(0.99),
+        }
+
+
+class LLMMetrics:
+    """(모델, 섹션)별 LLM 호출 히스토그램과 결과 카운터"""
+
+    HISTOGRAMS = {
+        "latency_seconds": LATENCY_BUCKETS,
+        "queue_wait_seconds": LATENCY_BUCKETS,
+        "prompt_tokens": TOKEN_BUCKETS,
+        "completion_tokens": TOKEN_BUCKETS,
+    }
+
+    def __init__(self, ledger_path: str = LEDGER_PATH):
+        self.ledger_path = ledger_path
+        self._series: Dict[Tuple[str, str], Dict[str, Any]] = {}
+        self._lock = threading.Lock()
+        self._ledger_lock = threading.Lock()
+
+    def _get_series(self, model: str, section: str) -> Dict[str, Any]:
+        key = (model, section)
+        series = self._series.get(key)
+        if series is None:
+            series = {
+                "histograms": {
+                    name: Histogram(buckets) for name, buckets in self.HISTOGRAMS.items()
+                },
+                "outcomes": dict.fromkeys(OUTCOMES, 0),
+            }
+            self._series[key] = series
+        return series
+
+    def record(
+        self,
+        model: str,
+        section: str,
+        outcome: str,
+        latency: float = 0.0,
+        queue_wait: float = 0.0,
+        prompt_tokens: int = 0,
+        completion_tokens: int = 0,
+        called: bool = True,
+    ) -> None:
+        """
+        LLM 호출 한 건 기록
+        called=False(캐시 히트, 호출 전 거부)이면 결과 카운터만 올리고 히스토그램에는 넣지 않습니다.
+        """
+        section = section or "unknown"
+        with self._lock:
+            series = self._get_series(model, section)
+            series["outcomes"][outcome] = series["outcomes"].get(outcome, 0) + 1
+            if called:
+                histograms = series["histograms"]
+                histograms["latency_seconds"].observe(latency)
+                histograms["queue_wait_seconds"].observe(queue_wait)
+                histograms["prompt_tokens"].observe(prompt_tokens)
+                if outcome == "success":
+                    histograms["completion_tokens"].observe(completion_tokens)
+
+        if self.ledger_path:
+            self._append_ledger(
+                {
+                    "ts": round(time.time(), 3),
+                    "model": model,
+                    "section": section,
+                    "outcome": outcome,
+                    "latency": round(latency, 4),
+                    "queue_wait": round(queue_wait, 4),
+                    "prompt_tokens": prompt_tokens,
+                    "completion_tokens": completion_tokens,
+                }
+            )
+
+    def _append_ledger(self, entry: Dict[str, Any]) -> None:
+        try:
+            with self._ledger_lock:
+                with open(self.ledger_path, "a", encoding="utf-8") as f:
+                    f.write(json.dumps(entry, ensure_ascii=False) + "\n")
+        except OSError as e:
+            print(f"⚠️ LLM 호출 장부 기록 실패: {e}")
+
+    def snapshot(self) -> List[Dict[str, Any]]:
+        """JSON 조회용 요약 (히스토그램은 근사 분위수로 표시)"""
+        with self._lock:
+            return [
+                {
+                    "model": model,
+                    "section": section,
+                    "outcomes": dict(series["outcomes"]),
+                    **{
+                        name: histogram.snapshot()
+                        for name, histogram in series["histograms"].items()
+                    },
+                }
+                for (model, section), series in sorted(self._series.items())
+            ]
+
+    def render_prometheus(self) -> str:
+        """Prometheus 텍스트 노출 형식"""
+        lines = []
+        with self._lock:
+            lines.append("# TYPE llm_calls_total counter")
+            for (model, section), series in sorted(self._series.items()):
+                for outcome, count in series["outcomes"].items():
+                    lines.append(
+                        f'llm_calls_total{{model="{model}",section="{section}",outcome="{outcome}"}} {count}'
+                    )
+            for name in self.HISTOGRAMS:
+                metric = f"llm_{name}"
+                lines.append(f"# TYPE {metric} histogram")
+                for (model, section), series in sorted(self._series.items()):
+                    histogram = series["histograms"][name]
+                    labels = f'model="{model}",section="{section}"'
+                    for bound, total in histogram.cumulative():
+                        lines.append(f'{metric}_bucket{{{labels},le="{bound}"}} {total}')
+                    lines.append(f"{metric}_sum{{{labels}}} {histogram.sum:g}")
+                    lines.append(f"{metric}_count{{{labels}}} {histogram.count}")
+        return "\n".join(lines) + "\n"
+
+
+# 프로세스 전역 계측
+llm_metrics = LLMMetrics()
@@ -0,0 +1,176 @@
+# llm_pool.py
+"""
+프로세스 전역에서 공유하는 LLM 클라이언트 풀
+
+- (model, temperature)별 ChatUpstage 인스턴스를 한 번만 생성하여 재사용
+- 모든 인스턴스가 하나의 httpx 연결 풀(keep-alive)을 공유
+- 비동기 호출은 전용 이벤트 루프 스레드에서 실행하여
+  비동기 HTTP 클라이언트의 연결도 요청 간에 재사용
+- 모델 생성은 llm_providers의 제공자에 위임 (LLM_PROVIDER=fake이면 네트워크 없이 동작)
+"""
+import asyncio
+import atexit
+import os
+import queue
+import threading
+from typing import Any, AsyncIterator, Coroutine, Dict, Iterator, Optional, Tuple
+
+import httpx
+from dotenv import load_dotenv
+
+from core_logic.llm_providers import get_provider
+
+load_dotenv()
+
+# 공유 연결 풀의 최대 연결 수
+MAX_POOL_SIZE = int(os.getenv("LLM_MAX_POOL_SIZE", "20"))
+# 유휴 keep-alive 연결 유지 시간(초)
+KEEPALIVE_EXPIRY = float(os.getenv("LLM_KEEPALIVE_EXPIRY", "60"))
+
+_lock = threading.Lock()
+_clients: Dict[Tuple[str, str, float], Any] = {}
+_http_client: Optional[httpx.Client] = None
+_http_async_client: Optional[httpx.AsyncClient] = None
+_loop: Optional[asyncio.AbstractEventLoop] = None
+_loop_thread: Optional[threading.Thread] = None
+
+
+def _limits(max_pool_size: int) -> httpx.Limits:
+    return httpx.Limits(
+        max_connections=max_pool_size,
+        max_keepalive_connections=max_pool_size,
+        keepalive_expiry=KEEPALIVE_EXPIRY,
+    )
+
+
+def init_pool(max_pool_size: Optional[int] = None) -> None:
+    """
+    공유 HTTP 클라이언트와 비동기 실행용 이벤트 루프를 생성합니다.
+    앱 시작 시 한 번 호출하며, 이미 초기화되어 있으면 아무 작업도 하지 않습니다.
+    """
+    global _http_client, _http_async_client, _loop, _loop_thread
+
+    with _lock:
+        if _loop is not None:
+            return
+
+        size = max_pool_size or MAX_POOL_SIZE
+        _http_client = httpx.Client(limits=_limits(size))
+
+        _loop = asyncio.new_event_loop()
+        _loop_thread = threading.Thread(
+            target=_loop.run_forever, name="llm-pool-loop", daemon=True
+        )
+        _loop_thread.start()
+
+        # AsyncClient는 사용할 이벤트 루프 안에서 생성
+        async def _create_async_client() -> httpx.AsyncClient:
+            return httpx.AsyncClient(limits=_limits(size))
+
+        _http_async_client = asyncio.run_coroutine_threadsafe(
+            _create_async_client(), _loop
+        ).result()
+
+    atexit.register(close_pool)
+
+
+def get_llm(
+    model: str = "solar-pro2", temperature: float = 0.3, provider: Optional[str] = None
+) -> Any:
+    """
+    (provider, model, temperature)에 해당하는 공유 채팅 모델 인스턴스를 반환합니다.
+    provider를 생략하면 LLM_PROVIDER 설정값(기본 upstage)을 사용합니다.
+    """
+    init_pool()
+
+    llm_provider = get_provider(provider)
+    key = (llm_provider.name, model, float(temperature))
+    with _lock:
+        llm = _clients.get(key)
+        if llm is None:
+            llm = llm_provider.create(
+                model,
+                temperature,
+                http_client=_http_client,
+                http_async_client=_http_async_client,
+            )
+            _clients[key] = llm
+        return llm
+
+
+def run_async(coro: Coroutine[Any, Any, Any]) -> Any:
+    """
+    코루틴을 풀 전용 이벤트 루프에서 실행하고 결과를 기다립니다.
+    동기 코드(FastAPI 스레드풀, CLI)에서 비동기 LLM 호출을 사용할 때 사용합니다.
+    """
+    init_pool()
+    return asyncio.run_coroutine_threadsafe(coro, _loop).result()
+
+
+async def await_async(coro: Coroutine[Any, Any, Any]) -> Any:
+    """
+    코루틴을 풀 전용 이벤트 루프에서 실행하고, 호출한 이벤트 루프를 막지 않고 결과를 기다립니다.
+    async 라우트(DB_ASYNC=true)에서 비동기 LLM 호출을 사용할 때 사용합니다.
+    (HTTP 클라이언트가 풀 전용 루프에 묶여 있으므로 호출은 항상 그 루프에서 실행)
+    """
+    init_pool()
+    return await asyncio.wrap_future(asyncio.run_coroutine_threadsafe(coro, _loop))
+
+
+def iterate_async(agen: AsyncIterator[Any]) -> Iterator[Any]:
+    """
+    비동기 이터레이터를 풀 전용 이벤트 루프에서 실행하면서
+    도착하는 항목을 동기 이터레이터로 전달합니다. (스트리밍 응답용)
+    끝까지 소비하지 않고 닫으면(클라이언트 연결 종료 등) 풀 루프의 실행을 취소하고
+    비동기 이터레이터를 닫아, 진행 중인 LLM 스트림과 속도 제한 슬롯을 바로 정리합니다.
+    """
+    init_pool()
+    items: "queue.Queue[Any]" = queue.Queue()
+    finished = object()
+
+    async def _pump() -> None:
+        try:
+            async for item in agen:
+                items.put(item)
+        except Exception as e:
+            items.put(e)
+        finally:
+            # 취소된 경우에도 비동기 제너레이터의 정리(finally)를 이 루프에서 실행
+            await agen.aclose()
+            items.put(finished)
+
+    future = asyncio.run_coroutine_threadsafe(_pump(), _loop)
+    try:
+        while True:
+            item = items.get()
+            if item is finished:
+                return
+            if isinstance(item, Exception):
+                raise item
+            yield item
+    finally:
+        future.cancel()
+
+
+def close_pool() -> None:
+    """공유 클라이언트와 연결을 정리합니다."""
+    global _http_client, _http_async_client, _loop, _loop_thread
+
+    with _lock:
+        if _loop is None:
+            return
+
+        if _http_async_client is not None:
+            asyncio.run_coroutine_threadsafe(_http_async_client.aclose(), _loop).result()
+        if _http_client is not None:
+            _http_client.close()
+
+        _loop.call_soon_threadsafe(_loop.stop)
+        _loop_thread.join(timeout=5)
+        _loop.close()
+
+        _clients.clear()
+        _http_client = None
+        _http_async_client = None
+        _loop = None
+        _loop_thread = None
@@ -0,0 +1,223 @@
+# llm_providers.py
+"""
+LLM 제공자(provider) 선택
+
+LLM_PROVIDER 환경변수로 사용할 제공자를 고릅니다.
+- upstage: ChatUpstage (UPSTAGE_API_KEY 필요, 실제 API 호출)
+- fake: 네트워크 없이 동작하는 결정적 가짜 모델 (부하 테스트, 벤치마크용)
+
+가짜 모델은 같은 프롬프트에 항상 같은 텍스트를 반환하고,
+지연 분포(로그정규), 응답 토큰 수, 오류/429 비율을 환경변수로 조절할 수 있습니다.
+"""
+import asyncio
+import hashlib
+import json
+import math
+import os
+import random
+import threading
+import time
+from typing import Any, AsyncIterator, Dict, List, Optional, Tuple
+
+import httpx
+import openai
+from dotenv import load_dotenv
+from langchain_core.messages import AIMessage, AIMessageChunk
+
+from core_logic.token_budget import count_message_tokens, count_tokens
+
+load_dotenv()
+
+DEFAULT_PROVIDER = os.getenv("LLM_PROVIDER", "upstage")
+
+# 가짜 모델 설정
+FAKE_LATENCY_MEDIAN = float(os.getenv("LLM_FAKE_LATENCY_MEDIAN", "0.8"))  # 초
+FAKE_LATENCY_SIGMA = float(os.getenv("LLM_FAKE_LATENCY_SIGMA", "0.4"))  # 로그정규 분산 정도
+FAKE_COMPLETION_TOKENS = int(os.getenv("LLM_FAKE_COMPLETION_TOKENS", "150"))
+FAKE_ERROR_RATE = float(os.getenv("LLM_FAKE_ERROR_RATE", "0"))  # 500 오류 비율
+FAKE_RATE_LIMIT_RATE = float(os.getenv("LLM_FAKE_RATE_LIMIT_RATE", "0"))  # 429 비율
+FAKE_SEED = int(os.getenv("LLM_FAKE_SEED", "42"))
+
+FAKE_SENTENCES = [
+    "학생은 오늘 수업에서 핵심 개념을 차분하게 정리하며 문제에 접근했습니다.",
+    "풀이 과정을 단계별로 적는 습관이 자리 잡아 실수가 눈에 띄게 줄었습니다.",
+    "응용 문제에서는 조건을 빠뜨리는 경우가 있어 문제를 끝까지 읽는 연습이 필요합니다.",
+    "수업 중 질문에 적극적으로 답하며 이해한 내용을 자신의 말로 설명했습니다.",
+    "과제를 성실하게 수행하여 지난 시간 배운 내용을 잘 복습해 왔습니다.",
+    "계산 과정에서 부호 실수가 반복되어 검산하는 습관을 함께 길러 가겠습니다.",
+    "이전 수업들과 비교하면 문제 해결 속도와 정확도가 꾸준히 좋아지고 있습니다.",
+    "다음 시간에는 서술형 문제를 통해 논리적으로 설명하는 힘을 키울 예정입니다.",
+]
+
+_FAKE_API_URL = "http://fake-llm.local/v1/chat/completions"
+
+
+class FakeChatModel:
+    """
+    ChatUpstage 대신 사용하는 결정적 가짜 채팅 모델.
+    invoke / ainvoke / astream을 지원하며, 응답에는 usage_metadata(토큰 수)가 포함됩니다.
+    """
+
+    # 응답 캐시 키에 쓰이는 구현 식별자 (같은 모델 이름의 실제 Upstage 응답과 구분)
+    _llm_type = "fake-chat"
+
+    def __init__(
+        self,
+        model_name: str = "fake",
+        temperature: float = 0.0,
+        latency_median: float = FAKE_LATENCY_MEDIAN,
+        latency_sigma: float = FAKE_LATENCY_SIGMA,
+        completion_tokens: int = FAKE_COMPLETION_TOKENS,
+        error_rate: float = FAKE_ERROR_RATE,
+        rate_limit_rate: float = FAKE_RATE_LIMIT_RATE,
+        seed: int = FAKE_SEED,
+    ):
+        self.model_name = model_name
+        self.temperature = temperature
+        self.latency_median = latency_median
+        self.latency_sigma = latency_sigma
+        self.completion_tokens = completion_tokens
+        self.error_rate = error_rate
+        self.rate_limit_rate = rate_limit_rate
+        # 지연/오류 추첨 순서는 시드로 고정 (호출 순서가 같으면 같은 결과)
+        self._rng = random.Random(seed)
+        self._lock = threading.Lock()
+
+    def _draw(self) -> Tuple[float, Optional[Exception]]:
+        """이번 호출의 지연 시간과 발생시킬 오류"""
+        with self._lock:
+            latency = self.latency_median * math.exp(
+                self.latency_sigma * self._rng.gauss(0, 1)
+            )
+            roll = self._rng.random()
+
+        if roll < self.rate_limit_rate:
+            response = httpx.Response(429, request=httpx.Request("POST", _FAKE_API_URL))
+            # 429는 실제 API처럼 빠르게 반환
+            return latency * 0.1, openai.RateLimitError(
+                "fake rate limit", response=response, body=None
+            )
+        if roll < self.rate_limit_rate + self.error_rate:
+            response = httpx.Response(500, request=httpx.Request("POST", _FAKE_API_URL))
+            return latency, openai.InternalServerError(
+                "fake server error", response=response, body=None
+            )
+        return latency, None
+
+    def _paragraph(self, rng: random.Random) -> str:
+        sentences = []
+        while count_tokens(" ".join(sentences)) < self.completion_tokens:
+            sentences.append(rng.choice(FAKE_SENTENCES))
+        return " ".join(sentences)
+
+    def _respond(self, messages: List[Tuple[str, str]]) -> str:
+        """프롬프트 해시로 문장을 골라 항상 같은 응답을 만듭니다."""
+        prompt = json.dumps(messages, ensure_ascii=False)
+        digest = hashlib.sha256(prompt.encode("utf-8")).hexdigest()
+        rng = random.Random(int(digest[:16], 16))
+
+        # 구조화 출력 프롬프트(JSON 응답 요청)에는 JSON으로 응답
+        if '{"improvement"' in prompt.replace('\\"', '"'):
+            return json.dumps(
+                {key: self._paragraph(rng) for key in ("improvement", "attitude", "overall")},
+                ensure_ascii=False,
+            )
+        return self._paragraph(rng)
+
+    def _usage(self, messages: List[Tuple[str, str]], text: str) -> Dict[str, int]:
+        input_tokens = count_message_tokens(messages)
+        output_tokens = count_tokens(text)
+        return {
+            "input_tokens": input_tokens,
+            "output_tokens": output_tokens,
+            "total_tokens": input_tokens + output_tokens,
+        }
+
+    def invoke(self, messages: List[Tuple[str, str]], **kwargs: Any) -> AIMessage:
+        latency, error = self._draw()
+        time.sleep(latency)
+        if error is not None:
+            raise error
+        text = self._respond(messages)
+        return AIMessage(content=text, usage_metadata=self._usage(messages, text))
+
+    async def ainvoke(self, messages: List[Tuple[str, str]], **kwargs: Any) -> AIMessage:
+        latency, error = self._draw()
+        await asyncio.sleep(latency)
+        if error is not None:
+            raise error
+        text = self._respond(messages)
+        return AIMessage(content=text, usage_metadata=self._usage(messages, text))
+
+    async def astream(
+        self, messages: List[Tuple[str, str]], **kwargs: Any
+    ) -> AsyncIterator[AIMessageChunk]:
+        latency, error = self._draw()
+        # 첫 토큰까지 지연의 30%, 나머지는 조각마다 나누어 대기
+        await asyncio.sleep(latency * 0.3)
+        if error is not None:
+            raise error
+        text = self._respond(messages)
+        pieces = [text[i : i + 8] for i in range(0, len(text), 8)] or [""]
+        for piece in pieces:
+            await asyncio.sleep(latency * 0.7 / len(pieces))
+            yield AIMessageChunk(content=piece)
+        yield AIMessageChunk(content="", usage_metadata=self._usage(messages, text))
+
+
+class LLMProvider:
+    """(model, temperature)로 채팅 모델 인스턴스를 만드는 제공자 인터페이스"""
+
+    name = ""
+
+    def create(
+        self,
+        model: str,
+        temperature: float,
+        http_client: Optional[httpx.Client] = None,
+        http_async_client: Optional[httpx.AsyncClient] = None,
+    ) -> Any:
+        raise NotImplementedError
+
+
+class UpstageProvider(LLMProvider):
+    name = "upstage"
+
+    def create(self, model, temperature, http_client=None, http_async_client=None):
+        from langchain_upstage import ChatUpstage
+
+        api_key = os.getenv("UPSTAGE_API_KEY")
+        if not api_key:
+            raise RuntimeError("UPSTAGE_API_KEY 환경변수가 필요합니다.")
+        return ChatUpstage(
+            model=model,
+            temperature=temperature,
+            api_key=api_key,
+            http_client=http_client,
+            http_async_client=http_async_client,
+            # 재시도는 rate_limiter에서 백오프와 함께 처리
+            max_retries=0,
+        )
+
+
+class FakeProvider(LLMProvider):
+    name = "fake"
+
+    def create(self, model, temperature, http_client=None, http_async_client=None):
+        return FakeChatModel(model_name=model, temperature=temperature)
+
+
+PROVIDERS: Dict[str, LLMProvider] = {
+    provider.name: provider for provider in (UpstageProvider(), FakeProvider())
+}
+
+
+def get_provider(name: Optional[str] = None) -> LLMProvider:
+    """이름으로 제공자를 찾습니다. (None이면 LLM_PROVIDER 설정값)"""
+    name = name or DEFAULT_PROVIDER
+    provider = PROVIDERS.get(name)
+    if provider is None:
+        raise ValueError(
+            f"알 수 없는 LLM 제공자: {name} (사용 가능: {', '.join(PROVIDERS)})"
+        )
+    return provider
@@ -0,0 +1,548 @@
+# rate_limiter.py
+"""
+Upstage API 호출용 클라이언트 측 속도 제한기
+
+- 분당 요청 수 / 분당 토큰 수 토큰 버킷
+- 429 응답과 지연 시간에 따라 동시 호출 수를 조절하는 AIMD 방식 적응형 동시성 제한
+- 429, 일시적 오류에 대한 지터가 적용된 지수 백오프 재시도 (tenacity)
+- 시도마다 대기 시간, 응답 지연, 토큰 수, 결과를 llm_metrics에 기록
+- 서킷 브레이커가 열려 있거나 요청 마감 시간(deadline)이 지나면 호출하지 않고 바로 실패
+"""
+import asyncio
+import os
+import threading
+import time
+from collections import deque
+from typing import Any, AsyncIterator, Deque, Dict, List, Optional, Tuple
+
+import openai
+from dotenv import load_dotenv
+from core_logic.circuit_breaker import CircuitOpenError, breaker
+from core_logic.llm_metrics import llm_metrics
+from core_logic.token_budget import count_message_tokens, count_tokens
+from tenacity import (
+    AsyncRetrying,
+    Retrying,
+    retry_if_exception,
+    stop_after_attempt,
+    stop_before_delay,
+    wait_random_exponential,
+)
+
+load_dotenv()
+
+REQUESTS_PER_MINUTE = float(os.getenv("LLM_REQUESTS_PER_MINUTE", "100"))
+TOKENS_PER_MINUTE = float(os.getenv("LLM_TOKENS_PER_MINUTE", "100000"))
+# 응답 토큰 수를 미리 알 수 없으므로 호출당 예약하는 응답 토큰 수
+COMPLETION_TOKENS_ESTIMATE = int(os.getenv("LLM_COMPLETION_TOKENS_ESTIMATE", "400"))
+
+MIN_CONCURRENCY = int(os.getenv("LLM_MIN_CONCURRENCY", "1"))
+MAX_CONCURRENCY = int(os.getenv("LLM_MAX_CONCURRENCY", "16"))
+INITIAL_CONCURRENCY = int(os.getenv("LLM_INITIAL_CONCURRENCY", "8"))
+# 이 시간(초)보다 오래 걸린 호출은 과부하 신호로 보고 동시성 한도를 줄임
+LATENCY_TARGET_SECONDS = float(os.getenv("LLM_LATENCY_TARGET_SECONDS", "30"))
+
+MAX_ATTEMPTS = int(os.getenv("LLM_MAX_ATTEMPTS", "4"))
+BACKOFF_MAX_SECONDS = float(os.getenv("LLM_BACKOFF_MAX_SECONDS", "30"))
+
+
+class DeadlineExceeded(TimeoutError):
+    """요청 마감 시간 안에 LLM 호출을 마칠 수 없음"""
+
+
+def is_rate_limited(error: BaseException) -> bool:
+    return isinstance(error, openai.RateLimitError) or getattr(error, "status_code", None) == 429
+
+
+def is_retryable(error: BaseException) -> bool:
+    """429와 일시적인 네트워크/서버 오류만 재시도"""
+    return is_rate_limited(error) or isinstance(
+        error,
+        (openai.APITimeoutError, openai.APIConnectionError, openai.InternalServerError),
+    )
+
+
+def estimate_tokens(messages: List[Tuple[str, str]]) -> int:
+    """토큰 버킷 예약용 토큰 수 (프롬프트 토큰 + 예상 응답 토큰)"""
+    return count_message_tokens(messages) + COMPLETION_TOKENS_ESTIMATE
+
+
+def _outcome(error: Optional[BaseException]) -> str:
+    if error is None:
+        return "success"
+    if isinstance(error, CircuitOpenError):
+        return "circuit_open"
+    if isinstance(error, DeadlineExceeded):
+        return "deadline_exceeded"
+    if not isinstance(error, Exception):
+        # 헤지/마감 시간으로 인한 취소(CancelledError), 스트림 소비 중단(GeneratorExit)
+        return "cancelled"
+    return "rate_limited" if is_rate_limited(error) else "error"
+
+
+async def _with_deadline(coro: Any, deadline: Optional[float]) -> Any:
+    """마감 시각(time.monotonic 기준)까지 끝나지 않으면 취소하고 DeadlineExceeded 발생"""
+    if deadline is None:
+        return await coro
+    try:
+        return await asyncio.wait_for(coro, timeout=max(0.0, deadline - time.monotonic()))
+    except asyncio.TimeoutError:
+        raise DeadlineExceeded("요청 마감 시간 안에 LLM 응답을 받지 못했습니다.")
+
+
+def _usage_tokens(
+    response: Any, messages: List[Tuple[str, str]], text: str = ""
+) -> Tuple[int, int]:
+    """응답의 usage_metadata에서 (프롬프트, 응답) 토큰 수를 읽고, 없으면 직접 계산"""
+    usage = getattr(response, "usage_metadata", None) or {}
+    if not text and response is not None:
+        text = str(getattr(response, "content", "") or "")
+    prompt_tokens = usage.get("input_tokens") or count_message_tokens(messages)
+    completion_tokens = usage.get("output_tokens") or count_tokens(text)
+    return prompt_tokens, completion_tokens
+
+
+class TokenBucket:
+    """분당 허용량(per_minute)을 일정 속도로 채우는 토큰 버킷"""
+
+    def __init__(self, per_minute: float, capacity: Optional[float] = None):
+        self.rate = per_minute / 60.0
+        self.capacity = capacity or per_minute
+        self.tokens = self.capacity
+        self.updated_at = time.monotonic()
+        self._lock = threading.Lock()
+
+    def reserve(self, amount: float) -> float:
+        """
+        amount만큼 예약하고 실제 사용 전까지 기다려야 하는 시간(초)을 반환합니다.
+        잔량이 부족하면 음수로 빌려 쓰고, 채워질 때까지의 대기 시간을 돌려줍니다.
+        """
+        with self._lock:
+            now = time.monotonic()
+            self.tokens = min(
+                self.capacity, self.tokens + (now - self.updated_at) * self.rate
+            )
+            self.updated_at = now
+            self.tokens -= min(amount, self.capacity)
+            return 0.0 if self.tokens >= 0 else -self.tokens / self.rate
+
+    def available(self) -> float:
+        with self._lock:
+            elapsed = time.monotonic() - self.updated_at
+            return min(self.capacity, self.tokens + elapsed * self.rate)
+
+
+def _set_waiter_done(waiter: asyncio.Future) -> None:
+    if not waiter.done():
+        waiter.set_result(None)
+
+
+class AdaptiveConcurrencyLimiter:
+    """
+    AIMD 방식 동시성 제한
+    - 정상 응답: 한도를 1/limit씩 증가 (한도만큼 성공하면 +1)
+    - 429 또는 목표 지연 초과: 한도를 절반으로 감소
+      (직전 감소 이전에 시작된 호출의 신호는 무시하여 왕복 1회 구간에 한 번만 감소)
+    """
+
+    def __init__(
+        self,
+        initial: int = INITIAL_CONCURRENCY,
+        minimum: int = MIN_CONCURRENCY,
+        maximum: int = MAX_CONCURRENCY,
+        latency_target: float = LATENCY_TARGET_SECONDS,
+    ):
+        self.limit = float(initial)
+        self.minimum = minimum
+        self.maximum = maximum
+        self.latency_target = latency_target
+        self.in_flight = 0
+        self.waiting = 0
+        self._counters = {
+            "successes": 0,
+            "rate_limited": 0,
+            "slow": 0,
+            "errors": 0,
+            "cancelled": 0,
+            "decreases": 0,
+        }
+        self._cond = threading.Condition()
+        # 마지막으로 한도를 줄인 시각 (time.monotonic 기준)
+        self._last_decrease = 0.0
+        # 슬롯을 기다리는 코루틴 (이벤트 루프, 깨울 future)
+        self._async_waiters: Deque[Tuple[asyncio.AbstractEventLoop, asyncio.Future]] = deque()
+
+    def _try_acquire(self) -> bool:
+        if self.in_flight < int(self.limit):
+            self.in_flight += 1
+            return True
+        return False
+
+    def acquire(self) -> None:
+        with self._cond:
+            self.waiting += 1
+            try:
+                while not self._try_acquire():
+                    self._cond.wait()
+            finally:
+                self.waiting -= 1
+
+    async def aacquire(self) -> None:
+        # 동기 스레드와 같은 한도를 공유하므로 release()가 깨워 줄 future를 등록하고 기다림
+        loop = asyncio.get_running_loop()
+        with self._cond:
+            self.waiting += 1
+        try:
+            while True:
+                waiter = loop.create_future()
+                with self._cond:
+                    if self._try_acquire():
+                        return
+                    self._async_waiters.append((loop, waiter))
+                try:
+                    await waiter
+                finally:
+                    with self._cond:
+                        if (loop, waiter) in self._async_waiters:
+                            self._async_waiters.remove((loop, waiter))
+        finally:
+            with self._cond:
+                self.waiting -= 1
+
+    def _decrease(self, latency: float) -> None:
+        """한도를 절반으로 줄임 (직전 감소 이후에 시작된 호출의 신호일 때만)"""
+        now = time.monotonic()
+        if now - latency < self._last_decrease:
+            return
+        self.limit = max(self.minimum, self.limit / 2)
+        self._last_decrease = now
+        self._counters["decreases"] += 1
+
+    def _wake_waiters(self) -> None:
+        """기다리는 스레드와 코루틴을 모두 깨워 다시 슬롯을 시도하게 함 (self._cond를 잡은 상태에서 호출)"""
+        self._cond.notify_all()
+        while self._async_waiters:
+            loop, waiter = self._async_waiters.popleft()
+            try:
+                loop.call_soon_threadsafe(_set_waiter_done, waiter)
+            except RuntimeError:
+                # 이벤트 루프가 이미 닫힘
+                pass
+
+    def release(self, latency: float, error: Optional[BaseException] = None) -> None:
+        with self._cond:
+            self.in_flight -= 1
+            if error is not None and not isinstance(error, Exception):
+                # 헤지 등으로 취소되거나 소비가 중단된 호출은 한도 조정에 반영하지 않음
+                self._counters["cancelled"] += 1
+            elif error is not None and is_rate_limited(error):
+                self._counters["rate_limited"] += 1
+                self._decrease(latency)
+            elif error is not None:
+                self._counters["errors"] += 1
+            elif latency > self.latency_target:
+                self._counters["slow"] += 1
+                self._decrease(latency)
+            else:
+                self._counters["successes"] += 1
+                self.limit = min(self.maximum, self.limit + 1.0 / self.limit)
+            self._wake_waiters()
+
+    def snapshot(self) -> Dict[str, Any]:
+        with self._cond:
+            return {
+                "limit": round(self.limit, 2),
+                "in_flight": self.in_flight,
+                "waiting": self.waiting,
+                **self._counters,
+            }
+
+
+class LLMRateLimiter:
+    """요청/토큰 버킷, 적응형 동시성 제한, 재시도를 묶은 LLM 호출 게이트"""
+
+    def __init__(
+        self,
+        requests_per_minute: float = REQUESTS_PER_MINUTE,
+        tokens_per_minute: float = TOKENS_PER_MINUTE,
+        max_attempts: int = MAX_ATTEMPTS,
+    ):
+        self.requests = TokenBucket(requests_per_minute)
+        self.tokens = TokenBucket(tokens_per_minute)
+        self.concurrency = AdaptiveConcurrencyLimiter()
+        self.breaker = breaker
+        self.max_attempts = max_attempts
+        self._retries = 0
+        self._lock = threading.Lock()
+
+    def _reserve(self, messages: List[Tuple[str, str]]) -> float:
+        return max(
+            self.requests.reserve(1), self.tokens.reserve(estimate_tokens(messages))
+        )
+
+    def _count_retry(self, retry_state: Any) -> None:
+        with self._lock:
+            self._retries += 1
+        print(
+            f"⚠️ LLM 호출 재시도 {retry_state.attempt_number}/{self.max_attempts}: "
+            f"{retry_state.outcome.exception()}"
+        )
+
+    def _retry_kwargs(self, deadline: Optional[float] = None) -> Dict[str, Any]:
+        stop = stop_after_attempt(self.max_attempts)
+        if deadline is not None:
+            # 다음 재시도 대기가 마감 시간을 넘기면 재시도하지 않음
+            stop = stop | stop_before_delay(max(0.0, deadline - time.monotonic()))
+        return {
+            "retry": retry_if_exception(is_retryable),
+            "wait": wait_random_exponential(multiplier=1, max=BACKOFF_MAX_SECONDS),
+            "stop": stop,
+            "before_sleep": self._count_retry,
+            "reraise": True,
+        }
+
+    def _record(
+        self,
+        llm: Any,
+        section: str,
+        messages: List[Tuple[str, str]],
+        queue_wait: float,
+        latency: float,
+        error: Optional[BaseException] = None,
+        response: Any = None,
+        text: str = "",
+        called: bool = True,
+    ) -> None:
+        if error is None:
+            prompt_tokens, completion_tokens = _usage_tokens(response, messages, text)
+        else:
+            prompt_tokens, completion_tokens = count_message_tokens(messages), 0
+        llm_metrics.record(
+            getattr(llm, "model_name", ""),
+            section,
+            _outcome(error),
+            latency=latency,
+            queue_wait=queue_wait,
+            prompt_tokens=prompt_tokens,
+            completion_tokens=completion_tokens,
+            called=called,
+        )
+
+    def _admit(
+        self,
+        llm: Any,
+        messages: List[Tuple[str, str]],
+        section: str,
+        deadline: Optional[float],
+    ) -> Tuple[bool, float]:
+        """
+        서킷 브레이커와 마감 시간을 확인한 뒤 버킷에서 예약합니다.
+        (시험 호출 여부, 호출 전에 기다려야 하는 시간)을 반환하고, 호출할 수 없으면 예외를 발생시킵니다.
+        """
+        try:
+            probe = self.breaker.allow()
+            if deadline is not None and time.monotonic() >= deadline:
+                raise DeadlineExceeded("요청 마감 시간이 지나 LLM을 호출하지 않습니다.")
+            delay = self._reserve(messages)
+            if deadline is not None and time.monotonic() + delay >= deadline:
+                raise DeadlineExceeded("속도 제한 대기 중 요청 마감 시간이 지납니다.")
+        except (CircuitOpenError, DeadlineExceeded) as e:
+            if not isinstance(e, CircuitOpenError):
+                self.breaker.cancel(probe)
+            self._record(llm, section, messages, 0.0, 0.0, error=e, called=False)
+            raise
+        return probe, delay
+
+    def _finish(
+        self, latency: float, probe: bool, error: Optional[BaseException] = None
+    ) -> None:
+        """
+        동시성 슬롯 반환과 브레이커 기록
+        브레이커에는 제공자 쪽 오류(5xx, 429, 연결 오류, 제공자 시간 초과)만 실패로 기록하고,
+        요청 마감 시간 초과나 잘못된 요청처럼 제공자 상태와 무관한 오류는 기록하지 않습니다.
+        """
+        self.concurrency.release(latency, error)
+        if error is not None and not is_retryable(error):
+            self.breaker.cancel(probe)
+            return
+        self.breaker.record(latency, failed=error is not None, probe=probe)
+
+    def _abandon(
+        self,
+        llm: Any,
+        section: str,
+        messages: List[Tuple[str, str]],
+        queued: float,
+        started: Optional[float],
+        probe: bool,
+        error: BaseException,
+        called: bool = False,
+    ) -> None:
+        """
+        취소 등으로 결과 없이 끝난 호출 정리 (제공자 실패로 보지 않음)
+        시험 호출 자리를 반환하고, 동시성 슬롯을 얻은 뒤였으면(started) 슬롯도 반환합니다.
+        """
+        now = time.monotonic()
+        latency = 0.0
+        if started is not None:
+            latency = now - started
+            self.concurrency.release(latency, error)
+        self.breaker.cancel(probe)
+        self._record(
+            llm, section, messages, (started or now) - queued, latency, error=error, called=called
+        )
+
+    def _call_once(
+        self,
+        llm: Any,
+        messages: List[Tuple[str, str]],
+        section: str,
+        deadline: Optional[float] = None,
+    ) -> Any:
+        queued = time.monotonic()
+        probe, delay = self._admit(llm, messages, section, deadline)
+        time.sleep(delay)
+        self.concurrency.acquire()
+        started = time.monotonic()
+        try:
+            result = llm.invoke(messages)
+        except Exception as e:
+            latency = time.monotonic() - started
+            self._finish(latency, probe, e)
+            self._record(llm, section, messages, started - queued, latency, error=e)
+            raise
+        latency = time.monotonic() - started
+        self._finish(latency, probe)
+        self._record(llm, section, messages, started - queued, latency, response=result)
+        return result
+
+    async def _acall_once(
+        self,
+        llm: Any,
+        messages: List[Tuple[str, str]],
+        section: str,
+        deadline: Optional[float] = None,
+    ) -> Any:
+        queued = time.monotonic()
+        probe, delay = self._admit(llm, messages, section, deadline)
+        # _admit 이후의 대기 중에 취소되어도 시험 호출 자리가 반환되도록 바로 try 시작
+        started = None
+        try:
+            await asyncio.sleep(delay)
+            await self.concurrency.aacquire()
+            started = time.monotonic()
+            result = await _with_deadline(llm.ainvoke(messages), deadline)
+        except Exception as e:
+            if started is None:
+                self._abandon(llm, section, messages, queued, started, probe, e)
+                raise
+            latency = time.monotonic() - started
+            self._finish(latency, probe, e)
+            self._record(llm, section, messages, started - queued, latency, error=e)
+            raise
+        except BaseException as e:
+            # 헤지 요청이 먼저 끝났거나 호출한 쪽이 취소한 경우 (제공자 실패로 보지 않음)
+            self._abandon(llm, section, messages, queued, started, probe, e)
+            raise
+        latency = time.monotonic() - started
+        self._finish(latency, probe)
+        self._record(llm, section, messages, started - queued, latency, response=result)
+        return result
+
+    def invoke(
+        self,
+        llm: Any,
+        messages: List[Tuple[str, str]],
+        section: str = "",
+        deadline: Optional[float] = None,
+    ) -> Any:
+        """
+        제한과 재시도를 적용하여 llm.invoke 호출 (section은 계측용 이름)
+        deadline(time.monotonic 기준 시각)이 지나면 새 시도를 시작하지 않습니다.
+        동기 호출은 진행 중에 중단할 수 없으므로 마감 시간은 시도 사이에서만 확인합니다.
+        """
+        for attempt in Retrying(**self._retry_kwargs(deadline)):
+            with attempt:
+                return self._call_once(llm, messages, section, deadline)
+
+    async def ainvoke(
+        self,
+        llm: Any,
+        messages: List[Tuple[str, str]],
+        section: str = "",
+        deadline: Optional[float] = None,
+    ) -> Any:
+        """제한과 재시도를 적용하여 llm.ainvoke 호출 (deadline이 지나면 진행 중인 호출도 취소)"""
+        async for attempt in AsyncRetrying(**self._retry_kwargs(deadline)):
+            with attempt:
+                return await self._acall_once(llm, messages, section, deadline)
+
+    async def astream(
+        self, llm: Any, messages: List[Tuple[str, str]], section: str = ""
+    ) -> AsyncIterator[Any]:
+        """
+        제한을 적용하여 llm.astream 호출.
+        이미 일부 토큰을 전달한 뒤에는 재시도할 수 없으므로 재시도 없이 한 번만 호출합니다.
+        """
+        queued = time.monotonic()
+        probe, delay = self._admit(llm, messages, section, None)
+        started = None
+        usage_chunk = None
+        texts = []
+
+        def finish(error: Optional[Exception] = None) -> None:
+            latency = time.monotonic() - started
+            self._finish(latency, probe, error)
+            self._record(
+                llm,
+                section,
+                messages,
+                started - queued,
+                latency,
+                error=error,
+                response=usage_chunk,
+                text="".join(texts),
+            )
+
+        # _admit 이후의 대기 중에 취소되어도 시험 호출 자리가 반환되도록 바로 try 시작
+        try:
+            await asyncio.sleep(delay)
+            await self.concurrency.aacquire()
+            started = time.monotonic()
+            async for chunk in llm.astream(messages):
+                if getattr(chunk, "usage_metadata", None):
+                    usage_chunk = chunk
+                texts.append(str(getattr(chunk, "content", "") or ""))
+                yield chunk
+        except Exception as e:
+            if started is None:
+                self._abandon(llm, section, messages, queued, started, probe, e)
+            else:
+                finish(e)
+            raise
+        except BaseException as e:
+            # 클라이언트 연결 종료(GeneratorExit)나 취소로 중간에 닫힌 경우:
+            # 슬롯과 시험 호출 자리를 반환하고, 성공한 시험 호출로 기록하지 않음
+            self._abandon(
+                llm, section, messages, queued, started, probe, e, called=started is not None
+            )
+            raise
+        finish()
+
+    def snapshot(self) -> Dict[str, Any]:
+        """모니터링용 현재 상태"""
+        with self._lock:
+            retries = self._retries
+        return {
+            "requests_available": round(self.requests.available(), 2),
+            "requests_per_minute": self.requests.capacity,
+            "tokens_available": round(self.tokens.available(), 2),
+            "tokens_per_minute": self.tokens.capacity,
+            "concurrency": self.concurrency.snapshot(),
+            "retries": retries,
+            "circuit_breaker": self.breaker.snapshot(),
+        }
+
+
+# 프로세스 전역 제한기 (모든 LLM 호출이 공유)
+limiter = LLMRateLimiter()
@@ -0,0 +1,161 @@
+# student_summary.py
+"""
+학생별 누적 수업 요약 (rolling summary)
+
+수업이 추가될 때마다 요약을 한 건씩 갱신하여, 수업 횟수와 관계없이
+프롬프트에 들어가는 이전 기록의 크기를 일정하게 유지합니다.
+- recent: 최근 수업 기록 몇 건 (날짜순, 수업내용/특이사항은 축약)
+- 보관 통계: recent에서 밀려난 기록의 횟수와 점수 합계
+- topics: 밀려난 기록의 학습 주제 요약 (최근 것만 유지)
+"""
+import copy
+import os
+from typing import Any, Dict, List, Optional
+
+from dotenv import load_dotenv
+
+load_dotenv()
+
+# 프롬프트에 그대로 넣는 최근 기록 수 (현재 수업을 제외할 수 있도록 한 건 더 보관)
+SUMMARY_RECENT_RECORDS = int(os.getenv("SUMMARY_RECENT_RECORDS", "3"))
+# 요약에 남기는 지난 학습 주제 수와 주제 하나의 최대 글자 수
+SUMMARY_DIGEST_TOPICS = int(os.getenv("SUMMARY_DIGEST_TOPICS", "8"))
+SUMMARY_TOPIC_CHARS = int(os.getenv("SUMMARY_TOPIC_CHARS", "20"))
+# 최근 기록의 수업내용/특이사항 최대 글자 수
+SUMMARY_TEXT_CHARS = int(os.getenv("SUMMARY_TEXT_CHARS", "200"))
+
+SCORE_KEYS = ["attitude_score", "understanding_score", "homework_score", "qa_score"]
+SCORE_LABELS = {
+    "attitude_score": "태도",
+    "understanding_score": "이해도",
+    "homework_score": "과제",
+    "qa_score": "질문",
+}
+
+
+def _shorten(text: Optional[str], max_chars: int) -> str:
+    text = (text or "").strip()
+    return text if len(text) <= max_chars else text[:max_chars] + "…"
+
+
+def empty_summary() -> Dict[str, Any]:
+    return {
+        "class_count": 0,
+        "archived_count": 0,
+        "score_sums": {key: 0 for key in SCORE_KEYS},
+        "first_date": None,
+        "recent": [],
+        "topics": [],
+    }
+
+
+def compact_record(
+    class_id: Optional[int],
+    class_date: Any,
+    scores: Dict[str, Any],
+    progress_text: Optional[str] = None,
+    class_memo: Optional[str] = None,
+) -> Dict[str, Any]:
+    """수업 기록 한 건을 요약에 보관하는 형식으로 변환 (날짜는 ISO 문자열)"""
+    return {
+        "class_id": class_id,
+        "date": str(class_date),
+        **{key: int(scores[key]) for key in SCORE_KEYS},
+        "progress_text": _shorten(progress_text, SUMMARY_TEXT_CHARS),
+        "class_memo": _shorten(class_memo, SUMMARY_TEXT_CHARS),
+    }
+
+
+def _archive(summary: Dict[str, Any], record: Dict[str, Any]) -> None:
+    """recent에서 밀려난 기록을 통계와 주제 요약에 반영"""
+    summary["archived_count"] += 1
+    for key in SCORE_KEYS:
+        summary["score_sums"][key] += record[key]
+
+    topic = _shorten(record.get("progress_text"), SUMMARY_TOPIC_CHARS)
+    if topic:
+        topics = [t for t in summary["topics"] if t != topic] + [topic]
+        summary["topics"] = topics[-SUMMARY_DIGEST_TOPICS:]
+
+
+def add_record(summary: Dict[str, Any], record: Dict[str, Any]) -> Dict[str, Any]:
+    """
+    요약에 수업 기록 한 건을 더한 새 요약을 반환합니다. (O(1), 입력 요약은 바꾸지 않음)
+    기록은 날짜순으로 recent에 넣고, 넘치는 가장 오래된 기록은 통계로 보관합니다.
+    """
+    summary = copy.deepcopy(summary)
+    summary["class_count"] += 1
+    if summary["first_date"] is None or record["date"] < summary["first_date"]:
+        summary["first_date"] = record["date"]
+
+    recent: List[Dict[str, Any]] = summary["recent"] + [record]
+    recent.sort(key=lambda r: (r["date"], r.get("class_id") or 0))
+    while len(recent) > SUMMARY_RECENT_RECORDS + 1:
+        _archive(summary, recent.pop(0))
+    summary["recent"] = recent
+    return summary
+
+
+def build_summary(records: List[Dict[str, Any]]) -> Dict[str, Any]:
+    """기존 수업 기록 전체로 요약 생성 (요약이 없던 학생의 최초 1회)"""
+    summary = empty_summary()
+    for record in records:
+        summary = add_record(summary, record)
+    return summary
+
+
+def exclude_class(summary: Dict[str, Any], class_id: Optional[int]) -> Dict[str, Any]:
+    """
+    현재 수업을 뺀 '이전 기록' 요약을 반환합니다.
+    수업 저장 시 요약이 먼저 갱신되므로 프롬프트를 만들 때 현재 수업을 제외합니다.
+    """
+    if class_id is None:
+        return summary
+    recent = [r for r in summary["recent"] if r.get("class_id") != class_id]
+    if len(recent) == len(summary["recent"]):
+        return summary
+    summary = dict(summary, recent=recent, class_count=summary["class_count"] - 1)
+    return summary
+
+
+def past_records(summary: Dict[str, Any]) -> List[Dict[str, Any]]:
+    """프롬프트에 그대로 넣을 최근 기록 (최대 SUMMARY_RECENT_RECORDS건, 날짜순)"""
+    return summary["recent"][-SUMMARY_RECENT_RECORDS:]
+
+
+def _averages(total: Dict[str, int], count: int) -> str:
+    return ", ".join(
+        f"{SCORE_LABELS[key]} {total[key] / count:.1f}점" for key in SCORE_KEYS
+    )
+
+
+def render_summary(summary: Dict[str, Any]) -> str:
+    """
+    최근 기록 밖의 누적 이력을 몇 줄의 텍스트로 요약합니다.
+    최근 기록만으로 전체 이력이 표현되면 빈 문자열을 반환합니다.
+    """
+    recent = past_records(summary)
+    older_count = summary["class_count"] - len(recent)
+    if older_count <= 0:
+        return ""
+
+    # 최근 기록 보관분 중 프롬프트에 넣지 않는 기록도 장기 통계에 포함
+    older_sums = dict(summary["score_sums"])
+    topics = list(summary["topics"])
+    for record in summary["recent"][: len(summary["recent"]) - len(recent)]:
+        for key in SCORE_KEYS:
+            older_sums[key] += record[key]
+        topic = _shorten(record.get("progress_text"), SUMMARY_TOPIC_CHARS)
+        if topic and topic not in topics:
+            topics.append(topic)
+
+    lines = [
+        f"- 누적 수업: 총 {summary['class_count']}회 (첫 수업 {summary['first_date']})",
+        f"- 최근 {len(recent)}회 이전 평균({older_count}회): {_averages(older_sums, older_count)}",
+    ]
+    if recent:
+        recent_sums = {key: sum(r[key] for r in recent) for key in SCORE_KEYS}
+        lines.append(f"- 최근 {len(recent)}회 평균: {_averages(recent_sums, len(recent))}")
+    if topics:
+        lines.append(f"- 지난 학습 주제: {', '.join(topics[-SUMMARY_DIGEST_TOPICS:])}")
+    return "\n".join(lines)
@@ -0,0 +1,92 @@
+# token_budget.py
+"""
+프롬프트 토큰 수 계산과 예산 관리
+
+- tiktoken으로 프롬프트 토큰 수를 계산 (인코딩 파일을 받을 수 없는 환경에서는 글자 수 기반 추정)
+- 섹션별 프롬프트 토큰 수를 누적 기록하여 입력 토큰이 어디에 쓰이는지 확인
+"""
+import os
+import threading
+from typing import Any, Dict, List, Optional, Tuple
+
+from dotenv import load_dotenv
+
+load_dotenv()
+
+# 섹션 프롬프트 하나(system + user)에 허용하는 최대 입력 토큰 수
+PROMPT_TOKEN_BUDGET = int(os.getenv("PROMPT_TOKEN_BUDGET", "3000"))
+TOKENIZER_ENCODING = os.getenv("TOKENIZER_ENCODING", "cl100k_base")
+
+_encoding: Any = None
+_encoding_loaded = False
+_encoding_lock = threading.Lock()
+
+
+def _get_encoding() -> Optional[Any]:
+    """tiktoken 인코딩을 한 번만 로드 (실패하면 이후에도 추정치를 사용)"""
+    global _encoding, _encoding_loaded
+    if _encoding_loaded:
+        return _encoding
+
+    with _encoding_lock:
+        if not _encoding_loaded:
+            try:
+                import tiktoken
+
+                _encoding = tiktoken.get_encoding(TOKENIZER_ENCODING)
+            except Exception as e:
+                print(f"⚠️ tiktoken 인코딩 로드 실패, 글자 수 기반 추정 사용: {e}")
+                _encoding = None
+            _encoding_loaded = True
+    return _encoding
+
+
+def count_tokens(text: str) -> int:
+    """텍스트의 토큰 수"""
+    if not text:
+        return 0
+    encoding = _get_encoding()
+    if encoding is None:
+        # 한글 기준 약 2자당 1토큰
+        return (len(text) + 1) // 2
+    return len(encoding.encode(text))
+
+
+def count_message_tokens(messages: List[Tuple[str, str]]) -> int:
+    """(role, content) 메시지 목록의 토큰 수"""
+    return sum(count_tokens(content) for _, content in messages)
+
+
+class PromptTokenStats:
+    """섹션별 프롬프트 입력 토큰 누적 통계"""
+
+    def __init__(self):
+        self._sections: Dict[str, Dict[str, int]] = {}
+        self._lock = threading.Lock()
+
+    def record(self, section: str, tokens: int, truncated: bool = False) -> None:
+        with self._lock:
+            stats = self._sections.setdefault(
+                section,
+                {"prompts": 0, "total_tokens": 0, "max_tokens": 0, "last_tokens": 0, "truncated": 0},
+            )
+            stats["prompts"] += 1
+            stats["total_tokens"] += tokens
+            stats["max_tokens"] = max(stats["max_tokens"], tokens)
+            stats["last_tokens"] = tokens
+            if truncated:
+                stats["truncated"] += 1
+
+    def snapshot(self) -> Dict[str, Dict[str, Any]]:
+        with self._lock:
+            return {
+                section: {
+                    **stats,
+                    "avg_tokens": round(stats["total_tokens"] / stats["prompts"], 1),
+                }
+                for section, stats in self._sections.items()
+            }
+
+
+# 프로세스 전역 통계
+prompt_token_stats = PromptTokenStats()
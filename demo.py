@@ -13,20 +13,24 @@
 
 import os
 import pandas as pd
-from typing import Dict, Any, List
+from typing import Dict, Any, List, Optional
 from pydantic import SecretStr
 from langgraph.graph import StateGraph, END
 import streamlit as st
 
 
 # ----- LLM (Upstage) -----
-from langchain_upstage import ChatUpstage
+from core_logic import llm_cache, llm_pool
+from core_logic.draft_feedback import render_score_guide
+from core_logic.token_budget import count_message_tokens, prompt_token_stats
 
 
-def get_llm(model: str = "solar-pro-250422", temperature: float = 0.2) -> ChatUpstage:
-    if not api_key:
-        raise RuntimeError("UPSTAGE_API_KEY 환경변수가 필요합니다.")
-    return ChatUpstage(model=model, temperature=temperature, api_key=api_key)
+def get_llm(
+    model: str = "solar-pro-250422", temperature: float = 0.2, provider: Optional[str] = None
+) -> Any:
+    # 프로세스 전역 풀의 공유 클라이언트 사용 (연결 재사용)
+    # LLM_PROVIDER=fake이면 API 키 없이 가짜 모델로 실행
+    return llm_pool.get_llm(model=model, temperature=temperature, provider=provider)
 
 
 # ----- CSV 데이터 로드 및 학생 데이터 추출 -----
@@ -247,40 +251,20 @@ def trend_explainer_node(state: Dict[str, Any]) -> Dict[str, Any]:
 변화 없는 경우 → "기초와 응용을 균형 있게 묻는 질문을 꾸준히 이어가고 있습니다." / "집중이 잘 되지 않는 모습이 이어지고 있어 추가 지도가 필요합니다."
 
 ### 해석 가이드
-수업 태도
-5점: 수업 전반에 활발히 참여하며, 질문과 의견 제시로 분위기를 이끎.
-4점: 대부분 성실하게 임하며, 잠깐 흐트러져도 곧 집중을 회복함.
-3점: 참여 의지는 있으나 발언 빈도가 낮아 추가적인 참여 유도가 필요함.
-2점: 집중 유지가 어렵고 참여가 소극적이어서 지속적인 관심과 지원이 필요함.
-1점: 수업 몰입도와 참여도가 매우 낮아 목표 달성을 위해 강력한 지도·관리가 요구됨.
-
-수업 이해도
-5점: 학습 내용을 깊이 있게 파악하고, 변형·응용 과제도 스스로 해결함.
-4점: 핵심 내용을 잘 이해하며, 기본 수준의 응용 문제는 큰 어려움 없이 수행함.
-3점: 기초 개념은 이해하나, 난도가 높은 문제 해결에는 도움을 필요로 함.
-2점: 주요 개념 이해가 미흡해 반복 학습과 추가 자료 지원이 필요함.
-1점: 전반적인 기초부터 재학습이 필요한 수준임.
-
-과제 수행
-5점: 모든 과제를 정성껏 완수하며, 정확성과 완성도가 높고 제출 기한을 지킴.
-4점: 대부분 수행하였으나 일부 세부 사항에서 실수나 누락이 있음.
-3점: 과제의 절반 이상을 제출했으나 정확성·완성도가 부족함.
-2점: 일부만 제출하거나 기한을 지키지 않는 경우가 잦음.
-1점: 과제를 거의 제출하지 않거나 미제출함.
-
-질문(상호작용)
-5점: 적극적으로 질문하며, 질문의 내용이 심화적임
-4점: 빈번하게 질문하며, 질문의 내용이 기초, 응용 수준임
-3점: 질문하기는 하되, 질문의 내용이 기초적인 수준임
-2점: 질문이 거의 없으며, 질문의 내용이 수업과 무관함
-1점: 질문이 없으며, 교수자의 질문에도 대답을 거의 하지 않음
+{render_score_guide()}
 
 위 규칙을 지켜 4문장으로 출력만 해줘.
 """
     llm = get_llm()
-    resp = llm.invoke([("system", system_msg), ("user", user_msg)])
-    # langchain 메시지 객체에서 콘텐츠만 추출
-    text = resp.content if hasattr(resp, "content") else str(resp)
+    messages = [("system", system_msg), ("user", user_msg)]
+    prompt_token_stats.record("trend_explainer", count_message_tokens(messages))
+    # 동일 프롬프트는 캐시된 응답 사용 (state['use_cache']=False이면 새로 생성)
+    text = llm_cache.cached_invoke(
+        llm,
+        messages,
+        use_cache=state.get("use_cache", True),
+        section="trend_explainer",
+    )
 
     state["numeric_trend_text"] = text.strip()
     return state
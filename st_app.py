@@ -1,9 +1,14 @@
+import json
 import streamlit as st
 import requests
 from datetime import date
 
 # --- API 기본 설정 ---
 BASE_URL = "https://27th-project-feedback.duckdns.org/"
+# 목록 API 한 번에 요청하는 항목 수 (다음 페이지는 X-Next-Cursor 헤더로 이어서 조회)
+PAGE_SIZE = 100
+# 쓰기 응답의 쓰기 시각 헤더 (이후 요청에 다시 보내면 서버가 잠시 복제본 대신 primary에서 조회)
+LAST_WRITE_HEADER = "X-Last-Write"
 
 # --- API 요청 헬퍼 클래스 ---
 class ApiClient:
@@ -17,14 +22,41 @@ class ApiClient:
 
     def _request(self, method, endpoint, **kwargs):
         """공통 요청 로직"""
+        response = self._send(method, endpoint, **kwargs)
+        # 오류 응답이나 DELETE 요청 등 내용이 없는 성공 응답 처리
+        if response is None or response.status_code == 204:
+            return None
+        return response.json()
+
+    def _request_all_pages(self, endpoint):
+        """
+        커서 페이지 목록 API를 X-Next-Cursor 헤더가 없을 때까지 이어서 조회하여 전체 목록을 반환
+        (중간에 실패하면 None)
+        """
+        items = []
+        params = {"limit": PAGE_SIZE}
+        while True:
+            response = self._send("get", endpoint, params=params)
+            if response is None:
+                return None
+            items.extend(response.json())
+            cursor = response.headers.get("X-Next-Cursor")
+            if not cursor:
+                return items
+            params = {"limit": PAGE_SIZE, "cursor": cursor}
+
+    def _send(self, method, endpoint, **kwargs):
+        """요청을 보내고 성공 응답을 반환 (실패하면 오류를 표시하고 None)"""
         url = f"{self.base_url}{endpoint}"
+        headers = dict(self.headers)
+        if st.session_state.get("last_write"):
+            headers[LAST_WRITE_HEADER] = st.session_state["last_write"]
         try:
-            response = requests.request(method, url, headers=self.headers, **kwargs)
+            response = requests.request(method, url, headers=headers, **kwargs)
             response.raise_for_status()  # 2xx 상태 코드가 아니면 예외 발생
-            # DELETE 요청 등 내용이 없는 성공 응답 처리
-            if response.status_code == 204:
-                return None
-            return response.json()
+            if response.headers.get(LAST_WRITE_HEADER):
+                st.session_state["last_write"] = response.headers[LAST_WRITE_HEADER]
+            return response
         except requests.exceptions.HTTPError as err:
             try:
                 error_detail = err.response.json()
@@ -48,7 +80,7 @@ class ApiClient:
 
     # --- 학생 API ---
     def get_students(self):
-        return self._request("get", "/api/v1/students")
+        return self._request_all_pages("/api/v1/students")
 
     def create_student(self, name, grade_id):
         return self._request("post", "/api/v1/students", json={"name": name, "grade_id": grade_id})
@@ -61,11 +93,27 @@ class ApiClient:
 
     # --- 피드백 API ---
     def get_feedbacks(self, student_id):
-        return self._request("get", f"/api/v1/students/{student_id}/feedbacks")
+        return self._request_all_pages(f"/api/v1/students/{student_id}/feedbacks")
 
     def create_feedback(self, student_id, class_info, feedback_info):
         payload = {"class_info": class_info, "feedback_info": feedback_info}
         return self._request("post", f"/api/v1/students/{student_id}/feedbacks", json=payload)
+
+    def stream_feedback(self, student_id, class_info, feedback_info):
+        """피드백 생성 스트리밍 API(SSE)의 (event, data) 를 수신하는 대로 반환"""
+        payload = {"class_info": class_info, "feedback_info": feedback_info}
+        url = f"{self.base_url}/api/v1/students/{student_id}/feedbacks/stream"
+        try:
+            with requests.post(url, headers=self.headers, json=payload, stream=True) as response:
+                response.raise_for_status()
+                event = None
+                for line in response.iter_lines(decode_unicode=True):
+                    if line.startswith("event: "):
+                        event = line[len("event: "):]
+                    elif line.startswith("data: "):
+                        yield event, json.loads(line[len("data: "):])
+        except requests.exceptions.RequestException as err:
+            st.error(f"연결 오류: 피드백 스트리밍에 실패했습니다. ({err})")
     
     # --- 학년 API ---
     def get_grades(self):
@@ -230,17 +278,29 @@ def show_feedback_management():
 
             submitted = st.form_submit_button("AI 피드백 생성")
             if submitted:
-                with st.spinner("AI가 피드백을 생성 중입니다..."):
-                    class_info = {
-                        "subject": subject, "class_date": str(class_date),
-                        "progress_text": progress_text, "class_memo": class_memo
-                    }
-                    feedback_info = {
-                        "attitude_score": attitude_score, "understanding_score": understanding_score,
-                        "homework_score": homework_score, "qa_score": qa_score
-                    }
-                    response = client.create_feedback(student_id, class_info, feedback_info)
-                if response:
+                class_info = {
+                    "subject": subject, "class_date": str(class_date),
+                    "progress_text": progress_text, "class_memo": class_memo
+                }
+                feedback_info = {
+                    "attitude_score": attitude_score, "understanding_score": understanding_score,
+                    "homework_score": homework_score, "qa_score": qa_score
+                }
+                # 섹션별로 생성되는 내용을 도착하는 대로 표시
+                placeholders = {
+                    "improvement": st.empty(), "attitude": st.empty(), "overall": st.empty()
+                }
+                texts = {key: "" for key in placeholders}
+                completed = False
+                for event, data in client.stream_feedback(student_id, class_info, feedback_info):
+                    if event == "token":
+                        texts[data["section"]] += data["text"]
+                        placeholders[data["section"]].info(texts[data["section"]])
+                    elif event == "error" and data.get("section") is None:
+                        st.error(f"AI 피드백 생성 오류: {data['detail']}")
+                    elif event == "done":
+                        completed = True
+                if completed:
                     st.toast("✅ AI 피드백 생성을 완료했습니다.")
                     st.rerun()
 